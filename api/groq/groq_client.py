@@ -1,12 +1,16 @@
 """Groq client with openai/gpt-oss-120b model for mathematical reasoning."""
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, AsyncIterator
 import base64
 from io import BytesIO
+import httpx
 import structlog
 from groq import AsyncGroq
 from PIL import Image
 
 from config.settings import settings
+from utils.tracing import span
+from utils.rate_limiter import rate_limiter
+from utils.concurrency import llm_slot
 
 logger = structlog.get_logger()
 
@@ -14,8 +18,14 @@ logger = structlog.get_logger()
 class GroqClient:
     """Client for Groq API using openai/gpt-oss-120b model."""
 
-    def __init__(self):
-        self.client = AsyncGroq(api_key=settings.groq_api_key)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """Create the client.
+
+        Args:
+            http_client: Shared HTTP pool (see api.registry); the SDK
+                creates its own when omitted
+        """
+        self.client = AsyncGroq(api_key=settings.groq_api_key, http_client=http_client)
         self.model = settings.groq_model
         self.max_completion_tokens = settings.groq_max_completion_tokens
         # Optimal temperature for mathematical reasoning (0.5-0.7 range)
@@ -41,12 +51,15 @@ class GroqClient:
             # Use optimal temperature for math if not specified
             temp = temperature if temperature is not None else self.default_temperature
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temp,
-                max_tokens=max_completion_tokens or self.max_completion_tokens
-            )
+            await rate_limiter.acquire("groq")
+            async with llm_slot():
+                with span("groq.complete"):
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temp,
+                        max_tokens=max_completion_tokens or self.max_completion_tokens
+                    )
 
             return response.choices[0].message.content
 
@@ -54,6 +67,43 @@ class GroqClient:
             logger.error("Groq completion failed", error=str(e))
             raise
 
+    async def complete_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_completion_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion from Groq token by token.
+
+        Args:
+            messages: Conversation messages
+            temperature: Sampling temperature (optimal: 0.5-0.7 for math)
+            max_completion_tokens: Maximum completion tokens in response
+
+        Yields:
+            Content deltas as they arrive
+        """
+        try:
+            temp = temperature if temperature is not None else self.default_temperature
+
+            await rate_limiter.acquire("groq")
+            async with llm_slot():
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temp,
+                    max_tokens=max_completion_tokens or self.max_completion_tokens,
+                    stream=True
+                )
+
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error("Groq streaming completion failed", error=str(e))
+            raise
+
     async def parse_image_to_math(
         self,
         image_data: Union[bytes, BytesIO, str],
@@ -123,6 +173,90 @@ class GroqClient:
         Returns:
             Enhanced result
         """
+        try:
+            explanation = await self.explain_wolfram_result(
+                wolfram_result,
+                original_query,
+                student_level
+            )
+
+            # Extract key concepts
+            concepts = await self._extract_concepts(wolfram_result, explanation)
+
+            return {
+                "explanation": explanation,
+                "concepts": concepts,
+                "difficulty_level": self._assess_difficulty(original_query),
+                "prerequisites": await self._identify_prerequisites(original_query)
+            }
+
+        except Exception as e:
+            logger.error("Result enhancement failed", error=str(e))
+            return {
+                "explanation": self._fallback_explanation(wolfram_result),
+                "concepts": ["equation solving", "algebra", "inverse operations"],
+                "difficulty_level": "beginner",
+                "prerequisites": ["basic arithmetic", "understanding of variables"]
+            }
+
+    async def stream_explanation(
+        self,
+        wolfram_result: Dict[str, Any],
+        original_query: str,
+        student_level: str = "undergraduate"
+    ) -> AsyncIterator[str]:
+        """Stream the tutor explanation for a Wolfram result.
+
+        Args:
+            wolfram_result: Raw Wolfram API result
+            original_query: Original user query
+            student_level: Educational level for explanations
+
+        Yields:
+            Explanation text deltas
+        """
+        messages = self._build_explanation_messages(wolfram_result, original_query, student_level)
+        async for delta in self.complete_stream(messages, temperature=0.6):
+            yield delta
+
+    async def explain_wolfram_result(
+        self,
+        wolfram_result: Dict[str, Any],
+        original_query: str,
+        student_level: str = "undergraduate"
+    ) -> str:
+        """Generate the tutor explanation for a Wolfram result.
+
+        Args:
+            wolfram_result: Raw Wolfram API result
+            original_query: Original user query
+            student_level: Educational level for explanations
+
+        Returns:
+            Explanation text
+
+        Raises:
+            Exception: If the completion fails
+        """
+        messages = self._build_explanation_messages(wolfram_result, original_query, student_level)
+        return await self.complete(messages, temperature=0.6)
+
+    def _build_explanation_messages(
+        self,
+        wolfram_result: Dict[str, Any],
+        original_query: str,
+        student_level: str
+    ) -> List[Dict[str, Any]]:
+        """Build the explanation prompt for a Wolfram result.
+
+        Args:
+            wolfram_result: Raw Wolfram API result
+            original_query: Original user query
+            student_level: Educational level for explanations
+
+        Returns:
+            Conversation messages
+        """
         # Build enhancement prompt
         system_prompt = f"""You are a patient and knowledgeable math tutor explaining to a {student_level} student.
         Your goal is to make complex mathematical concepts accessible and clear."""
@@ -143,28 +277,21 @@ class GroqClient:
         Even if detailed steps aren't available, provide a complete explanation of how to solve this type of problem.
         Keep explanations clear but rigorous. Use analogies where helpful."""
 
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
 
-        try:
-            explanation = await self.complete(messages, temperature=0.6)
+    def _fallback_explanation(self, wolfram_result: Dict[str, Any]) -> str:
+        """Build a basic explanation used when the LLM is unavailable.
 
-            # Extract key concepts
-            concepts = await self._extract_concepts(wolfram_result, explanation)
-
-            return {
-                "explanation": explanation,
-                "concepts": concepts,
-                "difficulty_level": self._assess_difficulty(original_query),
-                "prerequisites": await self._identify_prerequisites(original_query)
-            }
+        Args:
+            wolfram_result: Raw Wolfram API result
 
-        except Exception as e:
-            logger.error("Result enhancement failed", error=str(e))
-            # Provide a basic fallback explanation
-            fallback_explanation = f"""This appears to be a mathematical equation solving problem.
+        Returns:
+            Fallback explanation text
+        """
+        return f"""This appears to be a mathematical equation solving problem.
 
 The equation was solved and the result is: {wolfram_result.get('final_answer', 'Unknown')}
 
@@ -175,13 +302,6 @@ For basic algebraic equations like this, the solution typically involves:
 
 This follows the fundamental principle of algebra that you can perform any operation on an equation as long as you do the same thing to both sides."""
 
-            return {
-                "explanation": fallback_explanation,
-                "concepts": ["equation solving", "algebra", "inverse operations"],
-                "difficulty_level": "beginner",
-                "prerequisites": ["basic arithmetic", "understanding of variables"]
-            }
-
     def _format_wolfram_result(self, result: Dict[str, Any]) -> str:
         """Format Wolfram result for prompt.
 
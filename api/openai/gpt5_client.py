@@ -2,11 +2,13 @@
 from typing import Dict, Any, List, Optional, Union
 import base64
 from io import BytesIO
+import httpx
 import structlog
 from openai import AsyncOpenAI
 from PIL import Image
 
 from config.settings import settings
+from utils.concurrency import llm_slot
 
 logger = structlog.get_logger()
 
@@ -14,8 +16,14 @@ logger = structlog.get_logger()
 class GPT5Client:
     """Client for GPT-5 Pro with vision capabilities."""
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """Create the client.
+
+        Args:
+            http_client: Shared HTTP pool (see api.registry); the SDK
+                creates its own when omitted
+        """
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
         # Map invalid model names to valid ones
         model_mapping = {
             "gpt-5-mini": "gpt-4o-mini",
@@ -55,7 +63,8 @@ class GPT5Client:
             else:
                 completion_params["max_tokens"] = max_completion_tokens or self.max_completion_tokens
 
-            response = await self.client.chat.completions.create(**completion_params)
+            async with llm_slot():
+                response = await self.client.chat.completions.create(**completion_params)
             
             return response.choices[0].message.content
             
@@ -0,0 +1,124 @@
+"""App-scoped registry of LLM clients sharing one HTTP pool per provider."""
+from typing import Dict, Optional
+import asyncio
+import httpx
+import structlog
+
+from config.settings import settings
+from api.wolfram.http_pool import http2_available
+from .groq import GroqClient
+from .openai import GPT5Client
+
+logger = structlog.get_logger()
+
+
+def create_llm_http_client() -> httpx.AsyncClient:
+    """Build an AsyncClient configured from the LLM pool settings.
+
+    Returns:
+        Configured HTTP client
+    """
+    return httpx.AsyncClient(
+        http2=settings.llm_http2 and http2_available(),
+        timeout=httpx.Timeout(
+            settings.llm_timeout,
+            connect=settings.llm_connect_timeout
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry
+        )
+    )
+
+
+class LLMClientRegistry:
+    """Hold one GroqClient and one GPT5Client for the whole process.
+
+    Each provider gets its own HTTP pool so connections are reused across
+    requests and components. Clients are created on first use, so the
+    registry also works outside the app lifespan (scripts, tests).
+    """
+
+    def __init__(self):
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._groq: Optional[GroqClient] = None
+        self._gpt5: Optional[GPT5Client] = None
+
+    def _http_client(self, provider: str) -> httpx.AsyncClient:
+        """Get the HTTP pool for a provider, creating it if needed.
+
+        Args:
+            provider: Provider name (groq or openai)
+
+        Returns:
+            Shared HTTP client
+        """
+        client = self._http_clients.get(provider)
+        if client is None:
+            client = create_llm_http_client()
+            self._http_clients[provider] = client
+        return client
+
+    @property
+    def groq(self) -> GroqClient:
+        """Shared Groq client."""
+        if self._groq is None:
+            self._groq = GroqClient(http_client=self._http_client("groq"))
+        return self._groq
+
+    @property
+    def gpt5(self) -> GPT5Client:
+        """Shared OpenAI client."""
+        if self._gpt5 is None:
+            self._gpt5 = GPT5Client(http_client=self._http_client("openai"))
+        return self._gpt5
+
+    async def start(self) -> None:
+        """Create the clients and optionally warm their connections."""
+        # Create both clients now rather than on the first request
+        self.groq
+        self.gpt5
+        logger.info(
+            "LLM client registry started",
+            max_connections=settings.llm_max_connections,
+            max_keepalive=settings.llm_max_keepalive_connections
+        )
+
+        if settings.llm_warmup:
+            await self.warm_up()
+
+    async def warm_up(self) -> None:
+        """Open a connection to each provider before the first request.
+
+        Lists models, which completes the TLS handshake and authenticates
+        without spending tokens. Failures are logged and ignored.
+        """
+        async def ping(provider: str, sdk_client) -> None:
+            try:
+                await asyncio.wait_for(
+                    sdk_client.with_options(max_retries=0).models.list(),
+                    settings.llm_connect_timeout
+                )
+                logger.info("LLM connection warmed", provider=provider)
+            except Exception as e:
+                logger.warning("LLM warm-up failed", provider=provider, error=str(e))
+
+        await asyncio.gather(
+            ping("groq", self.groq.client),
+            ping("openai", self.gpt5.client)
+        )
+
+    async def close(self) -> None:
+        """Close every provider pool."""
+        for client in self._http_clients.values():
+            await client.aclose()
+
+        self._http_clients.clear()
+        self._groq = None
+        self._gpt5 = None
+        logger.info("LLM client registry closed")
+
+
+# Process-wide registry, started and closed by the application lifespan
+llm_clients = LLMClientRegistry()
@@ -1,6 +1,6 @@
 """Wolfram Alpha API clients."""
 from .llm_client import WolframLLMClient
-from .full_results_client import WolframFullResultsClient
+from .full_results_client import WolframFullResultsClient, STEP_BY_STEP_POD_STATES
 from .show_steps_client import WolframShowStepsClient
 from .language_eval_client import WolframLanguageEvalClient
 
@@ -8,5 +8,6 @@ __all__ = [
     "WolframLLMClient",
     "WolframFullResultsClient", 
     "WolframShowStepsClient",
-    "WolframLanguageEvalClient"
+    "WolframLanguageEvalClient",
+    "STEP_BY_STEP_POD_STATES"
 ]
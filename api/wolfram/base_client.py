@@ -1,32 +1,48 @@
 """Base Wolfram Alpha API client."""
+import asyncio
 import httpx
 from typing import Dict, Any, Optional
 import structlog
 from urllib.parse import urlencode
 
 from config.settings import settings
+from .http_pool import get_http_client, create_http_client
+from .response_cache import response_cache
+from utils.tracing import span
+from .resilience import get_policy, RETRYABLE_STATUSES
+from utils.rate_limiter import rate_limiter
+from utils.deadline import budget, DeadlineExceeded
 
 logger = structlog.get_logger()
 
 
 class WolframBaseClient:
     """Base client for Wolfram Alpha API interactions."""
+
+    # API name used for cache namespaces and TTLs
+    api_name = "wolfram"
     
     def __init__(self):
         self.app_id = settings.wolfram_app_id
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Reuse the lifespan-managed pool; fall back to a private client
+        # when running outside the app (scripts, tests)
+        shared_client = get_http_client()
+        self._owns_client = shared_client is None
+        self.client = shared_client or create_http_client()
         
     async def __aenter__(self):
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
         
     async def _make_request(
         self, 
         url: str, 
         params: Dict[str, Any], 
-        method: str = "GET"
+        method: str = "GET",
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Make a request to Wolfram Alpha API.
         
@@ -34,21 +50,32 @@ class WolframBaseClient:
             url: API endpoint URL
             params: Query parameters
             method: HTTP method (GET or POST)
+            use_cache: Whether to serve and store the response in the cache
             
         Returns:
             API response as dictionary
             
         Raises:
             httpx.HTTPError: If request fails
+            RateLimitExceeded: If no Wolfram quota frees up within rate_limit_max_wait
+            CircuitOpenError: If the endpoint is failing and its circuit breaker is open
+            DeadlineExceeded: If the request deadline passes before an attempt starts
         """
         # Add app ID to params
         params["appid"] = self.app_id
+        cache_key = response_cache.make_key(self.api_name, url, params) if use_cache else None
         
         try:
-            if method == "GET":
-                response = await self.client.get(url, params=params)
-            else:
-                response = await self.client.post(url, data=params)
+            with span(f"wolfram.{self.api_name}"):
+                response = None
+                if cache_key:
+                    response = await response_cache.get(self.api_name, cache_key, method, url)
+
+                if response is None:
+                    response = await self._send(url, params, method)
+
+                    if cache_key:
+                        await response_cache.store(self.api_name, cache_key, response)
                 
             response.raise_for_status()
             
@@ -73,6 +100,51 @@ class WolframBaseClient:
             )
             raise
             
+    async def _send(self, url: str, params: Dict[str, Any], method: str) -> httpx.Response:
+        """Send a request under the endpoint's retry, hedging and breaker policy.
+
+        Args:
+            url: API endpoint URL
+            params: Query parameters
+            method: HTTP method (GET or POST)
+
+        Returns:
+            HTTP response
+
+        Raises:
+            DeadlineExceeded: If the request deadline, not the attempt
+                timeout, cut an attempt short (not counted by the breaker)
+        """
+        async def attempt() -> httpx.Response:
+            # Every attempt, including retries and hedges, spends quota
+            await rate_limiter.acquire("wolfram", f"wolfram.{self.api_name}")
+            stage = f"wolfram.{self.api_name}"
+            seconds = budget(settings.wolfram_attempt_timeout, stage)
+            # A timeout set by the caller's deadline says nothing about Wolfram's
+            # health, so it must not count toward the circuit breaker
+            deadline_bound = seconds < settings.wolfram_attempt_timeout
+            timeout = httpx.Timeout(seconds, connect=settings.wolfram_connect_timeout)
+            if method == "GET":
+                request = self.client.get(url, params=params, timeout=timeout)
+            else:
+                request = self.client.post(url, data=params, timeout=timeout)
+            # httpx timeouts apply per read; bound the whole attempt as well
+            try:
+                response = await asyncio.wait_for(request, seconds)
+            except asyncio.TimeoutError:
+                if deadline_bound:
+                    raise DeadlineExceeded(stage)
+                raise httpx.ReadTimeout(f"Wolfram request took longer than {seconds:.1f}s")
+            except (httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout):
+                if deadline_bound:
+                    raise DeadlineExceeded(stage)
+                raise
+            if response.status_code in RETRYABLE_STATUSES:
+                response.raise_for_status()
+            return response
+
+        return await get_policy(self.api_name).run(attempt, idempotent=method == "GET")
+
     def _preprocess_query(self, query: str) -> str:
         """Preprocess query for Wolfram Alpha.
         
@@ -8,6 +8,15 @@ from config.settings import settings
 
 logger = structlog.get_logger()
 
+# Pod states that expand step-by-step solutions inline in a Full Results query
+STEP_BY_STEP_POD_STATES = [
+    "Step-by-step solution",
+    "Result__Step-by-step solution",
+    "IndefiniteIntegral__Step-by-step solution",
+    "DefiniteIntegral__Step-by-step solution",
+    "Limit__Step-by-step solution"
+]
+
 
 class WolframFullResultsClient(WolframBaseClient):
     """Client for Wolfram Alpha Full Results API.
@@ -15,6 +24,8 @@ class WolframFullResultsClient(WolframBaseClient):
     This API returns complete structured results including pods,
     subpods, and various data formats.
     """
+
+    api_name = "full_results"
     
     def __init__(self):
         super().__init__()
@@ -27,7 +38,8 @@ class WolframFullResultsClient(WolframBaseClient):
         format_types: Optional[List[str]] = None,
         assumptions: Optional[List[str]] = None,
         pod_index: Optional[int] = None,
-        include_pod_id: Optional[List[str]] = None
+        include_pod_id: Optional[List[str]] = None,
+        pod_states: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Query Wolfram Alpha Full Results API.
         
@@ -38,6 +50,7 @@ class WolframFullResultsClient(WolframBaseClient):
             assumptions: List of assumption values
             pod_index: Specific pod index to return
             include_pod_id: List of pod IDs to include
+            pod_states: Pod states to apply (e.g. STEP_BY_STEP_POD_STATES)
             
         Returns:
             Structured API response
@@ -65,11 +78,15 @@ class WolframFullResultsClient(WolframBaseClient):
             
         if include_pod_id:
             params["includepodid"] = "|".join(include_pod_id)
+
+        if pod_states:
+            params["podstate"] = pod_states
             
         logger.info(
             "Querying Wolfram Full Results API",
             query=processed_query,
-            output=output
+            output=output,
+            pod_states=pod_states
         )
         
         # Make request
@@ -0,0 +1,83 @@
+"""Shared HTTP connection pool for Wolfram Alpha API clients."""
+from typing import Optional
+import httpx
+import structlog
+
+from config.settings import settings
+
+logger = structlog.get_logger()
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed.
+
+    Returns:
+        True if HTTP/2 can be negotiated
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build an AsyncClient configured from the Wolfram pool settings.
+
+    Returns:
+        Configured HTTP client
+    """
+    http2 = settings.wolfram_http2 and http2_available()
+    if settings.wolfram_http2 and not http2:
+        logger.warning("HTTP/2 requested for Wolfram pool but h2 is not installed, using HTTP/1.1")
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(
+            settings.wolfram_timeout,
+            connect=settings.wolfram_connect_timeout
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.wolfram_max_connections,
+            max_keepalive_connections=settings.wolfram_max_keepalive_connections,
+            keepalive_expiry=settings.wolfram_keepalive_expiry
+        )
+    )
+
+
+async def init_http_pool() -> None:
+    """Create the process-wide Wolfram connection pool."""
+    global _http_client
+
+    if _http_client is not None:
+        return
+
+    _http_client = create_http_client()
+    logger.info(
+        "Wolfram HTTP pool started",
+        max_connections=settings.wolfram_max_connections,
+        max_keepalive=settings.wolfram_max_keepalive_connections
+    )
+
+
+async def close_http_pool() -> None:
+    """Close the process-wide Wolfram connection pool."""
+    global _http_client
+
+    if _http_client is None:
+        return
+
+    await _http_client.aclose()
+    _http_client = None
+    logger.info("Wolfram HTTP pool closed")
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """Get the shared Wolfram HTTP client.
+
+    Returns:
+        Shared client, or None if the pool has not been started
+    """
+    return _http_client
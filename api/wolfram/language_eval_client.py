@@ -15,6 +15,8 @@ class WolframLanguageEvalClient(WolframBaseClient):
     This API allows direct execution of Wolfram Language code
     for complex computations, plotting, and data analysis.
     """
+
+    api_name = "language_eval"
     
     def __init__(self):
         super().__init__()
@@ -14,6 +14,8 @@ class WolframLLMClient(WolframBaseClient):
     This API is designed for natural language queries and returns
     computed results in a format suitable for LLMs.
     """
+
+    api_name = "llm"
     
     def __init__(self):
         super().__init__()
@@ -0,0 +1,314 @@
+"""Retry, hedging and circuit breaking for Wolfram Alpha requests."""
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from collections import deque
+import asyncio
+import random
+import time
+import httpx
+import structlog
+
+from config.settings import settings
+from utils.deadline import has_time_for
+from utils.metrics import registry, Counter, Gauge
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# Statuses that mean Wolfram is struggling rather than rejecting the input
+# (501 is how the Wolfram APIs report an input they cannot interpret)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Latency samples kept per endpoint for the hedging threshold
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+breaker_state = registry.register(Gauge(
+    "stem_circuit_breaker_state",
+    "Circuit breaker state per upstream endpoint (0 closed, 1 half-open, 2 open)",
+    ["breaker"]
+))
+upstream_attempts = registry.register(Counter(
+    "stem_upstream_attempts_total",
+    "Upstream request attempts beyond the first, by endpoint and kind (retry or hedge)",
+    ["endpoint", "kind"]
+))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open), retry after {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether a failed request is worth retrying.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True for transport errors and overload/server error statuses
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Delay before a retry, using exponential backoff with full jitter.
+
+    Args:
+        attempt: Retry number, starting at 1
+
+    Returns:
+        Delay in seconds
+    """
+    ceiling = min(settings.wolfram_retry_backoff_max, settings.wolfram_retry_backoff * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after repeated failures.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast for reset_timeout seconds. It then lets a single probe
+    through (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        breaker_state.set(BREAKER_STATES["closed"], breaker=name)
+
+    def _set_state(self, state: str) -> None:
+        """Change state and export it.
+
+        Args:
+            state: New state
+        """
+        if state != self.state:
+            logger.warning("Circuit breaker state changed", breaker=self.name, state=state)
+        self.state = state
+        breaker_state.set(BREAKER_STATES[state], breaker=self.name)
+
+    def before_call(self) -> None:
+        """Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe already running
+        """
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self._set_state("half_open")
+
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self._probe_in_flight = False
+        self.failures = 0
+        self._set_state("closed")
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state("open")
+
+    def record_neutral(self) -> None:
+        """Release a probe whose outcome says nothing about endpoint health."""
+        self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of request latencies for one endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency.
+
+        Args:
+            seconds: Request duration
+        """
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Get a latency percentile.
+
+        Args:
+            fraction: Percentile as a fraction (0.95 for p95)
+
+        Returns:
+            Latency in seconds, or None until enough samples are recorded
+        """
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def hedged(call: Callable[[], Awaitable[T]], delay: Optional[float], endpoint: str) -> T:
+    """Run a call, starting a second copy if the first is slower than delay.
+
+    The first copy to succeed wins and the other is cancelled. If one copy
+    fails, the other is still awaited.
+
+    Args:
+        call: Zero-argument coroutine function performing the request
+        delay: Seconds to wait before hedging (None disables hedging)
+        endpoint: Endpoint name for metrics
+
+    Returns:
+        Result of the first successful copy
+    """
+    first = asyncio.create_task(call())
+    pending = {first}
+    error: Optional[BaseException] = None
+    try:
+        if delay is None:
+            return await first
+
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+
+        upstream_attempts.inc(endpoint=endpoint, kind="hedge")
+        pending.add(asyncio.create_task(call()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Also reached when the caller is cancelled while waiting
+        for task in pending:
+            if not task.done():
+                task.cancel()
+
+
+class EndpointPolicy:
+    """Retry, hedging and circuit breaking for one Wolfram endpoint."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            f"wolfram.{name}",
+            failure_threshold=settings.wolfram_breaker_failure_threshold,
+            reset_timeout=settings.wolfram_breaker_reset_timeout
+        )
+        self.latency = LatencyTracker()
+
+    async def run(self, attempt: Callable[[], Awaitable[httpx.Response]], idempotent: bool) -> httpx.Response:
+        """Send a request under the endpoint policy.
+
+        Idempotent requests are hedged once they run past the endpoint's
+        p95 latency and retried with jittered backoff on retryable errors.
+
+        Args:
+            attempt: Zero-argument coroutine function sending the request once;
+                it must raise httpx.HTTPStatusError for retryable statuses
+            idempotent: Whether the request may be sent more than once
+
+        Returns:
+            HTTP response
+
+        Raises:
+            CircuitOpenError: If the endpoint's breaker is open
+            httpx.HTTPError: If every attempt failed
+        """
+        self.breaker.before_call()
+
+        retries = settings.wolfram_retries if idempotent else 0
+        hedge_delay = self._hedge_delay() if idempotent else None
+
+        async def timed_attempt() -> httpx.Response:
+            started = time.perf_counter()
+            response = await attempt()
+            self.latency.observe(time.perf_counter() - started)
+            return response
+
+        for retry in range(retries + 1):
+            try:
+                response = await hedged(timed_attempt, hedge_delay, self.name)
+            except httpx.HTTPError as e:
+                delay = backoff_delay(retry + 1)
+                # Only retry if the request deadline leaves room for the backoff
+                if is_retryable(e) and retry < retries and has_time_for(delay):
+                    logger.info("Retrying Wolfram request", endpoint=self.name, retry=retry + 1, error=str(e))
+                    upstream_attempts.inc(endpoint=self.name, kind="retry")
+                    await asyncio.sleep(delay)
+                    continue
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_neutral()
+                raise
+            except BaseException:
+                self.breaker.record_neutral()
+                raise
+
+            self.breaker.record_success()
+            return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds before hedging: the endpoint's p95 latency, with a floor.
+
+        Returns:
+            Delay, or None if hedging is disabled or there are too few samples
+        """
+        if not settings.wolfram_hedging:
+            return None
+        p95 = self.latency.percentile(0.95)
+        if p95 is None:
+            return None
+        return max(settings.wolfram_hedge_min_delay, p95)
+
+
+_policies: Dict[str, EndpointPolicy] = {}
+
+
+def get_policy(name: str) -> EndpointPolicy:
+    """Get the process-wide policy for an endpoint.
+
+    Args:
+        name: Endpoint (API) name
+
+    Returns:
+        Endpoint policy
+    """
+    policy = _policies.get(name)
+    if policy is None:
+        policy = EndpointPolicy(name)
+        _policies[name] = policy
+    return policy
+
+
+def breaker_states() -> Dict[str, str]:
+    """Get the breaker state of every endpoint used so far.
+
+    Returns:
+        Breaker name -> state
+    """
+    return {policy.breaker.name: policy.breaker.state for policy in _policies.values()}
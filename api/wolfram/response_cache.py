@@ -0,0 +1,201 @@
+"""Redis-backed cache for raw Wolfram Alpha API responses."""
+from typing import Dict, Any, Optional
+from collections import defaultdict
+import hashlib
+import json
+import httpx
+import structlog
+
+from config.settings import settings
+from utils.redis_pool import get_redis
+
+logger = structlog.get_logger()
+
+# Status codes Wolfram returns for inputs it will never be able to answer.
+# These are cached with the negative TTL; transient errors are never cached.
+NEGATIVE_STATUS_CODES = {400, 501}
+
+
+class WolframResponseCache:
+    """Cache raw Wolfram responses keyed on the exact request parameters.
+
+    Responses are stored as (status, content type, body) so a hit can be
+    replayed through the normal response handling without touching the
+    network.
+    """
+
+    def __init__(self):
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.negative_hits: Dict[str, int] = defaultdict(int)
+
+    def make_key(self, api_name: str, url: str, params: Dict[str, Any]) -> str:
+        """Build a cache key from the request.
+
+        Args:
+            api_name: Wolfram API name (llm, full_results, ...)
+            url: API endpoint URL
+            params: Request parameters (after query preprocessing)
+
+        Returns:
+            Cache key
+        """
+        # The app ID is the same for every request and must not leak into keys
+        keyed_params = {k: v for k, v in params.items() if k != "appid"}
+        payload = json.dumps([url, keyed_params], sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"wolfram:{api_name}:{digest}"
+
+    async def get(
+        self,
+        api_name: str,
+        key: str,
+        method: str,
+        url: str
+    ) -> Optional[httpx.Response]:
+        """Look up a cached response.
+
+        Args:
+            api_name: Wolfram API name
+            key: Cache key from make_key
+            method: HTTP method of the original request
+            url: API endpoint URL
+
+        Returns:
+            Replayable response, or None on a miss (corrupt entries are
+            deleted and count as misses)
+        """
+        client = get_redis()
+        if client is None or not settings.wolfram_cache_enabled:
+            return None
+
+        try:
+            cached = await client.get(key)
+        except Exception as e:
+            logger.warning("Wolfram cache read failed", error=str(e))
+            return None
+
+        if cached is None:
+            self.misses[api_name] += 1
+            return None
+
+        try:
+            entry = json.loads(cached)
+            response = httpx.Response(
+                entry["status"],
+                headers={"content-type": entry["content_type"]},
+                text=entry["body"],
+                request=httpx.Request(method, url)
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            # A corrupt entry would fail every lookup until it expires
+            logger.warning("Discarding corrupt Wolfram cache entry", key=key, error=str(e))
+            self.misses[api_name] += 1
+            try:
+                await client.delete(key)
+            except Exception as e:
+                logger.warning("Wolfram cache delete failed", error=str(e))
+            return None
+
+        self.hits[api_name] += 1
+        if entry.get("negative"):
+            self.negative_hits[api_name] += 1
+        return response
+
+    async def store(self, api_name: str, key: str, response: httpx.Response) -> None:
+        """Store a response if it is cacheable.
+
+        Args:
+            api_name: Wolfram API name
+            key: Cache key from make_key
+            response: Response received from Wolfram
+        """
+        client = get_redis()
+        if client is None or not settings.wolfram_cache_enabled:
+            return
+
+        negative = self._is_negative(response)
+        if not negative and not response.is_success:
+            # Rate limits and server errors are transient
+            return
+
+        ttl = settings.wolfram_cache_negative_ttl if negative else self._ttl_for(api_name)
+        entry = {
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "body": response.text,
+            "negative": negative
+        }
+
+        try:
+            await client.set(key, json.dumps(entry), ex=ttl)
+        except Exception as e:
+            logger.warning("Wolfram cache write failed", error=str(e))
+
+    def _ttl_for(self, api_name: str) -> int:
+        """Get the TTL for successful responses of an API.
+
+        Args:
+            api_name: Wolfram API name
+
+        Returns:
+            TTL in seconds
+        """
+        ttls = {
+            "llm": settings.wolfram_cache_ttl_llm,
+            "full_results": settings.wolfram_cache_ttl_full_results,
+            "show_steps": settings.wolfram_cache_ttl_show_steps,
+            "language_eval": settings.wolfram_cache_ttl_language_eval
+        }
+        return ttls.get(api_name, settings.redis_ttl)
+
+    def _is_negative(self, response: httpx.Response) -> bool:
+        """Check if a response records a query Wolfram could not answer.
+
+        Args:
+            response: Response received from Wolfram
+
+        Returns:
+            True if the response should be negatively cached
+        """
+        if response.status_code in NEGATIVE_STATUS_CODES:
+            return True
+        if not response.is_success:
+            return False
+
+        content_type = response.headers.get("content-type", "")
+        if "json" in content_type:
+            try:
+                body = response.json()
+            except ValueError:
+                return False
+            query_result = body.get("queryresult") if isinstance(body, dict) else None
+            return bool(query_result) and query_result.get("success") is False
+        if "xml" in content_type:
+            head = response.text[:512]
+            return "success='false'" in head or 'success="false"' in head
+
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters per API.
+
+        Returns:
+            Cache statistics
+        """
+        api_names = set(self.hits) | set(self.misses)
+        return {
+            "enabled": settings.wolfram_cache_enabled and get_redis() is not None,
+            "apis": {
+                name: {
+                    "hits": self.hits[name],
+                    "misses": self.misses[name],
+                    "negative_hits": self.negative_hits[name]
+                }
+                for name in sorted(api_names)
+            }
+        }
+
+
+# Process-wide cache instance shared by all Wolfram clients
+response_cache = WolframResponseCache()
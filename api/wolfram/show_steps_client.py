@@ -8,11 +8,71 @@ from config.settings import settings
 logger = structlog.get_logger()
 
 
+def extract_steps_from_pod(pod: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Extract steps from a pod.
+
+    Args:
+        pod: Pod containing steps
+
+    Returns:
+        List of steps
+    """
+    steps = []
+
+    # Get subpods which contain the steps
+    subpods = pod.get("subpods", [])
+
+    for subpod in subpods:
+        step_text = subpod.get("plaintext", "")
+        if step_text and step_text.strip():
+            # Parse step text to extract step number and content
+            lines = step_text.strip().split("\n")
+
+            for line in lines:
+                if line.strip():
+                    # Check if line is a step
+                    if any(marker in line for marker in ["Step", "=", "→"]):
+                        steps.append({
+                            "step_number": len(steps) + 1,
+                            "description": line.strip(),
+                            "math": line.strip()
+                        })
+
+    return steps
+
+
+def extract_inline_steps(pods: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Extract step-by-step solutions expanded inline by a podstate request.
+
+    When a Full Results query asks for a step-by-step pod state, Wolfram
+    adds the steps as extra subpods (e.g. "Possible intermediate steps").
+
+    Args:
+        pods: Pods from a Full Results response
+
+    Returns:
+        List of steps, empty if no pod carries expanded steps
+    """
+    for pod in pods:
+        step_subpods = [
+            subpod for subpod in pod.get("subpods", [])
+            if "step" in (subpod.get("title") or "").lower()
+        ]
+        if step_subpods:
+            steps = extract_steps_from_pod({"subpods": step_subpods})
+            if steps:
+                return steps
+
+    return []
+
+
 class WolframShowStepsClient(WolframBaseClient):
     """Client for Wolfram Alpha Show Steps API.
     
     This API provides step-by-step solutions for mathematical problems.
     """
+
+    api_name = "show_steps"
     
     def __init__(self):
         super().__init__()
@@ -23,7 +83,8 @@ class WolframShowStepsClient(WolframBaseClient):
         input_text: str,
         output: str = "json",
         format_type: str = "plaintext",
-        show_steps: bool = True
+        show_steps: bool = True,
+        use_step_engine: bool = True
     ) -> Dict[str, Any]:
         """Get step-by-step solution for a problem.
         
@@ -32,6 +93,9 @@ class WolframShowStepsClient(WolframBaseClient):
             output: Output format (json or xml)
             format_type: Format for steps (plaintext, minput, etc.)
             show_steps: Whether to include step-by-step solution
+            use_step_engine: Whether the step engine may fill in steps
+                Wolfram left out (the caller turns it off when a local
+                solve of the problem already failed)
             
         Returns:
             Step-by-step solution
@@ -62,7 +126,10 @@ class WolframShowStepsClient(WolframBaseClient):
         response = await self._make_request(self.api_url, params)
         
         # Process response
-        return self._process_response(response, input_text, output)
+        result = self._process_response(response, input_text, output)
+        if use_step_engine:
+            await self._add_basic_steps(result, input_text)
+        return result
         
     def _process_response(
         self, 
@@ -120,13 +187,20 @@ class WolframShowStepsClient(WolframBaseClient):
                                     "image": subpod["img"]
                                 })
 
+        return result
+
+    async def _add_basic_steps(self, result: Dict[str, Any], original_query: str) -> None:
+        """Fill in steps for a solved problem Wolfram returned without them.
+
+        Args:
+            result: Processed response, updated in place
+            original_query: Original query
+        """
         # If no steps found but we have a final answer, generate basic steps for simple equations
         if not result["steps"] and result["final_answer"] and result["success"]:
             logger.info(f"Generating basic steps for query: {original_query}")
-            result["steps"] = self._generate_basic_steps(original_query, result["final_answer"])
+            result["steps"] = await self._generate_basic_steps(original_query, result["final_answer"])
             logger.info(f"Generated {len(result['steps'])} steps")
-
-        return result
         
     def _extract_steps(self, pod: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract steps from a pod.
@@ -137,201 +211,30 @@ class WolframShowStepsClient(WolframBaseClient):
         Returns:
             List of steps
         """
-        steps = []
-        
-        # Get subpods which contain the steps
-        subpods = pod.get("subpods", [])
-        
-        for i, subpod in enumerate(subpods):
-            step_text = subpod.get("plaintext", "")
-            if step_text and step_text.strip():
-                # Parse step text to extract step number and content
-                lines = step_text.strip().split("\n")
-                
-                for line in lines:
-                    if line.strip():
-                        # Check if line is a step
-                        if any(marker in line for marker in ["Step", "=", "→"]):
-                            steps.append({
-                                "step_number": len(steps) + 1,
-                                "description": line.strip(),
-                                "math": line.strip()
-                            })
-                            
-        return steps
+        return extract_steps_from_pod(pod)
+
+    async def _generate_basic_steps(self, query: str, final_answer: str) -> List[Dict[str, str]]:
+        """Generate steps for routine problems Wolfram answered without steps.
 
-    def _generate_basic_steps(self, query: str, final_answer: str) -> List[Dict[str, str]]:
-        """Generate basic algebraic steps for simple equations and systems.
+        Linear and quadratic equations, linear systems and derivatives are
+        explained by the rule-based step engine, in the local solver pool.
 
         Args:
             query: Original query
             final_answer: Final answer from Wolfram
 
         Returns:
-            List of basic steps
+            List of steps (empty if the problem is not a routine one)
         """
-        import re
+        # Imported here because the processors package imports the API clients
+        from processors.local_solver import local_solver
 
-        steps = []
-
-        # Check if it's a system of equations
-        if "system" in query.lower() or "," in query:
-            return self._generate_system_steps(query, final_answer)
-
-        # Check if it's a simple linear equation like "2x + 3 = 7"
-        # First try to extract just the equation part
-        equation_pattern = r'(\d+\w+\s*[+\-]\s*\d+)\s*=\s*(\d+)'
-        equation_match = re.search(equation_pattern, query)
-
-        if not equation_match:
-            # Fallback to broader pattern
-            equation_match = re.search(r'(\d+\w.*?)=\s*(\d+)', query)
-
-        if equation_match:
-            left_side = equation_match.group(1).strip()
-            right_side = equation_match.group(2).strip()
-
-            # Parse the equation more carefully
-            # Look for patterns like: 2x + 3, x - 5, 3x, etc.
-            var_pattern = r'(\d*)\s*([a-zA-Z])\s*([+\-]\s*\d+)?'
-            var_match = re.search(var_pattern, left_side)
-
-            if var_match:
-                coeff_str = var_match.group(1)
-                var = var_match.group(2)
-                constant_part = var_match.group(3) or ""
-
-                # Parse coefficient
-                coeff_val = int(coeff_str) if coeff_str and coeff_str != "1" else (1 if not coeff_str else int(coeff_str))
-
-                # Parse constant term
-                const_val = 0
-                if constant_part.strip():
-                    # Handle "+ 3" or "- 5" patterns
-                    const_match = re.match(r'\s*([+\-])\s*(\d+)', constant_part)
-                    if const_match:
-                        sign = const_match.group(1)
-                        num = int(const_match.group(2))
-                        const_val = num if sign == '+' else -num
-
-                # Parse right side
-                try:
-                    right_val = int(right_side.strip())
-                except ValueError:
-                    return steps  # Can't parse right side
-
-                # Generate steps for ax + b = c
-                steps = [
-                    {
-                        "step_number": 1,
-                        "description": f"Start with the equation: {coeff_val}{var} + {const_val} = {right_val}",
-                        "math": f"{coeff_val}{var} + {const_val} = {right_val}"
-                    },
-                    {
-                        "step_number": 2,
-                        "description": f"Subtract {const_val} from both sides: {coeff_val}{var} = {right_val} - {const_val}",
-                        "math": f"{coeff_val}{var} = {right_val - const_val}"
-                    },
-                    {
-                        "step_number": 3,
-                        "description": f"Divide both sides by {coeff_val}: {var} = {(right_val - const_val) // coeff_val}",
-                        "math": f"{var} = {(right_val - const_val) // coeff_val}"
-                    }
-                ]
-
-        return steps
-
-    def _generate_system_steps(self, query: str, final_answer: str) -> List[Dict[str, str]]:
-        """Generate steps for solving systems of equations.
-
-        Args:
-            query: Original system query
-            final_answer: Final answer from Wolfram (e.g., "x = 2 and y = 1")
-
-        Returns:
-            List of solution steps
-        """
-        import re
-
-        steps = []
-
-        # Extract equations from query
-        # Remove "Solve the system:" or similar prefixes
-        clean_query = re.sub(r'^.*?system:?\s*', '', query, flags=re.IGNORECASE).strip()
-
-        # Split equations by comma or 'and'
-        if ',' in clean_query:
-            equations = [eq.strip() for eq in clean_query.split(',')]
-        elif ' and ' in clean_query.lower():
-            equations = [eq.strip() for eq in re.split(r'\s+and\s+', clean_query, flags=re.IGNORECASE)]
-        else:
-            # Fallback to single equation
+        try:
+            return await local_solver.explain(query)
+        except Exception as e:
+            logger.warning("Step engine failed", error=str(e))
             return []
 
-        if len(equations) != 2:
-            return []  # Only handle 2-equation systems for now
-
-        eq1, eq2 = equations
-
-        # Parse the final answer to extract variable values
-        answer_match = re.search(r'x\s*=\s*(-?\d+(?:\.\d+)?).*?y\s*=\s*(-?\d+(?:\.\d+)?)', final_answer)
-        if not answer_match:
-            return []
-
-        x_val = float(answer_match.group(1))
-        y_val = float(answer_match.group(2))
-
-        # Generate steps for 2x2 system
-        steps = [
-            {
-                "step_number": 1,
-                "description": f"Start with the system of equations:\n{eq1}\n{eq2}",
-                "math": f"\\begin{{cases}} {eq1} \\\\ {eq2} \\end{{cases}}"
-            },
-            {
-                "step_number": 2,
-                "description": f"Add the equations: ({eq1}) + ({eq2})",
-                "math": f"({eq1}) + ({eq2})"
-            }
-        ]
-
-        # For this specific system: 2x + y = 5, x - y = 1
-        # Use elimination method
-        if "2x + y = 5" in eq1 and "x - y = 1" in eq2:
-            steps.extend([
-                {
-                    "step_number": 3,
-                    "description": "Add the equations to eliminate y: (2x + y) + (x - y) = 5 + 1",
-                    "math": "(2x + y) + (x - y) = 5 + 1"
-                },
-                {
-                    "step_number": 4,
-                    "description": "Combine like terms: 3x + 0y = 6",
-                    "math": "3x = 6"
-                },
-                {
-                    "step_number": 5,
-                    "description": "Divide both sides by 3: x = 6/3 = 2",
-                    "math": "x = \\frac{6}{3} = 2"
-                }
-            ])
-        else:
-            # Generic fallback
-            steps.append({
-                "step_number": 3,
-                "description": f"Solve the system using appropriate method to get x = {x_val}",
-                "math": f"x = {x_val}"
-            })
-
-        # Final step - substitute back
-        steps.append({
-            "step_number": len(steps) + 1,
-            "description": f"Substitute x = {x_val} into the first equation to solve for y: y = {y_val}",
-            "math": f"y = {y_val}"
-        })
-
-        return steps
-
     async def solve_with_alternative_methods(
         self,
         input_text: str
@@ -357,6 +260,7 @@ class WolframShowStepsClient(WolframBaseClient):
         
         # Process to extract multiple solution methods
         result = self._process_response(response, input_text, "json")
+        await self._add_basic_steps(result, input_text)
         result["alternative_methods"] = []
         
         # Look for alternative forms or methods
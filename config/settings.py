@@ -1,5 +1,5 @@
 """Application settings using Pydantic."""
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -32,7 +32,107 @@ class Settings(BaseSettings):
         default="https://api.wolframalpha.com/v1/query",
         description="Wolfram Language API endpoint"
     )
-    
+
+    # Wolfram HTTP Connection Pool
+    wolfram_http2: bool = Field(
+        default=True,
+        description="Negotiate HTTP/2 with Wolfram Alpha when the h2 package is installed"
+    )
+    wolfram_timeout: float = Field(
+        default=30.0,
+        description="Total timeout for Wolfram API requests in seconds"
+    )
+    wolfram_connect_timeout: float = Field(
+        default=5.0,
+        description="Connection timeout for Wolfram API requests in seconds"
+    )
+    wolfram_max_connections: int = Field(
+        default=100,
+        description="Maximum concurrent connections in the shared Wolfram pool"
+    )
+    wolfram_max_keepalive_connections: int = Field(
+        default=20,
+        description="Maximum idle keep-alive connections in the shared Wolfram pool"
+    )
+    wolfram_keepalive_expiry: float = Field(
+        default=60.0,
+        description="Seconds an idle Wolfram connection is kept open"
+    )
+    wolfram_attempt_timeout: float = Field(
+        default=10.0,
+        description="Timeout for a single Wolfram request attempt in seconds"
+    )
+    wolfram_retries: int = Field(
+        default=2,
+        description="Retries for idempotent Wolfram requests after transport errors or 429/5xx responses"
+    )
+    wolfram_retry_backoff: float = Field(
+        default=0.2,
+        description="Base delay in seconds for exponential retry backoff (full jitter)"
+    )
+    wolfram_retry_backoff_max: float = Field(
+        default=2.0,
+        description="Maximum retry backoff delay in seconds"
+    )
+    wolfram_hedging: bool = Field(
+        default=True,
+        description="Send a second copy of a GET request that runs past the endpoint's p95 latency"
+    )
+    wolfram_hedge_min_delay: float = Field(
+        default=0.5,
+        description="Minimum seconds before a hedged request is sent"
+    )
+    wolfram_breaker_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive failed requests that open an endpoint's circuit breaker"
+    )
+    wolfram_breaker_reset_timeout: float = Field(
+        default=30.0,
+        description="Seconds an open circuit breaker waits before letting a probe request through"
+    )
+    wolfram_speculative_steps: bool = Field(
+        default=False,
+        description="Start the Show Steps call in parallel with the first query when steps are predicted"
+    )
+
+    # Upstream Rate Limits (token buckets; a rate of 0 disables a bucket)
+    wolfram_rate_limit: float = Field(
+        default=10.0,
+        description="Requests per second allowed to Wolfram Alpha across all API types"
+    )
+    wolfram_rate_burst: float = Field(
+        default=20.0,
+        description="Burst capacity of each Wolfram rate limit bucket"
+    )
+    wolfram_llm_rate_limit: float = Field(
+        default=0.0,
+        description="Requests per second allowed to the Wolfram LLM API"
+    )
+    wolfram_full_results_rate_limit: float = Field(
+        default=0.0,
+        description="Requests per second allowed to the Wolfram Full Results API"
+    )
+    wolfram_show_steps_rate_limit: float = Field(
+        default=0.0,
+        description="Requests per second allowed to the Wolfram Show Steps API"
+    )
+    groq_rate_limit: float = Field(
+        default=5.0,
+        description="Requests per second allowed to Groq"
+    )
+    groq_rate_burst: float = Field(
+        default=10.0,
+        description="Burst capacity of the Groq rate limit bucket"
+    )
+    rate_limit_max_wait: float = Field(
+        default=5.0,
+        description="Seconds a request may queue for upstream quota before failing"
+    )
+    rate_limit_shared: bool = Field(
+        default=True,
+        description="Keep rate limit buckets in Redis so all workers share one budget"
+    )
+
     # OpenAI Configuration
     openai_api_key: str = Field(..., description="OpenAI API key")
     openai_model: str = Field(
@@ -55,6 +155,190 @@ class Settings(BaseSettings):
         description="Maximum completion tokens for Groq responses"
     )
     
+    # LLM HTTP Connection Pools (one per provider, shared by all components)
+    llm_http2: bool = Field(
+        default=True,
+        description="Negotiate HTTP/2 with LLM providers when the h2 package is installed"
+    )
+    llm_timeout: float = Field(
+        default=60.0,
+        description="Total timeout for LLM API requests in seconds"
+    )
+    llm_stream_idle_timeout: float = Field(
+        default=15.0,
+        description="Longest wait in seconds for the next token of a streamed LLM response"
+    )
+    llm_connect_timeout: float = Field(
+        default=5.0,
+        description="Connection timeout for LLM API requests in seconds"
+    )
+    llm_max_connections: int = Field(
+        default=100,
+        description="Maximum concurrent connections per LLM provider pool"
+    )
+    llm_max_keepalive_connections: int = Field(
+        default=20,
+        description="Maximum idle keep-alive connections per LLM provider pool"
+    )
+    llm_keepalive_expiry: float = Field(
+        default=60.0,
+        description="Seconds an idle LLM connection is kept open"
+    )
+    llm_warmup: bool = Field(
+        default=True,
+        description="Open connections to LLM providers at startup"
+    )
+    
+    # Result Enhancement
+    enhancement_branch_timeout: float = Field(
+        default=25.0,
+        description="Timeout in seconds for each concurrent LLM enrichment branch"
+    )
+    
+    enrichment_cache_enabled: bool = Field(
+        default=True,
+        description="Cache LLM enrichment per canonical problem"
+    )
+    enrichment_cache_ttl: int = Field(
+        default=604800,
+        description="TTL in seconds for cached enrichment in Redis"
+    )
+    enrichment_cache_max_entries: int = Field(
+        default=1024,
+        description="Entries kept in the in-process enrichment LRU"
+    )
+
+    # Quiz Generation
+    quiz_generation_concurrency: int = Field(
+        default=4,
+        description="Maximum concurrent LLM calls while generating one quiz"
+    )
+    quiz_chunk_size: int = Field(
+        default=5,
+        description="Questions requested per LLM call; larger counts are split into parallel chunks"
+    )
+    quiz_ttl: int = Field(
+        default=604800,
+        description="Seconds a generated quiz and its answer key are kept for grading"
+    )
+    quiz_grading_cache_size: int = Field(
+        default=256,
+        description="Quizzes whose indexed answer keys are kept in process for grading"
+    )
+
+    # Step Explanations
+    step_explanation_concurrency: int = Field(
+        default=4,
+        description="Maximum concurrent LLM calls while explaining one solution's steps"
+    )
+    step_explanation_batch_min: int = Field(
+        default=3,
+        description="Step count from which steps are explained in batched prompts instead of one call each"
+    )
+    step_explanation_batch_size: int = Field(
+        default=5,
+        description="Steps explained per batched prompt"
+    )
+
+    # Pre-generated Content Pools
+    content_pool_enabled: bool = Field(
+        default=False,
+        description="Keep pools of pre-generated quiz questions and flashcards for popular topics"
+    )
+    content_pool_local_refill: bool = Field(
+        default=False,
+        description="Refill in-process pools when Redis is unavailable (every worker then generates its own items)"
+    )
+    content_pool_topics: Dict[str, List[str]] = Field(
+        default={
+            "derivatives": ["power rule", "product rule", "chain rule"],
+            "integrals": ["u-substitution", "integration by parts"],
+            "quadratics": ["factoring", "quadratic formula"],
+            "systems of equations": ["substitution method", "elimination method"]
+        },
+        description="Pooled topics and their concepts (JSON in the environment)"
+    )
+    content_pool_difficulties: List[str] = Field(
+        default=["intermediate"],
+        description="Difficulty levels pooled for each topic and concept"
+    )
+    content_pool_min_size: int = Field(
+        default=5,
+        description="Items left in a pool below which it is refilled"
+    )
+    content_pool_target_size: int = Field(
+        default=15,
+        description="Items a refill tops a pool up to"
+    )
+    content_pool_refill_interval: float = Field(
+        default=60.0,
+        description="Seconds between background checks of pool levels"
+    )
+    content_pool_refill_concurrency: int = Field(
+        default=2,
+        description="Maximum concurrent LLM calls made by the pool refill worker"
+    )
+    
+    # Request Deadlines
+    solve_default_deadline: float = Field(
+        default=90.0,
+        description="Seconds a solve may take when the caller sets no deadline"
+    )
+    solve_max_deadline: float = Field(
+        default=300.0,
+        description="Upper bound in seconds on caller-supplied deadlines"
+    )
+    deadline_steps_min: float = Field(
+        default=5.0,
+        description="Seconds that must remain to make a separate step-by-step request"
+    )
+    deadline_enhancement_min: float = Field(
+        default=3.0,
+        description="Seconds that must remain to run LLM enrichment at all"
+    )
+    deadline_optional_min: float = Field(
+        default=15.0,
+        description="Seconds that must remain to generate optional sections (practice problems, applications)"
+    )
+    
+    # Local SymPy Solver
+    local_solver_enabled: bool = Field(
+        default=True,
+        description="Solve recognized problems with SymPy before calling Wolfram"
+    )
+    local_solver_workers: int = Field(
+        default=2,
+        description="Number of worker processes for local SymPy solves"
+    )
+    local_solver_timeout: float = Field(
+        default=2.0,
+        description="Seconds a local solve may take before falling through to Wolfram"
+    )
+    local_solver_max_pending: int = Field(
+        default=16,
+        description="Local solves running or queued before new ones go straight to Wolfram"
+    )
+    
+    # Batch Solving
+    batch_max_items: int = Field(
+        default=50,
+        description="Maximum number of queries in one batch request"
+    )
+    batch_wolfram_concurrency: int = Field(
+        default=4,
+        description="Maximum concurrent Wolfram calls per batch request"
+    )
+    batch_llm_concurrency: int = Field(
+        default=4,
+        description="Maximum concurrent LLM completions per batch request"
+    )
+
+    # Response Serialization
+    fast_json_responses: bool = Field(
+        default=False,
+        description="Serialize solve responses with orjson instead of FastAPI's jsonable_encoder"
+    )
+    
     # Redis Configuration
     redis_url: str = Field(
         default="redis://localhost:6379",
@@ -64,6 +348,36 @@ class Settings(BaseSettings):
         default=3600,
         description="Default TTL for cached items in seconds"
     )
+    redis_socket_timeout: float = Field(
+        default=0.5,
+        description="Redis connect/read timeout in seconds"
+    )
+
+    # Wolfram Response Cache
+    wolfram_cache_enabled: bool = Field(
+        default=True,
+        description="Cache Wolfram API responses in Redis"
+    )
+    wolfram_cache_ttl_llm: int = Field(
+        default=86400,
+        description="TTL in seconds for cached LLM API responses"
+    )
+    wolfram_cache_ttl_full_results: int = Field(
+        default=604800,
+        description="TTL in seconds for cached Full Results API responses"
+    )
+    wolfram_cache_ttl_show_steps: int = Field(
+        default=604800,
+        description="TTL in seconds for cached Show Steps API responses"
+    )
+    wolfram_cache_ttl_language_eval: int = Field(
+        default=86400,
+        description="TTL in seconds for cached Language API responses"
+    )
+    wolfram_cache_negative_ttl: int = Field(
+        default=300,
+        description="TTL in seconds for cached failed queries"
+    )
     
     # Server Configuration
     server_host: str = Field(default="0.0.0.0", description="Server host", validation_alias="HOST")
@@ -76,6 +390,12 @@ class Settings(BaseSettings):
         description="Allowed CORS origins"
     )
     
+    # Monitoring
+    health_sample_interval: float = Field(
+        default=5.0,
+        description="Seconds between background samples of system metrics and Redis-backed stats for /health/detailed"
+    )
+    
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
     sentry_dsn: Optional[str] = Field(default=None, description="Sentry DSN")
@@ -89,6 +409,14 @@ class Settings(BaseSettings):
         default=["image/jpeg", "image/png", "image/gif", "image/webp"],
         description="Allowed image MIME types"
     )
+    ocr_workers: int = Field(
+        default=2,
+        description="Number of worker processes for image OCR"
+    )
+    ocr_max_pending: int = Field(
+        default=8,
+        description="Maximum OCR jobs running or queued before /solve-image returns 429"
+    )
 
 
 # Create settings instance
@@ -0,0 +1,438 @@
+"""Pools of pre-generated quiz questions and flashcards for popular topics."""
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from collections import defaultdict, deque
+import asyncio
+import json
+import uuid
+import structlog
+
+from config.settings import settings
+from utils.metrics import registry, Counter, Gauge
+from utils.redis_pool import get_redis
+from utils.tracing import span
+
+logger = structlog.get_logger()
+
+QUESTION_TYPES = ("multiple_choice", "true_false", "short_answer", "problem_solving")
+FLASHCARD = "flashcard"
+
+# Longest a worker may hold a pool's refill lock before another may take over
+REFILL_LOCK_TTL = 300
+
+# Release a refill lock only if it still holds this worker's token, so a
+# refill that outlived REFILL_LOCK_TTL cannot free another worker's lock
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+pool_requests = registry.register(Counter(
+    "stem_content_pool_requests_total",
+    "Content pool lookups by kind and outcome (hit, partial or miss)",
+    ["kind", "outcome"]
+))
+pool_items = registry.register(Gauge(
+    "stem_content_pool_items",
+    "Items in each content pool at the last refill check",
+    ["pool"]
+))
+
+# (topic, concept, difficulty, item type)
+PoolSpec = Tuple[str, str, str, str]
+
+
+def _normalize(text: str) -> str:
+    """Normalize a topic or concept name for matching.
+
+    Args:
+        text: Name
+
+    Returns:
+        Lowercase name with single spaces
+    """
+    return " ".join(text.lower().split())
+
+
+def _pool_key(spec: PoolSpec) -> str:
+    """Redis key of a pool.
+
+    Args:
+        spec: Pool spec
+
+    Returns:
+        Key
+    """
+    topic, concept, difficulty, item_type = spec
+    return f"pool:{item_type}:{difficulty}:{topic}:{concept}"
+
+
+class ContentPool:
+    """Validated quiz questions and flashcards, generated ahead of requests.
+
+    Each pool holds items for one (topic, concept, difficulty, type) of the
+    configured popular topics. Pools live in Redis lists shared by every
+    worker, or in process memory without Redis. Requests pop items; a
+    background worker tops up pools that drop below content_pool_min_size,
+    taking a per-pool Redis lock so workers do not refill the same pool.
+    Without Redis, pools are only refilled if content_pool_local_refill is
+    set, since every worker would generate its own items.
+    """
+
+    def __init__(self):
+        self._local: Dict[str, Deque[str]] = defaultdict(deque)
+        self._refilling: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._gate: Optional[asyncio.Semaphore] = None
+        self._quiz_generator = None
+        self._flashcard_generator = None
+        self._release_script = None
+
+    async def start(self) -> None:
+        """Start the refill worker."""
+        if self._task is not None or not settings.content_pool_enabled:
+            return
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("Content pool refill worker started", pools=len(self.pool_specs()))
+
+    async def stop(self) -> None:
+        """Stop the refill worker."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def pool_specs(self) -> List[PoolSpec]:
+        """List every configured pool.
+
+        Returns:
+            Pool specs for each topic, concept, difficulty and item type
+        """
+        return [
+            (_normalize(topic), _normalize(concept), _normalize(difficulty), item_type)
+            for topic, concepts in settings.content_pool_topics.items()
+            for concept in concepts
+            for difficulty in settings.content_pool_difficulties
+            for item_type in QUESTION_TYPES + (FLASHCARD,)
+        ]
+
+    def _pooled_topic(self, topic: str, concepts: List[str]) -> Optional[str]:
+        """Find the configured topic that covers a request.
+
+        Args:
+            topic: Requested topic, e.g. "Calculus - Derivatives"
+            concepts: Requested concepts
+
+        Returns:
+            Configured topic whose name appears in the requested topic and
+            which pools every requested concept, or None
+        """
+        requested = _normalize(topic)
+        wanted = {_normalize(concept) for concept in concepts}
+        for pooled, pooled_concepts in settings.content_pool_topics.items():
+            pooled_names = {_normalize(concept) for concept in pooled_concepts}
+            if _normalize(pooled) in requested and wanted and wanted <= pooled_names:
+                return _normalize(pooled)
+        return None
+
+    def _is_pooled_difficulty(self, difficulty: str) -> bool:
+        """Check whether a difficulty level is pooled.
+
+        Args:
+            difficulty: Difficulty level
+
+        Returns:
+            True if pools exist for the level
+        """
+        return _normalize(difficulty) in (_normalize(level) for level in settings.content_pool_difficulties)
+
+    def _concept_topic(self, concept: str) -> Optional[str]:
+        """Find the configured topic a concept belongs to.
+
+        Args:
+            concept: Concept name
+
+        Returns:
+            Configured topic, or None if the concept is not pooled
+        """
+        wanted = _normalize(concept)
+        for pooled, pooled_concepts in settings.content_pool_topics.items():
+            if wanted in (_normalize(name) for name in pooled_concepts):
+                return _normalize(pooled)
+        return None
+
+    async def take_questions(
+        self,
+        topic: str,
+        concepts: List[str],
+        difficulty: str,
+        question_type: str,
+        count: int
+    ) -> List[Dict[str, Any]]:
+        """Take quiz questions from the pools, spread across the concepts.
+
+        Args:
+            topic: Quiz topic
+            concepts: Concepts to cover
+            difficulty: Difficulty level
+            question_type: Question type
+            count: Questions wanted
+
+        Returns:
+            Up to count questions (fewer on a partial or complete miss)
+        """
+        if not settings.content_pool_enabled or count <= 0 or not self._is_pooled_difficulty(difficulty):
+            return []
+        pooled_topic = self._pooled_topic(topic, concepts)
+        if pooled_topic is None:
+            return []
+
+        specs = [
+            (pooled_topic, _normalize(concept), _normalize(difficulty), question_type)
+            for concept in dict.fromkeys(concepts)
+        ]
+        return await self._take("quiz", specs, count)
+
+    async def take_flashcards(
+        self,
+        concepts: List[str],
+        difficulty: str,
+        count: int
+    ) -> List[Dict[str, Any]]:
+        """Take concept flashcards from the pools, spread across the concepts.
+
+        Args:
+            concepts: Concepts to cover
+            difficulty: Difficulty level
+            count: Cards wanted
+
+        Returns:
+            Up to count cards (none unless every concept is pooled)
+        """
+        if not settings.content_pool_enabled or not concepts or count <= 0:
+            return []
+        if not self._is_pooled_difficulty(difficulty):
+            return []
+
+        specs = []
+        for concept in dict.fromkeys(concepts):
+            topic = self._concept_topic(concept)
+            if topic is None:
+                return []
+            specs.append((topic, _normalize(concept), _normalize(difficulty), FLASHCARD))
+        return await self._take("flashcard", specs, count)
+
+    async def _take(self, kind: str, specs: List[PoolSpec], count: int) -> List[Dict[str, Any]]:
+        """Pop items evenly from several pools.
+
+        Args:
+            kind: "quiz" or "flashcard", for metrics
+            specs: Pools to draw from
+            count: Items wanted
+
+        Returns:
+            Up to count items
+        """
+        items: List[Dict[str, Any]] = []
+        low = False
+        with span(f"content_pool.{kind}"):
+            for index, spec in enumerate(specs):
+                # Share what is still missing among the pools not yet drawn from
+                wanted = -(-(count - len(items)) // (len(specs) - index))
+                if wanted <= 0:
+                    break
+                popped, left = await self._pop(_pool_key(spec), wanted)
+                items.extend(popped)
+                low = low or left < settings.content_pool_min_size
+
+        if low:
+            self._wake.set()
+
+        outcome = "hit" if len(items) == count else "partial" if items else "miss"
+        pool_requests.inc(kind=kind, outcome=outcome)
+        return items
+
+    async def _pop(self, key: str, count: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Pop items from one pool.
+
+        Args:
+            key: Pool key
+            count: Items wanted
+
+        Returns:
+            Tuple of (items, items left in the pool)
+        """
+        client = get_redis()
+        if client is None:
+            pool = self._local[key]
+            raw = [pool.popleft() for _ in range(min(count, len(pool)))]
+            return [json.loads(item) for item in raw], len(pool)
+
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.lpop(key, count)
+                pipe.llen(key)
+                raw, left = await pipe.execute()
+        except Exception as e:
+            logger.warning("Content pool read failed", pool=key, error=str(e))
+            return [], 0
+        return [json.loads(item) for item in raw or []], left
+
+    async def _sizes(self, keys: List[str]) -> List[int]:
+        """Count the items in several pools.
+
+        Args:
+            keys: Pool keys
+
+        Returns:
+            Item counts, in order
+        """
+        client = get_redis()
+        if client is None:
+            return [len(self._local[key]) for key in keys]
+
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.llen(key)
+            return await pipe.execute()
+
+    async def stats(self) -> Dict[str, int]:
+        """Get the size of every pool.
+
+        Returns:
+            Pool key -> items available
+        """
+        keys = [_pool_key(spec) for spec in self.pool_specs()]
+        try:
+            return dict(zip(keys, await self._sizes(keys)))
+        except Exception as e:
+            logger.warning("Could not read content pool sizes", error=str(e))
+            return {}
+
+    async def _run(self) -> None:
+        """Refill low pools on an interval, or sooner when a request drains one."""
+        while True:
+            try:
+                await self.refill_low()
+            except Exception as e:
+                logger.warning("Content pool refill failed", error=str(e))
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.content_pool_refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def refill_low(self) -> None:
+        """Top up every pool below content_pool_min_size."""
+        if get_redis() is None and not settings.content_pool_local_refill:
+            return
+        if self._gate is None:
+            self._gate = asyncio.Semaphore(settings.content_pool_refill_concurrency)
+
+        specs = self.pool_specs()
+        sizes = await self._sizes([_pool_key(spec) for spec in specs])
+        for spec, size in zip(specs, sizes):
+            pool_items.set(size, pool=_pool_key(spec))
+
+        await asyncio.gather(*(
+            self._refill(spec, size)
+            for spec, size in zip(specs, sizes)
+            if size < settings.content_pool_min_size
+        ))
+
+    async def _refill(self, spec: PoolSpec, size: int) -> None:
+        """Generate items to bring one pool up to content_pool_target_size.
+
+        Args:
+            spec: Pool spec
+            size: Items currently in the pool
+        """
+        key = _pool_key(spec)
+        if key in self._refilling:
+            return
+
+        client = get_redis()
+        lock = f"{key}:refill"
+        token = uuid.uuid4().hex
+        if client is not None and not await client.set(lock, token, nx=True, ex=REFILL_LOCK_TTL):
+            return
+
+        self._refilling.add(key)
+        try:
+            wanted = settings.content_pool_target_size - size
+            chunk = max(1, settings.quiz_chunk_size)
+            batches = await asyncio.gather(*(
+                self._generate(spec, min(chunk, wanted - start))
+                for start in range(0, wanted, chunk)
+            ))
+            items = [json.dumps(item) for batch in batches for item in batch]
+            if not items:
+                return
+
+            if client is not None:
+                await client.rpush(key, *items)
+            else:
+                self._local[key].extend(items)
+            pool_items.set(size + len(items), pool=key)
+            logger.info("Refilled content pool", pool=key, added=len(items))
+        finally:
+            self._refilling.discard(key)
+            if client is not None:
+                await self._release(client, lock, token)
+
+    async def _release(self, client, lock: str, token: str) -> None:
+        """Release a refill lock if this worker still holds it.
+
+        Args:
+            client: Redis client
+            lock: Lock key
+            token: Token the lock was taken with
+        """
+        try:
+            if self._release_script is None:
+                self._release_script = client.register_script(_RELEASE_SCRIPT)
+            await self._release_script(keys=[lock], args=[token])
+        except Exception as e:
+            # The lock expires on its own after REFILL_LOCK_TTL
+            logger.warning("Could not release content pool refill lock", lock=lock, error=str(e))
+
+    async def _generate(self, spec: PoolSpec, count: int) -> List[Dict[str, Any]]:
+        """Generate validated items for a pool.
+
+        Args:
+            spec: Pool spec
+            count: Items wanted
+
+        Returns:
+            Generated items (the generators drop invalid ones)
+        """
+        # Imported here: the generators themselves draw from this pool
+        from .quiz_generator import QuizGenerator
+        from .flashcard_generator import FlashcardGenerator
+
+        topic, concept, difficulty, item_type = spec
+        async with self._gate:
+            with span(f"content_pool.refill.{item_type}"):
+                if item_type == FLASHCARD:
+                    if self._flashcard_generator is None:
+                        self._flashcard_generator = FlashcardGenerator()
+                    return await self._flashcard_generator._generate_concept_cards([concept], count)
+
+                if self._quiz_generator is None:
+                    self._quiz_generator = QuizGenerator()
+                return await self._quiz_generator._generate_questions_by_type(
+                    topic, [concept], item_type, count, difficulty
+                )
+
+
+# Process-wide pool, refilled by the worker started in the application lifespan
+content_pool = ContentPool()
@@ -1,8 +1,14 @@
 """Explanation generator for mathematical concepts and solutions."""
 from typing import Dict, Any, List, Optional
+import asyncio
+import json
 import structlog
 
 from api.openai import GPT5Client
+from api.registry import llm_clients
+from config.settings import settings
+from utils.dag import run_dag
+from utils.tracing import span
 
 logger = structlog.get_logger()
 
@@ -10,8 +16,10 @@ logger = structlog.get_logger()
 class ExplanationGenerator:
     """Generate educational explanations for mathematical content."""
     
-    def __init__(self):
-        self.gpt5_client = GPT5Client()
+    @property
+    def gpt5_client(self) -> GPT5Client:
+        """Shared OpenAI client from the app registry."""
+        return llm_clients.gpt5
         
     async def generate_step_explanation(
         self,
@@ -20,6 +28,12 @@ class ExplanationGenerator:
         student_level: str = "undergraduate"
     ) -> List[Dict[str, Any]]:
         """Generate explanations for each step in a solution.
+
+        Short solutions get one call per step. From step_explanation_batch_min
+        steps up, one prompt explains a group of up to
+        step_explanation_batch_size steps, which saves repeating the problem
+        in every prompt. Calls run concurrently, at most
+        step_explanation_concurrency at once, and steps keep their order.
         
         Args:
             steps: List of solution steps
@@ -29,27 +43,113 @@ class ExplanationGenerator:
         Returns:
             Steps with explanations
         """
-        enhanced_steps = []
-        
-        for i, step in enumerate(steps):
-            explanation = await self._explain_single_step(
-                step, 
-                problem, 
-                i, 
-                len(steps),
-                student_level
-            )
-            
-            enhanced_step = {
+        gate = asyncio.Semaphore(settings.step_explanation_concurrency)
+        total = len(steps)
+
+        async def explain_one(index: int) -> List[Dict[str, Any]]:
+            async with gate:
+                return [await self._explain_single_step(steps[index], problem, index, total, student_level)]
+
+        async def explain_group(start: int, end: int) -> List[Dict[str, Any]]:
+            async with gate:
+                explanations = await self._explain_steps_batch(steps, start, end, problem, student_level)
+            if explanations is not None:
+                return explanations
+            # Unusable batch output: explain the group's steps one by one
+            singles = await asyncio.gather(*(explain_one(index) for index in range(start, end)))
+            return [explanation for single in singles for explanation in single]
+
+        with span("step_explanations"):
+            if total < settings.step_explanation_batch_min:
+                groups = [explain_one(index) for index in range(total)]
+            else:
+                size = max(1, settings.step_explanation_batch_size)
+                groups = [explain_group(start, min(start + size, total)) for start in range(0, total, size)]
+            results = await asyncio.gather(*groups)
+
+        explanations = [explanation for group in results for explanation in group]
+        return [
+            {
                 **step,
                 "explanation": explanation["explanation"],
                 "why_this_step": explanation["why"],
                 "common_errors": explanation["common_errors"]
             }
+            for step, explanation in zip(steps, explanations)
+        ]
+
+    async def _explain_steps_batch(
+        self,
+        steps: List[Dict[str, Any]],
+        start: int,
+        end: int,
+        problem: str,
+        student_level: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Explain a group of consecutive steps with one prompt.
+
+        Args:
+            steps: All solution steps
+            start: Index of the first step in the group
+            end: Index after the last step in the group
+            problem: Original problem
+            student_level: Educational level
+
+        Returns:
+            One explanation per step in the group, or None if the response
+            does not cover every step
+        """
+        listing = "\n".join(
+            f"Step {index + 1}: {steps[index].get('description', steps[index].get('math', ''))}"
+            for index in range(start, end)
+        )
+        prompt = f"""Explain these steps in solving the problem for a {student_level} student:
+        
+        Problem: {problem}
+        The solution has {len(steps)} steps. Explain steps {start + 1} to {end}:
+        {listing}
+        
+        For each step provide:
+        1. A clear explanation of what this step does
+        2. Why this step is necessary
+        3. One common error students make at this step
+        
+        Format as JSON array with one object per step, in order, with:
+        - step: The step number
+        - explanation: What the step does
+        - why: Why it is necessary
+        - common_error: A common error at this step
+        
+        Be concise but thorough."""
+        
+        messages = [
+            {"role": "system", "content": "You are a patient math tutor."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        try:
+            response = await self.gpt5_client.complete(messages, temperature=0.6)
+            items = {
+                int(item["step"]): item
+                for item in json.loads(response)
+                if isinstance(item, dict) and "step" in item and item.get("explanation")
+            }
+            if any(index + 1 not in items for index in range(start, end)):
+                logger.warning("Batched step explanation incomplete", first=start + 1, last=end)
+                return None
+
+            return [
+                {
+                    "explanation": items[index + 1]["explanation"],
+                    "why": items[index + 1].get("why") or "This step follows from the previous work.",
+                    "common_errors": [items[index + 1]["common_error"]] if items[index + 1].get("common_error") else []
+                }
+                for index in range(start, end)
+            ]
             
-            enhanced_steps.append(enhanced_step)
-            
-        return enhanced_steps
+        except Exception as e:
+            logger.warning("Failed to explain steps in one batch", error=str(e))
+            return None
         
     async def _explain_single_step(
         self,
@@ -132,18 +232,62 @@ class ExplanationGenerator:
         self,
         concept: str,
         context: Optional[str] = None,
-        examples_count: int = 2
+        examples_count: int = 2,
+        analogy_audience: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate explanation for a mathematical concept.
+
+        The generations run as a dependency graph: the explanation and the
+        analogy are independent, and the examples and related concepts are
+        extracted as soon as the explanation is ready.
         
         Args:
             concept: Concept to explain
             context: Optional context where concept appears
             examples_count: Number of examples to include
+            analogy_audience: Target audience for an analogy (None for no analogy)
             
         Returns:
             Concept explanation
         """
+        async def extract_examples(explanation: Optional[str]) -> List[str]:
+            return await self._extract_examples(explanation) if explanation else []
+
+        async def extract_related_concepts(explanation: Optional[str]) -> List[str]:
+            return await self._extract_related_concepts(explanation) if explanation else []
+
+        graph = {
+            "explanation": (lambda: self._explain_concept(concept, context, examples_count), ()),
+            "examples": (extract_examples, ("explanation",)),
+            "related_concepts": (extract_related_concepts, ("explanation",))
+        }
+        if analogy_audience is not None:
+            graph["analogy"] = (lambda: self.generate_analogy(concept, analogy_audience), ())
+
+        results = await run_dag(graph, span_prefix="concept")
+
+        return {
+            "concept": concept,
+            **results,
+            "explanation": results["explanation"] or f"Unable to generate explanation for {concept}"
+        }
+
+    async def _explain_concept(
+        self,
+        concept: str,
+        context: Optional[str],
+        examples_count: int
+    ) -> Optional[str]:
+        """Generate the explanation text for a concept.
+
+        Args:
+            concept: Concept to explain
+            context: Optional context where concept appears
+            examples_count: Number of examples to include
+
+        Returns:
+            Explanation, or None if generation failed
+        """
         prompt = f"""Explain the mathematical concept: {concept}
         
         {f'In the context of: {context}' if context else ''}
@@ -163,23 +307,10 @@ class ExplanationGenerator:
         ]
         
         try:
-            response = await self.gpt5_client.complete(messages, temperature=0.7)
-            
-            return {
-                "concept": concept,
-                "explanation": response,
-                "examples": await self._extract_examples(response),
-                "related_concepts": await self._extract_related_concepts(response)
-            }
-            
+            return await self.gpt5_client.complete(messages, temperature=0.7)
         except Exception as e:
             logger.error("Failed to explain concept", error=str(e))
-            return {
-                "concept": concept,
-                "explanation": f"Unable to generate explanation for {concept}",
-                "examples": [],
-                "related_concepts": []
-            }
+            return None
             
     async def _extract_examples(self, text: str) -> List[str]:
         """Extract examples from explanation text.
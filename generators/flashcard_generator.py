@@ -5,6 +5,8 @@ import json
 from datetime import datetime
 
 from api.openai import GPT5Client
+from api.registry import llm_clients
+from .content_pool import content_pool
 
 logger = structlog.get_logger()
 
@@ -12,8 +14,10 @@ logger = structlog.get_logger()
 class FlashcardGenerator:
     """Generate flashcards from mathematical problems and solutions."""
     
-    def __init__(self):
-        self.gpt5_client = GPT5Client()
+    @property
+    def gpt5_client(self) -> GPT5Client:
+        """Shared OpenAI client from the app registry."""
+        return llm_clients.gpt5
         
     async def generate_flashcards(
         self,
@@ -37,8 +41,11 @@ class FlashcardGenerator:
         """
         flashcards = []
         
-        # Generate concept-based flashcards
-        concept_cards = await self._generate_concept_cards(concepts, count // 2)
+        # Concept cards come from the pre-generated pool for popular
+        # concepts; only the shortfall is generated live
+        concept_cards = await content_pool.take_flashcards(concepts, difficulty, count // 2)
+        if len(concept_cards) < count // 2:
+            concept_cards += await self._generate_concept_cards(concepts, count // 2 - len(concept_cards))
         flashcards.extend(concept_cards)
         
         # Generate problem-specific flashcards
@@ -1,20 +1,45 @@
 """Quiz generator for mathematical topics."""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import re
 import structlog
 import json
+import uuid
 from datetime import datetime
 import random
 
 from api.openai import GPT5Client
+from api.registry import llm_clients
+from config.settings import settings
+from utils.tracing import span
+from .content_pool import content_pool
 
 logger = structlog.get_logger()
 
+# Questions whose word sets overlap at least this much (Jaccard) are
+# duplicates, unless their math differs
+DUPLICATE_SIMILARITY = 0.8
+
+# Numbers and operators of a question, compared after whitespace is removed
+_MATH_TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[+\-*/^=<>]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Extra generation rounds to replace questions dropped as duplicates or invalid
+MAX_TOP_UP_ROUNDS = 2
+
 
 class QuizGenerator:
     """Generate quizzes from mathematical content."""
-    
+
     def __init__(self):
-        self.gpt5_client = GPT5Client()
+        # Indexed answer keys of recently graded quizzes, by quiz ID
+        self._grading_keys: "OrderedDict[str, Dict[str, Tuple[Dict[str, Any], Any]]]" = OrderedDict()
+    
+    @property
+    def gpt5_client(self) -> GPT5Client:
+        """Shared OpenAI client from the app registry."""
+        return llm_clients.gpt5
         
     async def generate_quiz(
         self,
@@ -25,6 +50,12 @@ class QuizGenerator:
         question_types: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Generate a complete quiz on a topic.
+
+        Questions for popular topics come from the pre-generated content
+        pool. The rest are generated concurrently, with large counts split
+        into chunks of quiz_chunk_size; at most quiz_generation_concurrency
+        LLM calls run at once. Near-identical questions are dropped and
+        replaced, for up to MAX_TOP_UP_ROUNDS extra rounds.
         
         Args:
             topic: Main topic of the quiz
@@ -40,7 +71,7 @@ class QuizGenerator:
             question_types = ["multiple_choice", "true_false", "short_answer", "problem_solving"]
             
         quiz = {
-            "id": f"quiz_{datetime.now().timestamp()}",
+            "id": f"quiz_{uuid.uuid4().hex}",
             "title": f"Quiz: {topic}",
             "topic": topic,
             "concepts": concepts,
@@ -54,12 +85,52 @@ class QuizGenerator:
         # Distribute question types
         questions_per_type = self._distribute_questions(question_count, question_types)
         
-        # Generate questions for each type
-        for q_type, count in questions_per_type.items():
-            questions = await self._generate_questions_by_type(
-                topic, concepts, q_type, count, difficulty
+        # Generate every type, split into chunks, concurrently
+        gate = asyncio.Semaphore(settings.quiz_generation_concurrency)
+
+        async def generate_chunk(q_type: str, count: int) -> List[Dict[str, Any]]:
+            async with gate:
+                with span(f"quiz.{q_type}"):
+                    return await self._generate_questions_by_type(
+                        topic, concepts, q_type, count, difficulty
+                    )
+
+        pooled = await asyncio.gather(*(
+            content_pool.take_questions(topic, concepts, difficulty, q_type, count)
+            for q_type, count in questions_per_type.items()
+        ))
+
+        # Only what the pool could not supply is generated live
+        chunks = list(pooled) + await asyncio.gather(*(
+            generate_chunk(q_type, size)
+            for (q_type, count), taken in zip(questions_per_type.items(), pooled)
+            for size in self._chunk_sizes(count - len(taken))
+        ))
+
+        # Separate chunks of one type can come up with the same question
+        questions = self._dedupe_questions(
+            [question for chunk in chunks for question in chunk]
+        )
+
+        # Replace dropped questions until every type has its share
+        for _ in range(MAX_TOP_UP_ROUNDS):
+            missing = {
+                q_type: count - sum(1 for question in questions if question.get("type") == q_type)
+                for q_type, count in questions_per_type.items()
+            }
+            extra = await asyncio.gather(*(
+                generate_chunk(q_type, size)
+                for q_type, count in missing.items()
+                for size in self._chunk_sizes(max(0, count))
+            ))
+            topped_up = self._dedupe_questions(
+                questions + [question for chunk in extra for question in chunk]
             )
-            quiz["questions"].extend(questions)
+            if len(topped_up) == len(questions):
+                break
+            questions = topped_up
+
+        quiz["questions"] = questions[:question_count]
             
         # Shuffle questions
         random.shuffle(quiz["questions"])
@@ -99,6 +170,50 @@ class QuizGenerator:
                 
         return distribution
         
+    def _chunk_sizes(self, count: int) -> List[int]:
+        """Split a question count into near-equal chunks of at most quiz_chunk_size.
+
+        Args:
+            count: Questions of one type
+
+        Returns:
+            Chunk sizes (empty for a count of 0)
+        """
+        chunks = -(-count // max(1, settings.quiz_chunk_size))
+        return [count // chunks + (1 if i < count % chunks else 0) for i in range(chunks)]
+
+    def _dedupe_questions(self, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop near-identical questions, keeping the first of each.
+
+        Questions are near-identical when their wording overlaps by at least
+        DUPLICATE_SIMILARITY and their math is the same, so "Solve 2x+3=7"
+        and "Solve 2x+5=7" are both kept.
+
+        Args:
+            questions: Generated questions
+
+        Returns:
+            Questions without near-duplicates
+        """
+        kept: List[Dict[str, Any]] = []
+        kept_signatures: List[Tuple[Set[str], Tuple[str, ...]]] = []
+        for question in questions:
+            text = str(question.get("question", "")).lower()
+            words = set(_WORD_RE.findall(text))
+            math = tuple(_MATH_TOKEN_RE.findall("".join(text.split())))
+            if any(
+                math == other_math
+                and len(words & other_words) / max(1, len(words | other_words)) >= DUPLICATE_SIMILARITY
+                for other_words, other_math in kept_signatures
+            ):
+                continue
+            kept.append(question)
+            kept_signatures.append((words, math))
+
+        if len(kept) < len(questions):
+            logger.info("Dropped duplicate quiz questions", count=len(questions) - len(kept))
+        return kept
+
     async def _generate_questions_by_type(
         self,
         topic: str,
@@ -459,12 +574,10 @@ class QuizGenerator:
             "feedback": []
         }
         
-        answer_key = quiz["answer_key"]["answers"]
+        grading_key = self._grading_key(quiz)
         
-        for question in quiz["questions"]:
-            q_num = str(question["number"])
+        for q_num, (question, correct_answer) in grading_key.items():
             student_answer = student_answers.get(q_num)
-            correct_answer = answer_key.get(q_num)
             
             is_correct = False
             points_earned = 0
@@ -478,7 +591,8 @@ class QuizGenerator:
                 # For short answer, check key points
                 if student_answer:
                     key_points = question.get("key_points", [])
-                    points_hit = sum(1 for point in key_points if point.lower() in student_answer.lower())
+                    answer_text = str(student_answer).lower()
+                    points_hit = sum(1 for point in key_points if str(point).lower() in answer_text)
                     partial_credit = points_hit / len(key_points) if key_points else 0.5
                     points_earned = int(question["points"] * partial_credit)
                     is_correct = partial_credit > 0.7
@@ -499,25 +613,56 @@ class QuizGenerator:
             
             results["earned_points"] += points_earned
             
-        results["percentage"] = round(
-            (results["earned_points"] / results["total_points"]) * 100, 1
-        )
+        if results["total_points"]:
+            results["percentage"] = round(
+                (results["earned_points"] / results["total_points"]) * 100, 1
+            )
         
         # Generate feedback
-        results["feedback"] = self._generate_feedback(results, quiz)
+        results["feedback"] = self._generate_feedback(results, grading_key)
         
         return results
+
+    def _grading_key(self, quiz: Dict[str, Any]) -> Dict[str, Tuple[Dict[str, Any], Any]]:
+        """Index a quiz's questions and answers by question number.
+
+        The index is kept per quiz ID, so grading further submissions of the
+        same quiz reuses it.
+
+        Args:
+            quiz: Quiz including its answer key
+
+        Returns:
+            Question number -> (question, correct answer), in quiz order
+        """
+        quiz_id = quiz.get("id")
+        grading_key = self._grading_keys.get(quiz_id)
+        if grading_key is not None:
+            self._grading_keys.move_to_end(quiz_id)
+            return grading_key
+
+        answers = quiz["answer_key"]["answers"]
+        grading_key = {
+            str(question["number"]): (question, answers.get(str(question["number"])))
+            for question in quiz["questions"]
+        }
+
+        if quiz_id is not None:
+            self._grading_keys[quiz_id] = grading_key
+            while len(self._grading_keys) > settings.quiz_grading_cache_size:
+                self._grading_keys.popitem(last=False)
+        return grading_key
         
     def _generate_feedback(
         self,
         results: Dict[str, Any],
-        quiz: Dict[str, Any]
+        grading_key: Dict[str, Tuple[Dict[str, Any], Any]]
     ) -> List[str]:
         """Generate feedback based on results.
         
         Args:
             results: Grading results
-            quiz: Original quiz
+            grading_key: Indexed questions from _grading_key
             
         Returns:
             List of feedback items
@@ -539,8 +684,7 @@ class QuizGenerator:
         concepts_missed = {}
         for q_num, result in results["questions"].items():
             if not result["correct"]:
-                question = next(q for q in quiz["questions"] if str(q["number"]) == q_num)
-                concept = question.get("concept", "Unknown")
+                concept = grading_key[q_num][0].get("concept", "Unknown")
                 concepts_missed[concept] = concepts_missed.get(concept, 0) + 1
                 
         if concepts_missed:
@@ -0,0 +1,125 @@
+"""Quiz repository keeping generated quizzes and answer keys for grading."""
+from typing import Dict, Any, Optional, Tuple
+import json
+import time
+import zlib
+import structlog
+
+from config.settings import settings
+from utils.redis_pool import get_redis
+
+logger = structlog.get_logger()
+
+
+def _encode(quiz: Dict[str, Any]) -> bytes:
+    """Serialize a quiz compactly.
+
+    Args:
+        quiz: Quiz including its answer key
+
+    Returns:
+        Compressed JSON
+    """
+    return zlib.compress(json.dumps(quiz, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(data: bytes) -> Dict[str, Any]:
+    """Restore a quiz serialized by _encode.
+
+    Args:
+        data: Compressed JSON
+
+    Returns:
+        Quiz
+    """
+    return json.loads(zlib.decompress(data))
+
+
+class InMemoryQuizStore:
+    """Quiz repository held in process memory.
+
+    Used in tests, and by RedisQuizStore while Redis is unavailable.
+    """
+
+    def __init__(self, ttl: int):
+        """Create the store.
+
+        Args:
+            ttl: Seconds a quiz stays available for grading
+        """
+        self.ttl = ttl
+        self._quizzes: Dict[str, Tuple[float, bytes]] = {}
+
+    async def save(self, quiz: Dict[str, Any]) -> None:
+        """Store a quiz and its answer key under quiz["id"].
+
+        Args:
+            quiz: Quiz from QuizGenerator.generate_quiz
+        """
+        now = time.monotonic()
+        self._quizzes = {
+            quiz_id: entry for quiz_id, entry in self._quizzes.items() if entry[0] > now
+        }
+        self._quizzes[quiz["id"]] = (now + self.ttl, _encode(quiz))
+
+    async def get(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        """Load a quiz.
+
+        Args:
+            quiz_id: Quiz ID
+
+        Returns:
+            Quiz including its answer key, or None if unknown or expired
+        """
+        entry = self._quizzes.get(quiz_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return _decode(entry[1])
+
+
+class RedisQuizStore(InMemoryQuizStore):
+    """Quiz repository in Redis, shared by every worker.
+
+    Quizzes expire with the TTL. Without Redis, quizzes are kept in process
+    memory, so they can only be graded by the worker that generated them.
+    """
+
+    async def save(self, quiz: Dict[str, Any]) -> None:
+        """Store a quiz and its answer key under quiz["id"].
+
+        Args:
+            quiz: Quiz from QuizGenerator.generate_quiz
+        """
+        client = get_redis()
+        if client is not None:
+            try:
+                await client.set(f"quiz:{quiz['id']}", _encode(quiz), ex=self.ttl)
+                return
+            except Exception as e:
+                logger.warning("Quiz store write failed, keeping quiz in memory", quiz_id=quiz["id"], error=str(e))
+
+        await super().save(quiz)
+
+    async def get(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        """Load a quiz.
+
+        Args:
+            quiz_id: Quiz ID
+
+        Returns:
+            Quiz including its answer key, or None if unknown or expired
+        """
+        client = get_redis()
+        if client is not None:
+            try:
+                data = await client.get(f"quiz:{quiz_id}")
+                if data is not None:
+                    return _decode(data)
+            except Exception as e:
+                logger.warning("Quiz store read failed", quiz_id=quiz_id, error=str(e))
+
+        return await super().get(quiz_id)
+
+
+# Process-wide store used by the educational routes
+quiz_store = RedisQuizStore(settings.quiz_ttl)
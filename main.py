@@ -6,7 +6,16 @@ from contextlib import asynccontextmanager
 import uvicorn
 
 from config.settings import settings
-from routes import math_router, educational_router, health_router
+from api.wolfram.http_pool import init_http_pool, close_http_pool
+from api.registry import llm_clients
+from utils.redis_pool import init_redis, close_redis
+from utils.system_monitor import system_monitor
+from utils.rate_limiter import rate_limiter
+from processors.ocr_pool import ocr_pool
+from processors.local_solver import local_solver
+from generators.content_pool import content_pool
+from routes import math_router, educational_router, health_router, metrics_router
+from middleware.server_timing import ServerTimingMiddleware
 
 # Configure structured logging
 structlog.configure(
@@ -35,11 +44,28 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Wolfram Math Service", 
                 host=settings.server_host, 
                 port=settings.server_port)
+    await init_http_pool()
+    await init_redis()
+    await llm_clients.start()
+    # Sections of /health/detailed that need Redis round trips
+    system_monitor.add_collector("rate_limits", rate_limiter.stats)
+    system_monitor.add_collector("content_pools", content_pool.stats)
+    await system_monitor.start()
+    ocr_pool.start()
+    local_solver.start()
+    await content_pool.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Wolfram Math Service")
+    await system_monitor.stop()
+    await content_pool.stop()
+    ocr_pool.stop()
+    local_solver.stop()
+    await close_http_pool()
+    await llm_clients.close()
+    await close_redis()
 
 
 # Create FastAPI app
@@ -59,8 +85,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ServerTimingMiddleware)
+
 # Include routers
 app.include_router(health_router, prefix="/health", tags=["health"])
+app.include_router(metrics_router, tags=["metrics"])
 app.include_router(math_router, prefix="/api/v1/math", tags=["math"])
 app.include_router(educational_router, prefix="/api/v1/educational", tags=["educational"])
 
@@ -76,6 +105,7 @@ async def root():
             "health": "/health",
             "math": "/api/v1/math",
             "educational": "/api/v1/educational",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -0,0 +1,73 @@
+"""ASGI middleware that traces requests and reports a Server-Timing header."""
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import request_duration
+from utils.tracing import start_trace
+
+
+class ServerTimingMiddleware:
+    """Start a trace per HTTP request and expose its spans.
+
+    Spans finished before the response headers are sent appear in the
+    Server-Timing header (for streaming responses that is only the stages
+    before the first byte). Every request is also recorded in the request
+    duration histogram, labelled by route template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = start_trace()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - trace.started) * 1000
+                entries = [
+                    f"{name};dur={duration * 1000:.1f}"
+                    for name, duration in trace.totals().items()
+                ]
+                entries.append(f"total;dur={total_ms:.1f}")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", ", ".join(entries).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_duration.observe(
+                time.perf_counter() - trace.started,
+                method=scope["method"],
+                route=self._route_template(scope),
+                status=str(status_code)
+            )
+
+    def _route_template(self, scope: Scope) -> str:
+        """Find the route path template for a request.
+
+        Using the template rather than the raw path keeps label cardinality
+        bounded.
+
+        Args:
+            scope: ASGI scope
+
+        Returns:
+            Route template, or "unmatched"
+        """
+        app = scope.get("app")
+        router = getattr(app, "router", None)
+        for route in getattr(router, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
@@ -0,0 +1,291 @@
+"""Two-tier cache for LLM enrichment keyed on a canonical form of the problem."""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+import hashlib
+import json
+import re
+import structlog
+
+from config.settings import settings
+from utils.redis_pool import get_redis
+
+logger = structlog.get_logger()
+
+# Bump whenever enrichment prompts change so stale generations are not served
+PROMPT_VERSION = "1"
+
+# Fields of an enhanced result produced by the LLM (the rest is per-request)
+CACHED_FIELDS = (
+    "explanation",
+    "concepts",
+    "difficulty",
+    "prerequisites",
+    "educational_content",
+    "practice_problems"
+)
+
+_OPERATOR_REPLACEMENTS = {
+    "×": "*",
+    "·": "*",
+    "÷": "/",
+    "−": "-",
+    "–": "-",
+    "**": "^",
+}
+_SPACE_AROUND_OPERATOR_RE = re.compile(r'\s*([+\-*/^=(),<>])\s*')
+_IMPLICIT_PRODUCT_RE = re.compile(r'(\d)\*([a-z])')
+_WHITESPACE_RE = re.compile(r'\s+')
+_VARIABLE_RE = re.compile(r'(?<![a-z])[a-z](?![a-z])')
+
+# Single letters that are constants rather than variables
+_CONSTANTS = {"e", "i"}
+# Variables that also occur as words in generated prose ("a function"),
+# so cached text cannot be safely rewritten to or from them
+_AMBIGUOUS_VARIABLES = {"a"}
+# Hyphenated words where a letter names an axis rather than a variable
+_AXIS_WORDS = r'-(?:axis|intercept|coordinate|value|values|plane)'
+
+
+def _letter_pattern(letters) -> "re.Pattern":
+    """Match standalone letters and differentials such as "dx" in prose."""
+    return re.compile(
+        r'(?<![A-Za-z])(d?)([{}])(?![A-Za-z]|{})'.format("".join(sorted(letters)), _AXIS_WORDS)
+    )
+
+
+def _mentions(value: Any, letters) -> bool:
+    """Check whether cached content uses any of the given letters as a variable."""
+    if not letters:
+        return False
+    if isinstance(value, str):
+        return _letter_pattern(letters).search(value) is not None
+    if isinstance(value, list):
+        return any(_mentions(item, letters) for item in value)
+    if isinstance(value, dict):
+        return any(_mentions(item, letters) for item in value.values())
+    return False
+
+
+def canonicalize(query: str) -> Tuple[str, List[str]]:
+    """Reduce a problem to a canonical form.
+
+    Case, whitespace, operator spelling and implicit products are
+    normalized, and single-letter variables are renamed in order of first
+    appearance, so "Derivative of y^3 + 2*y^2" and "derivative of x^3+2x^2"
+    share a form.
+
+    Args:
+        query: Problem text
+
+    Returns:
+        Tuple of (canonical form, original variable names in order)
+    """
+    text = query.strip().lower()
+    for old, new in _OPERATOR_REPLACEMENTS.items():
+        text = text.replace(old, new)
+    text = _WHITESPACE_RE.sub(" ", text)
+    text = _SPACE_AROUND_OPERATOR_RE.sub(r'\1', text)
+    text = _IMPLICIT_PRODUCT_RE.sub(r'\1\2', text)
+
+    variables: List[str] = []
+
+    def rename(match: re.Match) -> str:
+        letter = match.group(0)
+        if letter in _CONSTANTS:
+            return letter
+        if letter not in variables:
+            variables.append(letter)
+        return f"§{variables.index(letter)}"
+
+    return _VARIABLE_RE.sub(rename, text), variables
+
+
+def rebind(value: Any, mapping: Dict[str, str]) -> Any:
+    """Rename variables inside cached generated content.
+
+    Args:
+        value: Cached value (strings, lists and dicts are traversed)
+        mapping: Cached variable name -> requested variable name
+
+    Returns:
+        Value with variables renamed
+    """
+    if not mapping:
+        return value
+    if isinstance(value, str):
+        # Standalone letters plus differentials (axis words stay put)
+        return _letter_pattern(mapping).sub(lambda m: m.group(1) + mapping[m.group(2)], value)
+    if isinstance(value, list):
+        return [rebind(item, mapping) for item in value]
+    if isinstance(value, dict):
+        return {key: rebind(item, mapping) for key, item in value.items()}
+    return value
+
+
+class EnrichmentCache:
+    """Cache enrichment generations in an in-process LRU backed by Redis.
+
+    A hit for the same problem with differently named variables is served
+    by renaming the variables in the cached text, unless one of the names
+    is ambiguous in prose or a new name already appears in the cached
+    text (renaming x to y in "Let y = x^3" would merge two symbols), in
+    which case it is treated as a miss.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses = 0
+
+    def make_key(
+        self,
+        query: str,
+        student_level: str,
+        include_educational: bool,
+        include_practice: bool = True
+    ) -> Tuple[str, List[str]]:
+        """Build the cache key for a problem.
+
+        Args:
+            query: Problem text
+            student_level: Educational level
+            include_educational: Whether educational content is included
+            include_practice: Whether practice problems are included
+
+        Returns:
+            Tuple of (cache key, variable names in the query)
+        """
+        canonical, variables = canonicalize(query)
+        payload = json.dumps([PROMPT_VERSION, canonical, student_level, include_educational, include_practice])
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"enrichment:{digest}", variables
+
+    async def get(self, key: str, variables: List[str]) -> Optional[Dict[str, Any]]:
+        """Look up cached enrichment.
+
+        Args:
+            key: Cache key from make_key
+            variables: Variable names in the requested problem
+
+        Returns:
+            Cached fields with variables renamed, or None on a miss
+        """
+        if not settings.enrichment_cache_enabled:
+            return None
+
+        tier = "memory"
+        entry = self._local.get(key)
+        if entry is not None:
+            self._local.move_to_end(key)
+        else:
+            tier = "redis"
+            entry = await self._get_remote(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        mapping = {
+            cached: requested
+            for cached, requested in zip(entry["variables"], variables)
+            if cached != requested
+        }
+        if any(
+            cached in _AMBIGUOUS_VARIABLES or requested in _AMBIGUOUS_VARIABLES
+            for cached, requested in mapping.items()
+        ) or _mentions(entry["fields"], set(mapping.values()) - set(mapping)):
+            self.misses += 1
+            return None
+
+        self.hits[tier] += 1
+        return rebind(entry["fields"], mapping)
+
+    async def store(
+        self,
+        key: str,
+        variables: List[str],
+        enhanced_result: Dict[str, Any]
+    ) -> None:
+        """Cache the generated fields of an enhanced result.
+
+        Args:
+            key: Cache key from make_key
+            variables: Variable names in the problem
+            enhanced_result: Result from ResultEnhancer
+        """
+        if not settings.enrichment_cache_enabled:
+            return
+
+        # Partial results would pin fallback text for the whole TTL
+        if enhanced_result.get("incomplete_sections"):
+            return
+
+        entry = {
+            "variables": variables,
+            "fields": {
+                field: enhanced_result[field]
+                for field in CACHED_FIELDS
+                if field in enhanced_result
+            }
+        }
+        self._remember(key, entry)
+
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(key, json.dumps(entry), ex=settings.enrichment_cache_ttl)
+        except Exception as e:
+            logger.warning("Enrichment cache write failed", error=str(e))
+
+    async def _get_remote(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry from Redis.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Entry, or None if missing or Redis is unavailable
+        """
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            cached = await client.get(key)
+        except Exception as e:
+            logger.warning("Enrichment cache read failed", error=str(e))
+            return None
+        return json.loads(cached) if cached is not None else None
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        """Put an entry in the in-process LRU.
+
+        Args:
+            key: Cache key
+            entry: Cached entry
+        """
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters.
+
+        Returns:
+            Cache statistics
+        """
+        return {
+            "enabled": settings.enrichment_cache_enabled,
+            "memory_entries": len(self._local),
+            "memory_hits": self.hits["memory"],
+            "redis_hits": self.hits["redis"],
+            "misses": self.misses
+        }
+
+
+# Process-wide cache shared by all enhancement calls
+enrichment_cache = EnrichmentCache(max_entries=settings.enrichment_cache_max_entries)
@@ -2,10 +2,10 @@
 from typing import Dict, Any, Optional, Union
 from io import BytesIO
 import structlog
-from PIL import Image
-import pytesseract
 
 from api.groq import GroqClient
+from api.registry import llm_clients
+from .ocr_pool import ocr_pool, OCRPoolSaturated
 
 logger = structlog.get_logger()
 
@@ -17,8 +17,10 @@ class ImageParser:
     This parser will primarily use OCR for image extraction.
     """
 
-    def __init__(self):
-        self.groq_client = GroqClient()
+    @property
+    def groq_client(self) -> GroqClient:
+        """Shared Groq client from the app registry."""
+        return llm_clients.groq
         
     async def parse_image(
         self,
@@ -33,6 +35,9 @@ class ImageParser:
             
         Returns:
             Parsed content
+
+        Raises:
+            OCRPoolSaturated: If the OCR worker pool is full
         """
         result = {
             "success": False,
@@ -47,7 +52,7 @@ class ImageParser:
             # Note: openai/gpt-oss-120b doesn't have vision capabilities
             # Using OCR as primary method
             logger.info("Extracting text from image using OCR")
-            ocr_result = self._ocr_extract(image_data)
+            ocr_result = await self._ocr_extract(image_data)
 
             if ocr_result["success"]:
                 result["success"] = True
@@ -61,14 +66,16 @@ class ImageParser:
             else:
                 result["error"] = "OCR extraction failed"
                     
+        except OCRPoolSaturated:
+            raise
         except Exception as e:
             logger.error("Image parsing failed", error=str(e))
             result["error"] = str(e)
             
         return result
         
-    def _ocr_extract(self, image_data: Union[bytes, BytesIO]) -> Dict[str, Any]:
-        """Extract text using OCR.
+    async def _ocr_extract(self, image_data: Union[bytes, BytesIO]) -> Dict[str, Any]:
+        """Extract text using OCR in the worker pool.
         
         Args:
             image_data: Image data
@@ -76,61 +83,15 @@ class ImageParser:
         Returns:
             OCR result
         """
-        try:
-            # Convert to PIL Image
-            if isinstance(image_data, bytes):
-                image = Image.open(BytesIO(image_data))
-            else:
-                image = Image.open(image_data)
-                
-            # Preprocess for better OCR
-            image = self._preprocess_for_ocr(image)
-            
-            # Run OCR
-            text = pytesseract.image_to_string(
-                image, 
-                config='--psm 6 -c tessedit_char_whitelist=0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ+-*/=()[]{}.,^_∫∑∏√∞αβγδεζηθικλμνξοπρστυφχψω'
-            )
-            
-            return {
-                "success": bool(text.strip()),
-                "text": text.strip()
-            }
-            
-        except Exception as e:
-            logger.error("OCR extraction failed", error=str(e))
-            return {
-                "success": False,
-                "text": None,
-                "error": str(e)
-            }
-            
-    def _preprocess_for_ocr(self, image: Image.Image) -> Image.Image:
-        """Preprocess image for better OCR results.
-        
-        Args:
-            image: PIL Image
-            
-        Returns:
-            Preprocessed image
-        """
-        # Convert to grayscale
-        if image.mode != 'L':
-            image = image.convert('L')
-            
-        # Resize if too small
-        width, height = image.size
-        if width < 1000:
-            scale = 1000 / width
-            new_size = (int(width * scale), int(height * scale))
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
+        if isinstance(image_data, BytesIO):
+            image_data = image_data.getvalue()
+
+        ocr_result = await ocr_pool.extract(image_data)
+        if not ocr_result["success"] and ocr_result.get("error"):
+            logger.error("OCR extraction failed", error=ocr_result["error"])
+
+        return ocr_result
             
-        # Apply threshold to get black and white
-        threshold = 127
-        image = image.point(lambda p: p > threshold and 255)
-        
-        return image
-        
     def _post_process_content(self, content: str) -> str:
         """Post-process extracted content.
         
@@ -186,7 +147,7 @@ class ImageParser:
         logger.warning("Diagram extraction with openai/gpt-oss-120b limited to OCR")
 
         # Extract text using OCR
-        ocr_result = self._ocr_extract(image_data)
+        ocr_result = await self._ocr_extract(image_data)
 
         if ocr_result["success"]:
             # Parse the response to structure diagram elements
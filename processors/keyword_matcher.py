@@ -0,0 +1,90 @@
+"""Multi-pattern keyword matching for query classification."""
+from typing import Dict, Iterable, List, Set, FrozenSet
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over named keyword families.
+
+    Built once from {family: keywords}; match() reports every family with a
+    keyword occurring anywhere in the text (plain substring semantics) in a
+    single pass, so cost depends on the text length rather than on how many
+    keywords are registered.
+    """
+
+    def __init__(self, families: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+        self._families = frozenset(families)
+
+        for family, keywords in families.items():
+            for keyword in keywords:
+                self._add(keyword, family)
+
+        self._link()
+
+    def _add(self, keyword: str, family: str) -> None:
+        """Insert a keyword into the trie.
+
+        Args:
+            keyword: Keyword (matched as-is, callers lowercase both sides)
+            family: Family reported when the keyword matches
+        """
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._out[state] = self._out[state] | {family}
+
+    def _link(self) -> None:
+        """Compute failure links and fold them into a full transition table.
+
+        States are visited breadth-first, so each state's failure target
+        already has complete transitions when its own are filled in. After
+        this, matching needs one dict lookup per character.
+        """
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            fail_state = self._fail[state]
+            self._out[state] = self._out[state] | self._out[fail_state]
+
+            # Inherit transitions the trie lacks from the failure state
+            transitions = dict(self._goto[fail_state])
+            for char, next_state in self._goto[state].items():
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                queue.append(next_state)
+            transitions.update(self._goto[state])
+            self._goto[state] = transitions
+
+    def match(self, text: str) -> Set[str]:
+        """Find all keyword families present in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Names of the matching families
+        """
+        goto = self._goto
+        out = self._out
+
+        found: Set[str] = set()
+        state = 0
+        for char in text:
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+                if len(found) == len(self._families):
+                    break
+
+        return found
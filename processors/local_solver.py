@@ -0,0 +1,425 @@
+"""Local SymPy tier for problems that do not need Wolfram Alpha."""
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import multiprocessing
+import re
+import signal
+import string
+import threading
+import structlog
+import sympy
+from sympy.parsing.sympy_parser import (
+    parse_expr,
+    standard_transformations,
+    implicit_multiplication_application,
+    convert_xor
+)
+
+from config.settings import settings
+from utils.deadline import budget
+from .query_classifier import QueryClassifier
+from .step_engine import to_plaintext, add_step, derivative_steps, equation_steps, system_steps
+
+logger = structlog.get_logger()
+
+MAX_EXPRESSION_LENGTH = 200
+MAX_COUNTING_N = 1000
+
+_TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application, convert_xor)
+
+# Input is checked against these before it reaches SymPy's parser, which evaluates code
+_ALLOWED_CHARS_RE = re.compile(r'^[0-9a-z+\-*/^().,\s]*$')
+_IDENTIFIER_RE = re.compile(r'[a-z]+')
+_ALLOWED_FUNCTIONS = {
+    "sin", "cos", "tan", "sec", "csc", "cot",
+    "asin", "acos", "atan", "sinh", "cosh", "tanh",
+    "exp", "log", "ln", "sqrt", "pi", "abs"
+}
+
+
+class LocalSolveError(Exception):
+    """Raised when a problem cannot be solved locally."""
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """Abort the enclosed block after a number of seconds.
+
+    Uses SIGALRM, so it only applies on the main thread of a process (as
+    in pool workers); elsewhere it is a no-op and the caller's timeout is
+    the only limit.
+
+    Args:
+        seconds: Time limit
+    """
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise LocalSolveError("Local solve timed out")
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def parse_expression(text: str):
+    """Parse a whitelisted math expression with SymPy.
+
+    Args:
+        text: Expression in calculator syntax (x^2 + 3x, sin(x)/x, ...)
+
+    Returns:
+        SymPy expression
+
+    Raises:
+        LocalSolveError: If the text is not a safe, parseable expression
+    """
+    text = text.strip()
+    if not text or len(text) > MAX_EXPRESSION_LENGTH or not _ALLOWED_CHARS_RE.match(text):
+        raise LocalSolveError("Unsupported characters in expression")
+
+    for identifier in _IDENTIFIER_RE.findall(text):
+        if len(identifier) > 1 and identifier not in _ALLOWED_FUNCTIONS:
+            raise LocalSolveError(f"Unsupported name: {identifier}")
+
+    local_dict = {letter: sympy.Symbol(letter) for letter in string.ascii_lowercase}
+    local_dict.update({"e": sympy.E, "i": sympy.I, "pi": sympy.pi, "ln": sympy.log})
+
+    try:
+        return parse_expr(
+            text,
+            local_dict=local_dict,
+            transformations=_TRANSFORMATIONS,
+            evaluate=True
+        )
+    except Exception as e:
+        raise LocalSolveError(f"Could not parse expression: {e}")
+
+
+def _variable_for(expression, requested: Optional[str]):
+    """Pick the variable to operate on.
+
+    Args:
+        expression: SymPy expression
+        requested: Variable named in the query, if any
+
+    Returns:
+        SymPy symbol
+
+    Raises:
+        LocalSolveError: If the variable is ambiguous
+    """
+    if requested:
+        return sympy.Symbol(requested)
+
+    free = sorted(expression.free_symbols, key=lambda symbol: symbol.name)
+    if not free:
+        return sympy.Symbol("x")
+    if len(free) == 1:
+        return free[0]
+    if sympy.Symbol("x") in free:
+        return sympy.Symbol("x")
+    raise LocalSolveError("Ambiguous variable")
+
+
+def _render(expression, format: str) -> str:
+    """Render an answer in the requested format.
+
+    Args:
+        expression: SymPy expression
+        format: plaintext, latex or mathml
+
+    Returns:
+        Rendered answer
+    """
+    if format == "latex":
+        return sympy.latex(expression)
+    if format == "mathml":
+        return sympy.mathml(expression, printer="presentation")
+    return to_plaintext(expression)
+
+
+def _solve_derivative(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    expression = parse_expression(problem["expression"])
+    variable = _variable_for(expression, problem.get("variable"))
+    result, derivative_explanation = derivative_steps(expression, variable)
+    steps.extend(derivative_explanation)
+    return result, None
+
+
+def _solve_integral(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    expression = parse_expression(problem["expression"])
+    variable = _variable_for(expression, problem.get("variable"))
+    add_step(steps, f"Integrate with respect to {variable}", f"∫ ({to_plaintext(expression)}) d{variable}")
+
+    result = sympy.integrate(expression, variable)
+    if result.has(sympy.Integral):
+        raise LocalSolveError("No closed form found")
+
+    add_step(steps, "Add the constant of integration", f"{to_plaintext(result)} + constant")
+    return result, " + constant"
+
+
+def _solve_limit(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    expression = parse_expression(problem["expression"])
+    variable = sympy.Symbol(problem["variable"])
+    point_text = problem["point"].replace("infinity", "oo")
+    point = -sympy.oo if point_text == "-oo" else sympy.oo if point_text == "oo" else sympy.sympify(point_text)
+    add_step(steps, f"Take the limit as {variable} approaches {to_plaintext(point)}",
+             f"lim_({variable}->{to_plaintext(point)}) {to_plaintext(expression)}")
+
+    result = sympy.limit(expression, variable, point)
+    if result.has(sympy.Limit) or result is sympy.nan:
+        raise LocalSolveError("Limit could not be evaluated")
+
+    add_step(steps, "Result", f"lim_({variable}->{to_plaintext(point)}) {to_plaintext(expression)} = {to_plaintext(result)}")
+    return result, None
+
+
+def _solve_equation(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    lhs = parse_expression(problem["lhs"])
+    rhs = parse_expression(problem["rhs"])
+    try:
+        variable, solutions, equation_explanation = equation_steps(lhs, rhs)
+    except ValueError as e:
+        raise LocalSolveError(str(e))
+
+    steps.extend(equation_explanation)
+    return [sympy.Eq(variable, solution) for solution in solutions], None
+
+
+def _solve_system(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    equations = [(parse_expression(lhs), parse_expression(rhs)) for lhs, rhs in problem["equations"]]
+    try:
+        values, system_explanation = system_steps(equations)
+    except ValueError as e:
+        raise LocalSolveError(str(e))
+
+    steps.extend(system_explanation)
+    return [sympy.Eq(variable, value) for variable, value in values.items()], None
+
+
+def _solve_counting(problem: Dict[str, Any], steps: List[Dict[str, Any]]):
+    n = problem["n"]
+    k = problem.get("k", n)
+    if n > MAX_COUNTING_N or k > n:
+        raise LocalSolveError("Counting problem out of range")
+
+    kind = problem["kind"]
+    if kind == "factorial":
+        factors = " × ".join(str(i) for i in range(n, 0, -1)) if n <= 12 else f"{n} × {n - 1} × ... × 1"
+        add_step(steps, "Multiply the integers from 1 to n", f"{n}! = {factors}")
+        result = sympy.factorial(n)
+    elif kind == "permutation":
+        add_step(steps, "Count ordered arrangements", f"P({n}, {k}) = {n}!/({n} - {k})!")
+        result = sympy.factorial(n) / sympy.factorial(n - k)
+    else:
+        add_step(steps, "Count unordered selections", f"C({n}, {k}) = {n}!/({k}! ({n} - {k})!)")
+        result = sympy.binomial(n, k)
+
+    add_step(steps, "Result", str(result))
+    return result, None
+
+
+_SOLVERS = {
+    "derivative": _solve_derivative,
+    "integral": _solve_integral,
+    "limit": _solve_limit,
+    "equation": _solve_equation,
+    "system": _solve_system,
+    "factorial": _solve_counting,
+    "permutation": _solve_counting,
+    "combination": _solve_counting
+}
+
+# Kinds whose steps come from the rule-based step engine
+_EXPLAINED_KINDS = {"derivative", "equation", "system"}
+
+_classifier = QueryClassifier()
+
+
+def solve_problem(problem: Dict[str, Any], format: str, time_limit: float) -> Dict[str, Any]:
+    """Solve a recognized problem with SymPy.
+
+    Module-level so it can be pickled into worker processes.
+
+    Args:
+        problem: Problem from QueryClassifier.local_problem
+        format: Output format (plaintext, latex, mathml)
+        time_limit: Seconds allowed for parsing and solving
+
+    Returns:
+        Result with "success" and either "final_answer"/"steps" or "error"
+    """
+    steps: List[Dict[str, Any]] = []
+    try:
+        with _time_limit(time_limit):
+            result, suffix = _SOLVERS[problem["kind"]](problem, steps)
+            if isinstance(result, list):
+                answer = ", ".join(_render(item, format) for item in result)
+            else:
+                answer = _render(result, format)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    return {
+        "success": True,
+        "final_answer": answer + (suffix or ""),
+        "steps": steps
+    }
+
+
+class LocalSolver:
+    """Solve recognized problems with SymPy in a worker pool.
+
+    Any failure (unparseable input, unsupported shape, timeout, saturated
+    pool) returns None so the caller falls through to Wolfram.
+    """
+
+    def __init__(self, workers: int, timeout: float, max_pending: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._executor is not None:
+            return
+
+        # Spawn rather than fork: the parent has a running event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        # Spawn the workers and pay for importing SymPy before the first request
+        for _ in range(self.workers):
+            self._executor.submit(solve_problem, {"kind": "derivative", "expression": "x^2"}, "plaintext", self.timeout)
+        logger.info("Local solver pool started", workers=self.workers)
+
+    def stop(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        logger.info("Local solver pool stopped")
+
+    def accepts(self, format: str) -> bool:
+        """Check whether the local tier handles a request format.
+
+        Args:
+            format: Output format for mathematical expressions
+
+        Returns:
+            True if solve will attempt problems in this format
+        """
+        return settings.local_solver_enabled and format != "image"
+
+    async def _run(self, problem: Dict[str, Any], format: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Run solve_problem in the worker pool under the request deadline.
+
+        Args:
+            problem: Problem from QueryClassifier.local_problem
+            format: Output format
+            stage: Stage name for logs and the deadline error
+
+        Returns:
+            Outcome from solve_problem, or None if the pool is saturated,
+            the call timed out or it raised
+        """
+        if self._pending >= self.max_pending:
+            logger.info("Local solver saturated", stage=stage, pending=self._pending)
+            return None
+
+        self._pending += 1
+        try:
+            if self._executor is None:
+                # Only before start(), e.g. in scripts: threads ignore the time limit
+                call = asyncio.to_thread(solve_problem, problem, format, self.timeout)
+            else:
+                loop = asyncio.get_running_loop()
+                call = loop.run_in_executor(self._executor, solve_problem, problem, format, self.timeout)
+            # Small margin over the in-worker limit for pickling and scheduling
+            return await asyncio.wait_for(call, budget(self.timeout + 0.5, stage))
+        except Exception as e:
+            logger.info("Local solver call failed", stage=stage, kind=problem["kind"], error=str(e) or type(e).__name__)
+            return None
+        finally:
+            self._pending -= 1
+
+    async def solve(
+        self,
+        problem: Dict[str, Any],
+        original_query: str,
+        format: str = "plaintext"
+    ) -> Optional[Dict[str, Any]]:
+        """Solve a problem locally.
+
+        Args:
+            problem: Problem from QueryClassifier.local_problem
+            original_query: Original user query
+            format: Output format for mathematical expressions
+
+        Returns:
+            Result in the normalized Wolfram result shape, or None to fall through
+        """
+        if not self.accepts(format):
+            return None
+
+        outcome = await self._run(problem, format, "local_solve")
+        if outcome is None:
+            return None
+        if not outcome["success"]:
+            logger.info("Local solve failed, using Wolfram", kind=problem["kind"], error=outcome["error"])
+            return None
+
+        logger.info("Solved locally", kind=problem["kind"])
+        return {
+            "original_query": original_query,
+            "success": True,
+            "final_answer": outcome["final_answer"],
+            "steps": outcome["steps"],
+            "visualizations": [],
+            "error": None,
+            "source": "sympy"
+        }
+
+    async def explain(self, query: str) -> List[Dict[str, Any]]:
+        """Generate step-by-step working for a routine problem.
+
+        Runs the step engine in the worker pool, bounded like solve.
+
+        Args:
+            query: Problem text
+
+        Returns:
+            Steps, or an empty list if the problem is not one the step
+            engine explains or it could not be explained in time
+        """
+        problem = _classifier.local_problem(query)
+        if problem is None or problem["kind"] not in _EXPLAINED_KINDS:
+            return []
+
+        outcome = await self._run(problem, "plaintext", "step_engine")
+        if outcome is None or not outcome["success"]:
+            return []
+        return outcome["steps"]
+
+
+# Process-wide solver, started and stopped by the application lifespan
+local_solver = LocalSolver(
+    workers=settings.local_solver_workers,
+    timeout=settings.local_solver_timeout,
+    max_pending=settings.local_solver_max_pending
+)
@@ -0,0 +1,146 @@
+"""Process pool for running Tesseract OCR off the event loop."""
+from typing import Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import asyncio
+import multiprocessing
+import structlog
+from PIL import Image
+import pytesseract
+
+from config.settings import settings
+
+logger = structlog.get_logger()
+
+OCR_CONFIG = '--psm 6 -c tessedit_char_whitelist=0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ+-*/=()[]{}.,^_∫∑∏√∞αβγδεζηθικλμνξοπρστυφχψω'
+
+# Black/white threshold as a lookup table (applied in C, unlike a per-pixel lambda)
+OCR_THRESHOLD = 127
+_THRESHOLD_TABLE = [255 if value > OCR_THRESHOLD else 0 for value in range(256)]
+
+
+class OCRPoolSaturated(Exception):
+    """Raised when too many OCR jobs are already queued."""
+
+
+def preprocess_for_ocr(image: Image.Image) -> Image.Image:
+    """Preprocess image for better OCR results.
+
+    Args:
+        image: PIL Image
+
+    Returns:
+        Preprocessed image
+    """
+    # Convert to grayscale
+    if image.mode != 'L':
+        image = image.convert('L')
+
+    # Resize if too small
+    width, height = image.size
+    if width < 1000:
+        scale = 1000 / width
+        new_size = (int(width * scale), int(height * scale))
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    # Apply threshold to get black and white
+    return image.point(_THRESHOLD_TABLE)
+
+
+def run_ocr(image_data: bytes) -> Dict[str, Any]:
+    """Decode, preprocess and OCR an image.
+
+    Module-level so it can be pickled into worker processes.
+
+    Args:
+        image_data: Encoded image bytes
+
+    Returns:
+        OCR result
+    """
+    try:
+        image = Image.open(BytesIO(image_data))
+        image = preprocess_for_ocr(image)
+        text = pytesseract.image_to_string(image, config=OCR_CONFIG)
+
+        return {
+            "success": bool(text.strip()),
+            "text": text.strip()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "text": None,
+            "error": str(e)
+        }
+
+
+class OCRWorkerPool:
+    """Bounded process pool for OCR jobs.
+
+    Jobs beyond max_pending (running plus queued) are rejected with
+    OCRPoolSaturated instead of queueing without limit.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._executor is not None:
+            return
+
+        # Spawn rather than fork: the parent has a running event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info("OCR worker pool started", workers=self.workers, max_pending=self.max_pending)
+
+    def stop(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        logger.info("OCR worker pool stopped")
+
+    @property
+    def pending(self) -> int:
+        """Number of OCR jobs running or queued."""
+        return self._pending
+
+    async def extract(self, image_data: bytes) -> Dict[str, Any]:
+        """Run OCR on an image in a worker process.
+
+        Args:
+            image_data: Encoded image bytes
+
+        Returns:
+            OCR result
+
+        Raises:
+            OCRPoolSaturated: If max_pending jobs are already in flight
+        """
+        if self._pending >= self.max_pending:
+            raise OCRPoolSaturated(f"OCR queue is full ({self.max_pending} jobs pending)")
+
+        self._pending += 1
+        try:
+            if self._executor is None:
+                # Pool not started (e.g. outside the app lifespan): keep the loop free anyway
+                return await asyncio.to_thread(run_ocr, image_data)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, run_ocr, image_data)
+        finally:
+            self._pending -= 1
+
+
+# Process-wide pool, started and stopped by the application lifespan
+ocr_pool = OCRWorkerPool(workers=settings.ocr_workers, max_pending=settings.ocr_max_pending)
@@ -4,8 +4,58 @@ import re
 import structlog
 from enum import Enum
 
+from .keyword_matcher import KeywordMatcher
+
 logger = structlog.get_logger()
 
+# Precompiled patterns (classification runs on every request)
+_SIMPLE_CALCULATION_RE = re.compile(
+    r'^(?:'
+    r'\d+[\s\+\-\*/\^]+\d+'  # Basic arithmetic
+    r'|\d+\s*\*\s*10\^\d+'  # Scientific notation
+    r'|sqrt\('  # Square root
+    r'|log\('  # Logarithm
+    r')'
+)
+_PLOT_FUNCTION_RE = re.compile(r'y\s*=\s*(.+)')
+_SYSTEM_PREFIX_RE = re.compile(r'^.*?system:?\s*', re.IGNORECASE)
+_AND_SEPARATOR_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+_SINGLE_LETTER_RE = re.compile(r'\b[a-zA-Z]\b')
+_LOWERCASE_VARIABLE_RE = re.compile(r'\b[a-z]\b')
+_PLOT_RANGE_RE = re.compile(r'from|between|\d+\s*to\s*\d+')
+
+# Problem shapes the local SymPy tier can solve (matched against lowercased text)
+_LOCAL_PREFIX_RE = re.compile(r'^(?:what is|find|compute|calculate|evaluate|determine|solve|please)\s+(?:the\s+)?')
+_LOCAL_DERIVATIVE_RE = re.compile(
+    r'^(?:derivative|differentiate)(?:\s+of)?\s+(?P<expression>.+?)'
+    r'(?:\s+with respect to\s+(?P<variable>[a-z]))?$'
+)
+_LOCAL_INTEGRAL_RE = re.compile(
+    r'^(?:integrate|integral of|indefinite integral of|antiderivative of)\s+(?P<expression>.+?)'
+    r'(?:\s*d(?P<variable>[a-z]))?$'
+)
+_LOCAL_LIMIT_RE = re.compile(
+    r'^limit\s+(?:as\s+)?(?P<variable>[a-z])\s+(?:approaches|->|goes to|tends to)\s+'
+    r'(?P<point>-?\d+(?:\.\d+)?|-?infinity|-?oo)\s+of\s+(?P<expression>.+)$'
+)
+_LOCAL_EQUATION_RE = re.compile(
+    r'^(?P<lhs>[^=]+?)\s*=\s*(?P<rhs>[^=]+?)'
+    r'(?:\s+(?:for\s+[a-z]|using the quadratic formula|by factoring))?$'
+)
+_LOCAL_SYSTEM_PREFIX_RE = re.compile(r'^(?:the\s+)?(?:system(?:\s+of\s+equations)?|simultaneous equations)\s*:?\s*')
+_LOCAL_SYSTEM_SEPARATOR_RE = re.compile(r'\s*(?:,|;|\band\b)\s*')
+_LOCAL_FACTORIAL_RE = re.compile(r'^(?:factorial of\s+)?(?P<n>\d+)\s*!?$')
+_LOCAL_ARRANGE_RE = re.compile(r'^how many ways can you arrange\s+(?P<n>\d+)\b')
+_LOCAL_PERMUTATION_RE = re.compile(
+    r'^(?:p\(\s*(?P<n1>\d+)\s*,\s*(?P<k1>\d+)\s*\)'
+    r'|(?:number of )?permutations of\s+(?P<k2>\d+)\s+(?:items\s+)?(?:from|out of)\s+(?P<n2>\d+))$'
+)
+_LOCAL_COMBINATION_RE = re.compile(
+    r'^(?:how many ways can you\s+)?(?:choose|select|pick)\s+(?P<k1>\d+)\s+(?:\w+\s+)?(?:from|out of)\s+(?P<n1>\d+)'
+    r'|^(?P<n2>\d+)\s+choose\s+(?P<k2>\d+)$'
+    r'|^c\(\s*(?P<n3>\d+)\s*,\s*(?P<k3>\d+)\s*\)$'
+)
+
 
 class QueryType(Enum):
     """Types of mathematical queries."""
@@ -65,6 +115,18 @@ class QueryClassifier:
             "complex plane", "∮", "line integral", "path integral", "branch cut"
         ]
         
+        self.equation_keywords = ["equation", "solve for"]
+        
+        # One automaton over every family: a single pass per query
+        self._matcher = KeywordMatcher({
+            "plot": self.plot_keywords,
+            "step": self.step_keywords,
+            "complex_analysis": self.complex_analysis_keywords,
+            "engineering": self.engineering_keywords,
+            "calculus": self.calculus_keywords,
+            "equation": self.equation_keywords
+        })
+        
     def classify_query(self, query: str) -> Tuple[QueryType, WolframAPI]:
         """Classify query and determine appropriate API.
         
@@ -74,33 +136,30 @@ class QueryClassifier:
         Returns:
             Tuple of (QueryType, WolframAPI)
         """
-        query_lower = query.lower()
+        matches = self._matcher.match(query.lower())
         
         # Check for plotting requests
-        if self._contains_keywords(query_lower, self.plot_keywords):
+        if "plot" in matches:
             return QueryType.PLOTTING, WolframAPI.LANGUAGE_EVAL
             
         # Check for step-by-step requests
-        if self._contains_keywords(query_lower, self.step_keywords):
+        if "step" in matches:
             return QueryType.STEP_BY_STEP_MATH, WolframAPI.SHOW_STEPS
             
         # Check for complex analysis (highest priority for advanced topics)
-        if self._contains_keywords(query_lower, self.complex_analysis_keywords):
+        if "complex_analysis" in matches:
             return QueryType.COMPLEX_ANALYSIS, WolframAPI.FULL_RESULTS
             
         # Check for engineering/physics
-        if self._contains_keywords(query_lower, self.engineering_keywords):
+        if "engineering" in matches:
             return QueryType.PHYSICS_ENGINEERING, WolframAPI.LLM
             
-        # Check for calculus
-        if self._contains_keywords(query_lower, self.calculus_keywords):
-            if any(word in query_lower for word in self.step_keywords):
-                return QueryType.STEP_BY_STEP_MATH, WolframAPI.SHOW_STEPS
-            else:
-                return QueryType.SYMBOLIC_MATH, WolframAPI.FULL_RESULTS
+        # Check for calculus (step requests were already routed above)
+        if "calculus" in matches:
+            return QueryType.SYMBOLIC_MATH, WolframAPI.FULL_RESULTS
                 
         # Check for equation solving
-        if "=" in query or self._contains_keywords(query_lower, ["equation", "solve for"]):
+        if "=" in query or "equation" in matches:
             # Use full results for systems of equations to get proper solutions
             if self._is_system_of_equations(query):
                 return QueryType.EQUATION_SOLVING, WolframAPI.FULL_RESULTS
@@ -114,18 +173,6 @@ class QueryClassifier:
         # Default to natural language
         return QueryType.NATURAL_LANGUAGE, WolframAPI.LLM
         
-    def _contains_keywords(self, text: str, keywords: List[str]) -> bool:
-        """Check if text contains any keywords.
-        
-        Args:
-            text: Text to check
-            keywords: List of keywords
-            
-        Returns:
-            True if any keyword found
-        """
-        return any(keyword in text for keyword in keywords)
-        
     def _is_simple_calculation(self, query: str) -> bool:
         """Check if query is a simple calculation.
         
@@ -135,15 +182,7 @@ class QueryClassifier:
         Returns:
             True if simple calculation
         """
-        # Pattern for simple math expressions
-        simple_patterns = [
-            r'^\d+[\s\+\-\*/\^]+\d+',  # Basic arithmetic
-            r'^\d+\s*\*\s*10\^\d+',  # Scientific notation
-            r'^sqrt\(',  # Square root
-            r'^log\(',  # Logarithm
-        ]
-        
-        return any(re.search(pattern, query.strip()) for pattern in simple_patterns)
+        return _SIMPLE_CALCULATION_RE.match(query.strip()) is not None
         
     def get_api_params(
         self, 
@@ -177,7 +216,106 @@ class QueryClassifier:
                 params["output_format"] = "string"
                 
         return params
-        
+
+    def predicts_steps(self, query_type: QueryType, api_type: WolframAPI) -> bool:
+        """Check if a Full Results query is likely to have step-by-step solutions.
+
+        Used to request the step-by-step pod state up front instead of
+        making a second Show Steps call after the first response arrives.
+
+        Args:
+            query_type: Type of query
+            api_type: API to use
+
+        Returns:
+            True if step-by-step pod states should be requested
+        """
+        if api_type != WolframAPI.FULL_RESULTS:
+            return False
+
+        return query_type in (
+            QueryType.SYMBOLIC_MATH,
+            QueryType.STEP_BY_STEP_MATH,
+            QueryType.EQUATION_SOLVING
+        )
+
+    def local_problem(self, query: str) -> Optional[Dict[str, Any]]:
+        """Recognize problems the local SymPy tier can solve.
+
+        Only the problem shape is recognized here; whether the expression
+        parses is decided by the local solver, which falls through to
+        Wolfram when it cannot answer.
+
+        Args:
+            query: User query
+
+        Returns:
+            Problem description with a "kind" key, or None
+        """
+        text = query.strip().lower().rstrip("?. ")
+        text = _LOCAL_PREFIX_RE.sub("", text)
+
+        if text.startswith(("derivative", "differentiate")):
+            match = _LOCAL_DERIVATIVE_RE.match(text)
+            if match:
+                return {"kind": "derivative", **match.groupdict()}
+
+        if text.startswith(("integrate", "integral", "indefinite", "antiderivative")):
+            if " from " in text:
+                return None  # Definite integrals go to Wolfram
+            match = _LOCAL_INTEGRAL_RE.match(text)
+            if match:
+                return {"kind": "integral", **match.groupdict()}
+
+        if text.startswith("limit"):
+            match = _LOCAL_LIMIT_RE.match(text)
+            if match:
+                return {"kind": "limit", **match.groupdict()}
+
+        if text.count("=") in (2, 3):
+            equations = [
+                part.split("=")
+                for part in _LOCAL_SYSTEM_SEPARATOR_RE.split(_LOCAL_SYSTEM_PREFIX_RE.sub("", text))
+            ]
+            if all(len(equation) == 2 and all(side.strip() for side in equation) for equation in equations):
+                return {
+                    "kind": "system",
+                    "equations": [[lhs.strip(), rhs.strip()] for lhs, rhs in equations]
+                }
+
+        if text.count("=") == 1 and not self._is_system_of_equations(query):
+            match = _LOCAL_EQUATION_RE.match(text)
+            if match:
+                return {"kind": "equation", **match.groupdict()}
+
+        match = _LOCAL_FACTORIAL_RE.match(text)
+        if match and ("!" in text or "factorial" in text):
+            return {"kind": "factorial", "n": int(match.group("n"))}
+
+        match = _LOCAL_ARRANGE_RE.match(text)
+        if match:
+            return {"kind": "permutation", "n": int(match.group("n")), "k": int(match.group("n"))}
+
+        match = _LOCAL_PERMUTATION_RE.match(text)
+        if match:
+            groups = match.groupdict()
+            return {
+                "kind": "permutation",
+                "n": int(groups["n1"] or groups["n2"]),
+                "k": int(groups["k1"] or groups["k2"])
+            }
+
+        match = _LOCAL_COMBINATION_RE.match(text)
+        if match:
+            groups = match.groupdict()
+            return {
+                "kind": "combination",
+                "n": int(groups["n1"] or groups["n2"] or groups["n3"]),
+                "k": int(groups["k1"] or groups["k2"] or groups["k3"])
+            }
+
+        return None
+
     def preprocess_for_api(
         self,
         query: str,
@@ -213,7 +351,7 @@ class QueryClassifier:
                 # Ensure proper Plot syntax
                 if not processed.startswith(("Plot", "Plot3D")):
                     # Extract function and add Plot command
-                    match = re.search(r'y\s*=\s*(.+)', processed)
+                    match = _PLOT_FUNCTION_RE.search(processed)
                     if match:
                         processed = f"Plot[{match.group(1)}, {{x, -10, 10}}]"
 
@@ -248,17 +386,15 @@ class QueryClassifier:
         Returns:
             Formatted query for Wolfram
         """
-        import re
-
         # Extract equations from query
         # Remove "Solve the system:" or similar prefixes
-        clean_query = re.sub(r'^.*?system:?\s*', '', query, flags=re.IGNORECASE).strip()
+        clean_query = _SYSTEM_PREFIX_RE.sub('', query).strip()
 
         # Split equations by comma or 'and'
         if ',' in clean_query:
             equations = [eq.strip() for eq in clean_query.split(',')]
         elif ' and ' in clean_query.lower():
-            equations = [eq.strip() for eq in re.split(r'\s+and\s+', clean_query, flags=re.IGNORECASE)]
+            equations = [eq.strip() for eq in _AND_SEPARATOR_RE.split(clean_query)]
         else:
             # Single equation with multiple = signs
             equations = [eq.strip() for eq in clean_query.split('=') if eq.strip()]
@@ -272,7 +408,7 @@ class QueryClassifier:
         for eq in equations:
             if '=' in eq:
                 # Find variables in equation
-                vars_in_eq = re.findall(r'\b[a-zA-Z]\b', eq)
+                vars_in_eq = _SINGLE_LETTER_RE.findall(eq)
                 variables.update(vars_in_eq)
 
                 # Replace single = with == for Wolfram syntax
@@ -311,15 +447,15 @@ class QueryClassifier:
             if equals_count > 1 or has_system_keywords:
                 pass  # Systems don't need variable clarification
             # Check for ambiguous variable names only for single equations
-            elif re.search(r'\b[a-z]\b', query):
-                variables = re.findall(r'\b[a-z]\b', query)
+            else:
+                variables = _LOWERCASE_VARIABLE_RE.findall(query)
                 if len(set(variables)) > 1:
                     clarifications.append(
                         f"Which variable should I solve for: {', '.join(set(variables))}?"
                     )
 
         # Check for missing ranges in plots
-        if "plot" in query.lower() and not re.search(r'from|between|\d+\s*to\s*\d+', query):
+        if "plot" in query.lower() and not _PLOT_RANGE_RE.search(query):
             clarifications.append(
                 "What range would you like for the plot? (e.g., from -10 to 10)"
             )
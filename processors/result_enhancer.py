@@ -1,76 +1,363 @@
 """Result enhancement processor for educational content."""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Awaitable, AsyncIterator
+import asyncio
 import structlog
 import json
 
 from api.groq import GroqClient
+from api.registry import llm_clients
+from config.settings import settings
+from .enrichment_cache import enrichment_cache
+from utils.tracing import span
+from utils.deadline import DeadlineExceeded, budget, has_time_for
 
 logger = structlog.get_logger()
 
+# Sections stream_enhancement yields after the answer, in order
+STREAMED_SECTIONS = ("explanation", "concepts", "educational_content", "practice_problems")
+
+
+async def _skipped(value: Any) -> Any:
+    """Stand in for a branch that was not requested.
+
+    Args:
+        value: Value to return
+
+    Returns:
+        The value
+    """
+    return value
+
 
 class ResultEnhancer:
     """Enhance Wolfram results with educational content."""
 
-    def __init__(self):
-        self.groq_client = GroqClient()
+    @property
+    def groq_client(self) -> GroqClient:
+        """Shared Groq client from the app registry."""
+        return llm_clients.groq
         
     async def enhance_result(
         self,
         wolfram_result: Dict[str, Any],
         original_query: str,
         student_level: str = "undergraduate",
-        include_educational: bool = True
+        include_educational: bool = True,
+        include_practice: bool = True
     ) -> Dict[str, Any]:
         """Enhance Wolfram result with explanations and educational content.
+
+        Only concept extraction depends on another generation (the
+        explanation); every other branch runs concurrently, each under its
+        own timeout. Branches that fail or time out fall back to defaults
+        and are listed in "incomplete_sections". Complete results are cached
+        per canonical problem, so repeats make no LLM calls.
         
         Args:
             wolfram_result: Raw Wolfram API result
             original_query: Original user query
             student_level: Educational level
             include_educational: Whether to include educational content
+            include_practice: Whether to generate practice problems
             
         Returns:
             Enhanced result
         """
-        # Get basic enhancement
-        enhancement = await self.groq_client.enhance_wolfram_result(
-            wolfram_result,
+        cache_key, variables = enrichment_cache.make_key(
             original_query,
-            student_level
+            student_level,
+            include_educational,
+            include_practice
         )
+        cached = await enrichment_cache.get(cache_key, variables)
+        if cached is not None:
+            return {
+                "original_query": original_query,
+                "wolfram_result": wolfram_result,
+                **cached,
+                "incomplete_sections": []
+            }
+
+        incomplete: List[str] = []
+        difficulty = self.groq_client._assess_difficulty(original_query)
+
+        branches = [
+            self._generate_explanation_and_concepts(
+                wolfram_result,
+                original_query,
+                student_level,
+                incomplete
+            ),
+            self._run_branch(
+                "practice_problems",
+                self._generate_practice_problems(original_query, wolfram_result, difficulty),
+                [],
+                incomplete,
+                optional=True
+            ) if include_practice else _skipped([])
+        ]
+        if include_educational:
+            branches.append(
+                self._generate_educational_content(
+                    wolfram_result,
+                    original_query,
+                    student_level,
+                    incomplete
+                )
+            )
+
+        results = await asyncio.gather(*branches)
+        (explanation, concepts), practice_problems = results[0], results[1]
         
         # Build complete enhanced result
         enhanced_result = {
             "original_query": original_query,
             "wolfram_result": wolfram_result,
-            "explanation": enhancement.get("explanation", ""),
-            "concepts": enhancement.get("concepts", []),
-            "difficulty": enhancement.get("difficulty_level", "intermediate"),
-            "prerequisites": enhancement.get("prerequisites", [])
+            "explanation": explanation,
+            "concepts": concepts,
+            "difficulty": difficulty,
+            "prerequisites": await self.groq_client._identify_prerequisites(original_query)
         }
         
         # Add educational content if requested
         if include_educational:
-            enhanced_result["educational_content"] = await self._generate_educational_content(
+            enhanced_result["educational_content"] = results[2]
+            
+        # Add practice problems if requested
+        if include_practice:
+            enhanced_result["practice_problems"] = practice_problems
+        enhanced_result["incomplete_sections"] = incomplete
+
+        await enrichment_cache.store(cache_key, variables, enhanced_result)
+        
+        return enhanced_result
+
+    async def stream_enhancement(
+        self,
+        wolfram_result: Dict[str, Any],
+        original_query: str,
+        student_level: str = "undergraduate"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Enhance a result, yielding each part as soon as it is ready.
+
+        Educational content and practice problems are generated in the
+        background while the explanation streams token by token. If no token
+        arrives within llm_stream_idle_timeout (or the request deadline), an
+        error event is yielded and enhancement stops.
+
+        Args:
+            wolfram_result: Raw Wolfram API result
+            original_query: Original user query
+            student_level: Educational level
+
+        Yields:
+            Tuples of (event name, payload)
+        """
+        cache_key, variables = enrichment_cache.make_key(original_query, student_level, True)
+        cached = await enrichment_cache.get(cache_key, variables)
+        if cached is not None:
+            yield "explanation_delta", {"delta": cached["explanation"]}
+            yield "explanation", {"explanation": cached["explanation"]}
+            yield "concepts", {
+                "concepts": cached["concepts"],
+                "difficulty": cached["difficulty"],
+                "prerequisites": cached["prerequisites"]
+            }
+            yield "educational_content", cached["educational_content"]
+            yield "practice_problems", {
+                "practice_problems": cached["practice_problems"],
+                "incomplete_sections": []
+            }
+            return
+
+        incomplete: List[str] = []
+        difficulty = self.groq_client._assess_difficulty(original_query)
+
+        educational_task = asyncio.create_task(
+            self._generate_educational_content(wolfram_result, original_query, student_level, incomplete)
+        )
+        practice_task = asyncio.create_task(
+            self._run_branch(
+                "practice_problems",
+                self._generate_practice_problems(original_query, wolfram_result, difficulty),
+                [],
+                incomplete,
+                optional=True
+            )
+        )
+
+        try:
+            explanation_parts: List[str] = []
+            stream = self.groq_client.stream_explanation(
                 wolfram_result,
                 original_query,
                 student_level
             )
+            try:
+                while True:
+                    # A stalled stream would otherwise hold the response open
+                    # until the client gives up
+                    try:
+                        delta = await asyncio.wait_for(
+                            stream.__anext__(),
+                            budget(settings.llm_stream_idle_timeout, "explanation")
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except (asyncio.TimeoutError, DeadlineExceeded):
+                        logger.warning("Explanation stream stalled", partial_length=len(explanation_parts))
+                        yield "error", {
+                            "error": "Explanation stream timed out",
+                            "incomplete_sections": list(STREAMED_SECTIONS)
+                        }
+                        return
+                    explanation_parts.append(delta)
+                    yield "explanation_delta", {"delta": delta}
+                    # Truncate rather than overrun the request deadline
+                    if not has_time_for(0):
+                        logger.info("Explanation truncated, deadline reached")
+                        incomplete.append("explanation")
+                        break
+            except Exception as e:
+                logger.warning("Enhancement branch failed", branch="explanation", error=str(e))
+                incomplete.append("explanation")
+            finally:
+                await stream.aclose()
+
+            explanation = "".join(explanation_parts)
+            if not explanation:
+                explanation = self.groq_client._fallback_explanation(wolfram_result)
+                yield "explanation_delta", {"delta": explanation}
+            yield "explanation", {"explanation": explanation}
+
+            concepts = await self._run_branch(
+                "concepts",
+                self.groq_client._extract_concepts(wolfram_result, explanation),
+                [],
+                incomplete
+            )
+            prerequisites = await self.groq_client._identify_prerequisites(original_query)
+            yield "concepts", {
+                "concepts": concepts,
+                "difficulty": difficulty,
+                "prerequisites": prerequisites
+            }
+
+            educational_content = await educational_task
+            yield "educational_content", educational_content
+
+            practice_problems = await practice_task
+            yield "practice_problems", {
+                "practice_problems": practice_problems,
+                "incomplete_sections": incomplete
+            }
+
+            await enrichment_cache.store(cache_key, variables, {
+                "explanation": explanation,
+                "concepts": concepts,
+                "difficulty": difficulty,
+                "prerequisites": prerequisites,
+                "educational_content": educational_content,
+                "practice_problems": practice_problems,
+                "incomplete_sections": incomplete
+            })
+
+        finally:
+            # Stop background generations if the client disconnected early
+            for task in (educational_task, practice_task):
+                if not task.done():
+                    task.cancel()
+
+    async def _run_branch(
+        self,
+        name: str,
+        coro: Awaitable[Any],
+        fallback: Any,
+        incomplete: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        optional: bool = False
+    ) -> Any:
+        """Await one enhancement branch under a timeout.
+
+        The timeout is capped by the request deadline. Optional branches are
+        skipped outright when less than deadline_optional_min remains.
+
+        Args:
+            name: Branch name used in logs and the incomplete list
+            coro: Generation to await
+            fallback: Value returned if the branch fails, times out or is skipped
+            incomplete: List collecting names of branches that fell back
+            timeout: Timeout in seconds (defaults to the configured branch timeout)
+            optional: Whether the branch may be skipped when the deadline is near
+
+        Returns:
+            Branch result or fallback
+        """
+        try:
+            if optional and not has_time_for(settings.deadline_optional_min):
+                raise DeadlineExceeded(f"enhance.{name}")
+            branch_timeout = budget(timeout or settings.enhancement_branch_timeout, f"enhance.{name}")
+
+            with span(f"enhance.{name}"):
+                return await asyncio.wait_for(coro, branch_timeout)
+        except DeadlineExceeded:
+            # The generation never started; close it so it is not reported as never awaited
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            logger.info("Enhancement branch skipped, deadline near", branch=name)
+        except asyncio.TimeoutError:
+            logger.warning("Enhancement branch timed out", branch=name)
+        except Exception as e:
+            logger.warning("Enhancement branch failed", branch=name, error=str(e))
+
+        if incomplete is not None:
+            incomplete.append(name)
+        return fallback
+
+    async def _generate_explanation_and_concepts(
+        self,
+        wolfram_result: Dict[str, Any],
+        original_query: str,
+        student_level: str,
+        incomplete: Optional[List[str]] = None
+    ) -> Tuple[str, List[str]]:
+        """Generate the explanation, then extract concepts from it.
+        
+        Args:
+            wolfram_result: Wolfram result
+            original_query: Original query
+            student_level: Student level
+            incomplete: List collecting names of branches that fell back
             
-        # Add practice problems
-        enhanced_result["practice_problems"] = await self._generate_practice_problems(
-            original_query,
-            wolfram_result,
-            enhanced_result["difficulty"]
+        Returns:
+            Tuple of (explanation, concepts)
+        """
+        explanation = await self._run_branch(
+            "explanation",
+            self.groq_client.explain_wolfram_result(wolfram_result, original_query, student_level),
+            None,
+            incomplete
         )
-        
-        return enhanced_result
+        if explanation is None:
+            return (
+                self.groq_client._fallback_explanation(wolfram_result),
+                ["equation solving", "algebra", "inverse operations"]
+            )
+
+        concepts = await self._run_branch(
+            "concepts",
+            self.groq_client._extract_concepts(wolfram_result, explanation),
+            [],
+            incomplete
+        )
+        return explanation, concepts
         
     async def _generate_educational_content(
         self,
         wolfram_result: Dict[str, Any],
         original_query: str,
-        student_level: str
+        student_level: str,
+        incomplete: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Generate educational content.
         
@@ -78,18 +365,11 @@ class ResultEnhancer:
             wolfram_result: Wolfram result
             original_query: Original query
             student_level: Student level
+            incomplete: List collecting names of branches that fell back
             
         Returns:
             Educational content
         """
-        content = {
-            "summary": "",
-            "key_insights": [],
-            "common_mistakes": [],
-            "tips": [],
-            "real_world_applications": []
-        }
-        
         # Generate summary
         summary_prompt = f"""Create a brief summary (2-3 sentences) of this {student_level}-level 
         math problem and its solution:
@@ -101,45 +381,51 @@ class ResultEnhancer:
             {"role": "system", "content": "You are a concise math educator."},
             {"role": "user", "content": summary_prompt}
         ]
-        
-        try:
-            # Generate summary with better error handling
-            try:
-                summary = await self.groq_client.complete(messages, temperature=0.5, max_completion_tokens=150)
-                content["summary"] = summary.strip() if summary else ""
-            except Exception as e:
-                logger.warning("Failed to generate summary", error=str(e))
-                content["summary"] = f"This is a {student_level}-level math problem involving equation solving."
-
-            # Generate other educational content with individual error handling
-            try:
-                content["key_insights"] = await self._generate_key_insights(wolfram_result, original_query)
-            except Exception as e:
-                logger.warning("Failed to generate key insights", error=str(e))
-                content["key_insights"] = ["Solving equations involves isolating the variable using inverse operations."]
 
-            try:
-                content["common_mistakes"] = await self._generate_common_mistakes(original_query)
-            except Exception as e:
-                logger.warning("Failed to generate common mistakes", error=str(e))
-                content["common_mistakes"] = ["Forgetting to perform the same operation on both sides of the equation."]
-
-            try:
-                content["tips"] = await self._generate_tips(original_query, wolfram_result)
-            except Exception as e:
-                logger.warning("Failed to generate tips", error=str(e))
-                content["tips"] = ["Always check your solution by substituting it back into the original equation."]
+        summary, key_insights, common_mistakes, tips, applications = await asyncio.gather(
+            self._run_branch(
+                "summary",
+                self.groq_client.complete(messages, temperature=0.5, max_completion_tokens=150),
+                None,
+                incomplete
+            ),
+            self._run_branch(
+                "key_insights",
+                self._generate_key_insights(wolfram_result, original_query),
+                ["Solving equations involves isolating the variable using inverse operations."],
+                incomplete
+            ),
+            self._run_branch(
+                "common_mistakes",
+                self._generate_common_mistakes(original_query),
+                ["Forgetting to perform the same operation on both sides of the equation."],
+                incomplete
+            ),
+            self._run_branch(
+                "tips",
+                self._generate_tips(original_query, wolfram_result),
+                ["Always check your solution by substituting it back into the original equation."],
+                incomplete
+            ),
+            self._run_branch(
+                "real_world_applications",
+                self._generate_applications(original_query),
+                ["Equation solving is used in physics, engineering, and financial calculations."],
+                incomplete,
+                optional=True
+            )
+        )
 
-            try:
-                content["real_world_applications"] = await self._generate_applications(original_query)
-            except Exception as e:
-                logger.warning("Failed to generate applications", error=str(e))
-                content["real_world_applications"] = ["Equation solving is used in physics, engineering, and financial calculations."]
+        if summary is None:
+            summary = f"This is a {student_level}-level math problem involving equation solving."
 
-        except Exception as e:
-            logger.error("Failed to generate educational content", error=str(e))
-            
-        return content
+        return {
+            "summary": summary.strip(),
+            "key_insights": key_insights,
+            "common_mistakes": common_mistakes,
+            "tips": tips,
+            "real_world_applications": applications
+        }
         
     def _extract_solution(self, wolfram_result: Dict[str, Any]) -> str:
         """Extract solution from Wolfram result.
@@ -0,0 +1,389 @@
+"""Rule-based step-by-step solutions for routine problems, built on SymPy.
+
+Steps use the same {step_number, description, math} format as Wolfram's
+step-by-step pods. Generators raise ValueError for problems outside the
+shapes they explain, so callers can fall back to Wolfram.
+"""
+from typing import Dict, Any, List, Tuple
+import re
+import sympy
+
+_IMAGINARY_UNIT_RE = re.compile(r'\bI\b')
+
+# Derivatives deeper than this are summarized in one step rather than expanded
+MAX_RULE_DEPTH = 4
+
+
+def to_plaintext(expression) -> str:
+    """Render a SymPy object in Wolfram-style plaintext (3 x^2 + 4 x).
+
+    Args:
+        expression: SymPy expression
+
+    Returns:
+        Plaintext rendering
+    """
+    if isinstance(expression, sympy.Eq):
+        return f"{to_plaintext(expression.lhs)} = {to_plaintext(expression.rhs)}"
+
+    text = str(expression).replace("**", "^").replace("*", " ")
+    return _IMAGINARY_UNIT_RE.sub("i", text)
+
+
+def add_step(steps: List[Dict[str, Any]], description: str, math: str) -> None:
+    """Append a step in the normalized step format.
+
+    Args:
+        steps: Steps collected so far
+        description: What the step does
+        math: Math for the step
+    """
+    steps.append({
+        "step_number": len(steps) + 1,
+        "description": description,
+        "math": math
+    })
+
+
+def _equation(lhs, rhs) -> str:
+    """Render an equation without letting SymPy evaluate it.
+
+    Args:
+        lhs: Left-hand side
+        rhs: Right-hand side
+
+    Returns:
+        Plaintext equation
+    """
+    return f"{to_plaintext(lhs)} = {to_plaintext(rhs)}"
+
+
+def _d(expression, variable) -> str:
+    """Render d/dx (expression)."""
+    return f"d/d{variable} ({to_plaintext(expression)})"
+
+
+def _explain_derivative(expression, variable, steps: List[Dict[str, Any]], depth: int):
+    """Differentiate one expression, recording the rule applied at each node.
+
+    Args:
+        expression: Expression to differentiate
+        variable: Variable of differentiation
+        steps: Steps collected so far
+        depth: Current nesting depth
+
+    Returns:
+        Derivative of the expression
+    """
+    result = expression.diff(variable)
+
+    if not expression.has(variable):
+        add_step(steps, "The derivative of a constant is zero", f"{_d(expression, variable)} = 0")
+        return result
+
+    if expression == variable:
+        return result
+
+    if depth >= MAX_RULE_DEPTH:
+        add_step(steps, "Differentiate", f"{_d(expression, variable)} = {to_plaintext(result)}")
+        return result
+
+    if isinstance(expression, sympy.Add):
+        terms = expression.as_ordered_terms()
+        add_step(
+            steps,
+            "Apply the sum rule: differentiate each term separately",
+            f"{_d(expression, variable)} = " + " + ".join(_d(term, variable) for term in terms)
+        )
+        for term in terms:
+            _explain_derivative(term, variable, steps, depth + 1)
+        return result
+
+    if isinstance(expression, sympy.Mul):
+        coefficient, rest = expression.as_independent(variable, as_Add=False)
+        if coefficient != 1:
+            add_step(
+                steps,
+                f"Apply the constant multiple rule: factor out {to_plaintext(coefficient)}",
+                f"{_d(expression, variable)} = {to_plaintext(coefficient)} {_d(rest, variable)}"
+            )
+            _explain_derivative(rest, variable, steps, depth + 1)
+            return result
+
+        factors = expression.args
+        if len(factors) > 1:
+            first = factors[0]
+            second = sympy.Mul(*factors[1:])
+            add_step(
+                steps,
+                "Apply the product rule: d/dx (f g) = f' g + f g'",
+                f"{_d(expression, variable)} = {_d(first, variable)} ({to_plaintext(second)})"
+                f" + ({to_plaintext(first)}) {_d(second, variable)}"
+            )
+            _explain_derivative(first, variable, steps, depth + 1)
+            _explain_derivative(second, variable, steps, depth + 1)
+            add_step(steps, "Combine the product rule terms", f"{_d(expression, variable)} = {to_plaintext(result)}")
+            return result
+
+    if isinstance(expression, sympy.Pow) and not expression.exp.has(variable):
+        base, exponent = expression.base, expression.exp
+        if base == variable:
+            add_step(
+                steps,
+                "Apply the power rule: d/dx x^n = n x^(n - 1)",
+                f"{_d(expression, variable)} = {to_plaintext(result)}"
+            )
+            return result
+
+        outer = exponent * base ** (exponent - 1)
+        add_step(
+            steps,
+            "Apply the chain rule with the power rule: d/dx u^n = n u^(n - 1) u'",
+            f"{_d(expression, variable)} = {to_plaintext(outer)} {_d(base, variable)}"
+        )
+        _explain_derivative(base, variable, steps, depth + 1)
+        add_step(steps, "Simplify", f"{_d(expression, variable)} = {to_plaintext(result)}")
+        return result
+
+    if isinstance(expression, sympy.Function) and len(expression.args) == 1:
+        inner = expression.args[0]
+        u = sympy.Dummy("u")
+        outer = expression.func(u).diff(u)
+        if inner == variable:
+            add_step(
+                steps,
+                f"Use the derivative of {expression.func.__name__}",
+                f"{_d(expression, variable)} = {to_plaintext(result)}"
+            )
+            return result
+
+        add_step(
+            steps,
+            f"Apply the chain rule with u = {to_plaintext(inner)}: d/dx f(u) = f'(u) u'",
+            f"{_d(expression, variable)} = {to_plaintext(outer.subs(u, inner))} {_d(inner, variable)}"
+        )
+        _explain_derivative(inner, variable, steps, depth + 1)
+        add_step(steps, "Simplify", f"{_d(expression, variable)} = {to_plaintext(result)}")
+        return result
+
+    # Variable exponents and anything else: state the result directly
+    add_step(steps, "Differentiate", f"{_d(expression, variable)} = {to_plaintext(result)}")
+    return result
+
+
+def derivative_steps(expression, variable) -> Tuple[Any, List[Dict[str, Any]]]:
+    """Differentiate an expression with sum, constant multiple, power, product and chain rules.
+
+    Args:
+        expression: SymPy expression
+        variable: Variable of differentiation
+
+    Returns:
+        Tuple of (derivative, steps)
+    """
+    steps: List[Dict[str, Any]] = []
+    _explain_derivative(expression, variable, steps, depth=0)
+
+    result = expression.diff(variable)
+    final = f"{_d(expression, variable)} = {to_plaintext(result)}"
+    if not steps or steps[-1]["math"] != final:
+        add_step(steps, "Result", final)
+    return result, steps
+
+
+def _linear_steps(lhs, rhs, variable, polynomial, steps: List[Dict[str, Any]]) -> List[Any]:
+    """Isolate the variable in a linear equation."""
+    a, b = polynomial.all_coeffs()
+    if lhs != a * variable or rhs != -b:
+        add_step(
+            steps,
+            f"Move terms with {variable} to the left side and constants to the right side",
+            _equation(a * variable, -b)
+        )
+    solution = -b / a
+    if a != 1:
+        add_step(steps, f"Divide both sides by {to_plaintext(a)}", f"{variable} = {to_plaintext(solution)}")
+    return [solution]
+
+
+def _quadratic_steps(lhs, rhs, variable, polynomial, steps: List[Dict[str, Any]]) -> List[Any]:
+    """Solve a quadratic equation with the quadratic formula."""
+    a, b, c = polynomial.all_coeffs()
+    expression = polynomial.as_expr()
+    if sympy.expand(rhs) != 0 or lhs != expression:
+        add_step(steps, "Write the equation in standard form a x^2 + b x + c = 0", _equation(expression, 0))
+
+    add_step(
+        steps,
+        "Identify the coefficients",
+        f"a = {to_plaintext(a)}, b = {to_plaintext(b)}, c = {to_plaintext(c)}"
+    )
+
+    discriminant = b ** 2 - 4 * a * c
+    add_step(
+        steps,
+        "Compute the discriminant",
+        f"b^2 - 4 a c = ({to_plaintext(b)})^2 - 4 ({to_plaintext(a)}) ({to_plaintext(c)}) = {to_plaintext(discriminant)}"
+    )
+
+    if discriminant == 0:
+        description = "The discriminant is zero, so there is one repeated root"
+    elif discriminant < 0:
+        description = "The discriminant is negative, so the roots are complex"
+    else:
+        description = "Apply the quadratic formula"
+    add_step(
+        steps,
+        description,
+        f"{variable} = (-({to_plaintext(b)}) ± sqrt({to_plaintext(discriminant)}))/(2 ({to_plaintext(a)}))"
+    )
+
+    if discriminant == 0:
+        return [-b / (2 * a)]
+
+    root = sympy.sqrt(discriminant)
+    return [sympy.simplify((-b - root) / (2 * a)), sympy.simplify((-b + root) / (2 * a))]
+
+
+def equation_steps(lhs, rhs) -> Tuple[Any, List[Any], List[Dict[str, Any]]]:
+    """Solve a linear or quadratic equation in one variable.
+
+    Linear equations are solved by isolating the variable, quadratics with
+    the quadratic formula.
+
+    Args:
+        lhs: Left-hand side
+        rhs: Right-hand side
+
+    Returns:
+        Tuple of (variable, solutions, steps)
+
+    Raises:
+        ValueError: If the equation is not a single-variable polynomial of degree 1 or 2
+    """
+    expression = sympy.expand(lhs - rhs)
+    free = expression.free_symbols
+    if len(free) != 1:
+        raise ValueError("Only single-variable equations are explained")
+    variable = next(iter(free))
+
+    if not expression.is_polynomial(variable):
+        raise ValueError("Only polynomial equations are explained")
+    polynomial = sympy.Poly(expression, variable)
+    degree = polynomial.degree()
+    if degree not in (1, 2):
+        raise ValueError("Only linear and quadratic equations are explained")
+
+    steps: List[Dict[str, Any]] = []
+    add_step(steps, "Start with the equation", _equation(lhs, rhs))
+
+    if degree == 1:
+        solutions = _linear_steps(lhs, rhs, variable, polynomial, steps)
+    else:
+        solutions = _quadratic_steps(lhs, rhs, variable, polynomial, steps)
+        for solution in solutions:
+            add_step(steps, "Solution", f"{variable} = {to_plaintext(solution)}")
+
+    return variable, solutions, steps
+
+
+def _row_equation(row: List[Any], constant, variables: List[Any]) -> str:
+    """Render one row of the elimination as an equation."""
+    lhs = sum((coefficient * variable for coefficient, variable in zip(row, variables)), sympy.Integer(0))
+    return _equation(lhs, constant)
+
+
+def system_steps(
+    equations: List[Tuple[Any, Any]]
+) -> Tuple[Dict[Any, Any], List[Dict[str, Any]]]:
+    """Solve a square linear system of two or three equations by elimination.
+
+    Rows are combined with integer multiples so intermediate equations keep
+    integer coefficients, then values are found by back substitution.
+
+    Args:
+        equations: (lhs, rhs) pairs
+
+    Returns:
+        Tuple of (variable -> value, steps)
+
+    Raises:
+        ValueError: If the system is not linear, not square, or has no unique solution
+    """
+    variables = sorted(
+        set().union(*(sympy.sympify(lhs - rhs).free_symbols for lhs, rhs in equations)),
+        key=lambda symbol: symbol.name
+    )
+    size = len(equations)
+    if size not in (2, 3) or len(variables) != size:
+        raise ValueError("Only square systems of two or three equations are explained")
+
+    try:
+        matrix, vector = sympy.linear_eq_to_matrix([lhs - rhs for lhs, rhs in equations], variables)
+    except sympy.solvers.solveset.NonlinearError:
+        raise ValueError("Only linear systems are explained")
+
+    rows = [list(matrix.row(i)) for i in range(size)]
+    constants = list(vector)
+
+    steps: List[Dict[str, Any]] = []
+    add_step(steps, "Start with the system of equations", ", ".join(_equation(lhs, rhs) for lhs, rhs in equations))
+
+    # Forward elimination
+    for column in range(size):
+        pivot = next((i for i in range(column, size) if rows[i][column] != 0), None)
+        if pivot is None:
+            raise ValueError("The system has no unique solution")
+        if pivot != column:
+            rows[column], rows[pivot] = rows[pivot], rows[column]
+            constants[column], constants[pivot] = constants[pivot], constants[column]
+            add_step(
+                steps,
+                f"Swap equations {column + 1} and {pivot + 1}",
+                _row_equation(rows[column], constants[column], variables)
+            )
+
+        for i in range(column + 1, size):
+            if rows[i][column] == 0:
+                continue
+            upper, lower = rows[column][column], rows[i][column]
+            rows[i] = [upper * a - lower * b for a, b in zip(rows[i], rows[column])]
+            constants[i] = upper * constants[i] - lower * constants[column]
+
+            # Keep coefficients small
+            divisor = sympy.gcd_list(rows[i] + [constants[i]])
+            if divisor not in (0, 1):
+                rows[i] = [a / divisor for a in rows[i]]
+                constants[i] = constants[i] / divisor
+
+            scale = f"multiply it by {to_plaintext(upper)} and " if upper != 1 else ""
+            operation = "subtract" if lower > 0 else "add"
+            times = f"{to_plaintext(abs(lower))} times " if abs(lower) != 1 else ""
+            add_step(
+                steps,
+                f"Eliminate {variables[column]} from equation {i + 1}: "
+                f"{scale}{operation} {times}equation {column + 1}",
+                _row_equation(rows[i], constants[i], variables)
+            )
+
+    # Back substitution
+    values: Dict[Any, Any] = {}
+    for row_index in range(size - 1, -1, -1):
+        variable = variables[row_index]
+        row = rows[row_index]
+        known = sum(
+            (row[j] * values[variables[j]] for j in range(row_index + 1, size)),
+            sympy.Integer(0)
+        )
+        if row[row_index] == 0:
+            raise ValueError("The system has no unique solution")
+        if known != 0:
+            add_step(
+                steps,
+                f"Substitute the known values into equation {row_index + 1}",
+                _equation(row[row_index] * variable + known, constants[row_index])
+            )
+        values[variable] = (constants[row_index] - known) / row[row_index]
+        add_step(steps, f"Solve for {variable}", f"{variable} = {to_plaintext(values[variable])}")
+
+    return {variable: values[variable] for variable in variables}, steps
@@ -5,6 +5,7 @@ import structlog
 from pydantic import BaseModel, Field
 
 from generators import FlashcardGenerator, QuizGenerator, ExplanationGenerator
+from generators.quiz_store import quiz_store
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -118,13 +119,14 @@ async def generate_quiz(request: QuizRequest):
             question_types=request.question_types
         )
         
-        # Remove answer key from response (store it server-side in production)
+        # Keep the answer key server-side for grading
+        await quiz_store.save(quiz)
         quiz_response = {k: v for k, v in quiz.items() if k != "answer_key"}
         
         return {
             "success": True,
             "quiz": quiz_response,
-            "submission_endpoint": f"/educational/quiz/{quiz['id']}/submit"
+            "submission_endpoint": f"/api/v1/educational/quiz/{quiz['id']}/submit"
         }
         
     except Exception as e:
@@ -133,38 +135,28 @@ async def generate_quiz(request: QuizRequest):
 
 
 @router.post("/quiz/{quiz_id}/submit")
-async def submit_quiz(submission: QuizSubmission):
+async def submit_quiz(quiz_id: str, submission: QuizSubmission):
     """Submit and grade a quiz."""
     try:
-        # In production, retrieve quiz from storage
-        # For now, we'll return a mock grading
-        
-        logger.info("Grading quiz submission", quiz_id=submission.quiz_id)
-        
-        # Mock grading result
-        results = {
-            "quiz_id": submission.quiz_id,
-            "total_points": 100,
-            "earned_points": 85,
-            "percentage": 85.0,
-            "questions": {
-                "1": {"correct": True, "points_earned": 10, "points_possible": 10},
-                "2": {"correct": True, "points_earned": 10, "points_possible": 10},
-                "3": {"correct": False, "points_earned": 0, "points_possible": 10},
-                "4": {"correct": True, "points_earned": 8, "points_possible": 10},
-                "5": {"correct": True, "points_earned": 10, "points_possible": 10}
-            },
-            "feedback": [
-                "Great job! You understand the core concepts well.",
-                "Review question 3 - remember to check your calculations."
-            ]
-        }
+        if submission.quiz_id != quiz_id:
+            raise HTTPException(status_code=400, detail="Quiz ID in the body does not match the URL")
+
+        quiz = await quiz_store.get(quiz_id)
+        if quiz is None:
+            raise HTTPException(status_code=404, detail=f"Quiz {quiz_id} not found or expired")
+
+        logger.info("Grading quiz submission", quiz_id=quiz_id)
+
+        results = quiz_generator.grade_quiz(quiz, submission.answers)
+        results["quiz_id"] = quiz_id
         
         return {
             "success": True,
             "results": results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to grade quiz", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -176,20 +168,14 @@ async def explain_concept(request: ExplanationRequest):
     try:
         logger.info("Explaining concept", concept=request.concept)
         
+        # The analogy is generated alongside the explanation
         explanation = await explanation_generator.generate_concept_explanation(
             concept=request.concept,
             context=request.context,
-            examples_count=request.examples_count
+            examples_count=request.examples_count,
+            analogy_audience="general"
         )
         
-        # Generate analogy
-        analogy = await explanation_generator.generate_analogy(
-            request.concept,
-            target_audience="general"
-        )
-        
-        explanation["analogy"] = analogy
-        
         return {
             "success": True,
             "explanation": explanation
@@ -1,8 +1,11 @@
 """Health check routes."""
 from fastapi import APIRouter, status
 from datetime import datetime
-import psutil
-import os
+
+from api.wolfram.response_cache import response_cache
+from api.wolfram.resilience import breaker_states
+from processors.enrichment_cache import enrichment_cache
+from utils.system_monitor import system_monitor
 
 router = APIRouter()
 
@@ -19,39 +22,24 @@ async def health_check():
 
 @router.get("/detailed", status_code=status.HTTP_200_OK)
 async def detailed_health_check():
-    """Detailed health check with system metrics."""
-    try:
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "service": "wolfram-math-service",
-            "system": {
-                "cpu_percent": cpu_percent,
-                "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent
-                },
-                "disk": {
-                    "total": disk.total,
-                    "free": disk.free,
-                    "percent": disk.percent
-                }
-            },
-            "process": {
-                "pid": os.getpid(),
-                "memory_mb": psutil.Process().memory_info().rss / 1024 / 1024
-            }
-        }
-    except Exception as e:
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "service": "wolfram-math-service",
-            "error": f"Could not retrieve system metrics: {str(e)}"
-        }
+    """Detailed health check with system metrics.
+
+    Served from memory: Redis-backed sections (rate_limits, content_pools)
+    come from the background sampler's latest snapshot.
+    """
+    snapshot = system_monitor.snapshot()
+
+    response = {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "service": "wolfram-math-service",
+        **snapshot,
+        "cache": response_cache.stats(),
+        "enrichment_cache": enrichment_cache.stats(),
+        "circuit_breakers": breaker_states()
+    }
+
+    if not snapshot:
+        response["error"] = "System metrics not sampled yet"
+
+    return response
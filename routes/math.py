@@ -1,6 +1,11 @@
 """Math problem-solving routes."""
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from typing import Optional, List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Literal, Tuple, AsyncIterator
+from contextlib import nullcontext
+import asyncio
+import json
+import httpx
 import structlog
 from pydantic import BaseModel, Field
 
@@ -8,14 +13,45 @@ from api.wolfram import (
     WolframLLMClient,
     WolframFullResultsClient,
     WolframShowStepsClient,
-    WolframLanguageEvalClient
+    WolframLanguageEvalClient,
+    STEP_BY_STEP_POD_STATES
 )
-from api.groq import GroqClient
+from api.wolfram.show_steps_client import extract_inline_steps
+from api.wolfram.resilience import CircuitOpenError
+from api.registry import llm_clients
+from config.settings import settings
 from processors import QueryClassifier, ImageParser, ResultEnhancer
+from processors.ocr_pool import ocr_pool, OCRPoolSaturated
+from processors.local_solver import local_solver
+from utils.tracing import span
+from utils.single_flight import SingleFlight
+from utils.concurrency import llm_concurrency_scope
+from utils.deadline import start_deadline, deadline_scope, budget, has_time_for, DeadlineExceeded
+from utils.rate_limiter import RateLimitExceeded
+from utils.responses import json_response
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Response fields a client can select; success, query, error and
+# incomplete_sections are always returned
+ResponseField = Literal[
+    "result", "final_answer", "steps", "explanation", "educational_content", "practice_problems", "visualizations"
+]
+RESPONSE_FIELDS = ResponseField.__args__
+
+# Enhancement branches and the response field each one fills; branches
+# whose output is not returned (concepts) are not reported as incomplete
+_BRANCH_FIELDS = {
+    "explanation": "explanation",
+    "summary": "educational_content",
+    "key_insights": "educational_content",
+    "common_mistakes": "educational_content",
+    "tips": "educational_content",
+    "real_world_applications": "educational_content",
+    "practice_problems": "practice_problems"
+}
+
 
 # Request/Response models
 class MathQuery(BaseModel):
@@ -25,6 +61,19 @@ class MathQuery(BaseModel):
     student_level: str = Field(default="undergraduate", description="Student education level")
     include_educational: bool = Field(default=True, description="Include educational content")
     format: str = Field(default="plaintext", description="Output format for mathematical expressions (plaintext, latex, mathml, image)")
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Time budget for the request in milliseconds; optional sections are dropped to meet it"
+    )
+    include: List[Literal["pods"]] = Field(
+        default_factory=list,
+        description="Heavy extras to add to result, omitted by default: pods (raw Wolfram pods)"
+    )
+    fields: Optional[List[ResponseField]] = Field(
+        default=None,
+        description="Response fields to return (all by default); unselected fields are not computed"
+    )
 
 
 class MathResponse(BaseModel):
@@ -35,8 +84,35 @@ class MathResponse(BaseModel):
     explanation: Optional[str] = None
     steps: Optional[List[dict]] = None
     educational_content: Optional[dict] = None
+    practice_problems: Optional[List[dict]] = None
     visualizations: Optional[List[dict]] = None
     error: Optional[str] = None
+    incomplete_sections: Optional[List[str]] = None
+
+
+class BatchMathQuery(BaseModel):
+    """Batch solve request model."""
+    items: List[MathQuery] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_items,
+        description="Math queries to solve"
+    )
+    stream: bool = Field(default=False, description="Stream per-item results as NDJSON as they complete")
+
+
+class BatchItemResult(BaseModel):
+    """Result for one item of a batch."""
+    index: int
+    response: MathResponse
+
+
+class BatchMathResponse(BaseModel):
+    """Batch solve response model."""
+    success: bool
+    count: int
+    unique_count: int
+    results: List[BatchItemResult]
 
 
 # Initialize components
@@ -44,58 +120,605 @@ query_classifier = QueryClassifier()
 image_parser = ImageParser()
 result_enhancer = ResultEnhancer()
 
+# Identical requests arriving together share one upstream pipeline
+solve_flights = SingleFlight("solve")
+plot_flights = SingleFlight("plot")
+
 
 @router.post("/solve", response_model=MathResponse)
-async def solve_math_problem(query_data: MathQuery):
-    """Solve a mathematical problem with explanation."""
+async def solve_math_problem(
+    query_data: MathQuery,
+    x_deadline_ms: Optional[int] = Header(default=None, gt=0),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated response fields, e.g. final_answer,steps (overrides fields in the body)"
+    )
+):
+    """Solve a mathematical problem with explanation.
+
+    The time budget comes from deadline_ms or the X-Deadline-Ms header
+    (the smaller wins), defaulting to solve_default_deadline. With fields
+    selected, the response carries only those fields.
+    """
+    if fields is not None:
+        query_data = query_data.model_copy(update={"fields": _parse_fields(fields)})
+
+    deadline = start_deadline(_deadline_seconds(query_data.deadline_ms, x_deadline_ms))
+    try:
+        # Callers only share a solve started with at least as much time as their
+        # own, and still answer within their own deadline
+        response = await solve_flights.do(
+            _query_key(query_data),
+            lambda: _solve(query_data),
+            timeout=max(deadline.remaining(), 0)
+        )
+    except asyncio.TimeoutError:
+        logger.info("Deadline expired waiting for a shared solve", query=query_data.query)
+        response = _deadline_response(query_data, DeadlineExceeded("solve"))
+
+    with span("serialize"):
+        if query_data.fields is not None:
+            # Sparse responses leave out unselected fields entirely
+            return json_response({name: value for name, value in response if value is not None})
+        return json_response(response)
+
+
+@router.post("/solve/batch")
+async def solve_math_problem_batch(
+    batch: BatchMathQuery,
+    x_deadline_ms: Optional[int] = Header(default=None, gt=0)
+):
+    """Solve a set of problems with bounded upstream concurrency.
+
+    Identical queries with the same deadline are solved once. Wolfram
+    calls and LLM completions are limited separately so a batch cannot
+    monopolize either upstream. With
+    stream=true, results are returned as NDJSON lines in completion order.
+    X-Deadline-Ms bounds the whole batch; deadline_ms bounds single items.
+    """
+    logger.info("Processing math batch", items=len(batch.items))
+    start_deadline(_deadline_seconds(None, x_deadline_ms))
+
+    # Deduplicate identical queries, remembering which items each one answers;
+    # items with different deadlines are solved separately, since a solve is
+    # cut short to fit its own deadline
+    unique_queries = {}
+    indexes_by_key = {}
+    for index, item in enumerate(batch.items):
+        key = json.dumps([_query_key(item), item.deadline_ms])
+        unique_queries.setdefault(key, item)
+        indexes_by_key.setdefault(key, []).append(index)
+
+    wolfram_gate = asyncio.Semaphore(settings.batch_wolfram_concurrency)
+
+    async def solve_unique(key: str) -> Tuple[str, MathResponse]:
+        item = unique_queries[key]
+        with deadline_scope(item.deadline_ms / 1000 if item.deadline_ms else None):
+            response = await _solve(item, wolfram_gate=wolfram_gate)
+        return key, response
+
+    # Every LLM completion made by the batch's tasks shares one cap
+    with llm_concurrency_scope(settings.batch_llm_concurrency):
+        tasks = [asyncio.create_task(solve_unique(key)) for key in unique_queries]
+
+    if batch.stream:
+        return StreamingResponse(
+            _stream_batch_results(tasks, indexes_by_key),
+            media_type="application/x-ndjson"
+        )
+
+    responses = dict(await asyncio.gather(*tasks))
+    results = [
+        BatchItemResult(index=index, response=responses[key])
+        for key, indexes in indexes_by_key.items()
+        for index in indexes
+    ]
+    results.sort(key=lambda item: item.index)
+
+    with span("serialize"):
+        return json_response(BatchMathResponse(
+            success=all(item.response.success for item in results),
+            count=len(batch.items),
+            unique_count=len(unique_queries),
+            results=results
+        ))
+
+
+async def _stream_batch_results(
+    tasks: List[asyncio.Task],
+    indexes_by_key: dict
+) -> AsyncIterator[str]:
+    """Yield NDJSON lines for batch items as their solves complete.
+
+    Args:
+        tasks: Tasks resolving to (query key, response)
+        indexes_by_key: Batch item indexes for each query key
+
+    Yields:
+        One JSON line per batch item
+    """
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, response = await next_done
+            for index in indexes_by_key[key]:
+                item = BatchItemResult(index=index, response=response)
+                yield item.model_dump_json() + "\n"
+    finally:
+        # Stop outstanding solves if the client disconnected early
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _solve(
+    query_data: MathQuery,
+    wolfram_gate: Optional[asyncio.Semaphore] = None
+) -> MathResponse:
+    """Run the solve pipeline: classify, call Wolfram, then enhance.
+
+    Args:
+        query_data: Math query
+        wolfram_gate: Optional semaphore bounding concurrent Wolfram calls
+
+    Returns:
+        Math response (errors are reported in the response, not raised)
+    """
     try:
         logger.info("Processing math query", query=query_data.query)
         
+        plan = _plan_query(query_data)
+        if plan["clarifications"]:
+            return _clarification_response(query_data, plan["clarifications"])
+
+        normalized_result, fallback_response = await _solve_with_wolfram(
+            query_data,
+            plan,
+            wolfram_gate=wolfram_gate
+        )
+        if fallback_response is not None:
+            return _select_fields(fallback_response, query_data)
+
+        response = MathResponse(
+            success=True,
+            query=query_data.query,
+            result=normalized_result,
+            steps=normalized_result.get("steps") or None,
+            visualizations=normalized_result.get("visualizations") or None
+        )
+
+        # Enhancement only runs for the sections the client selected
+        enhanced_fields = [
+            name for name in ("explanation", "educational_content", "practice_problems")
+            if query_data.include_educational and _wants(query_data, name)
+        ]
+
+        # Return the answer alone rather than time out if the deadline is near
+        if enhanced_fields and not has_time_for(settings.deadline_enhancement_min):
+            logger.info("Skipping enhancement, deadline near")
+            response.incomplete_sections = enhanced_fields
+            enhanced_fields = []
+
+        if enhanced_fields:
+            enhanced_result = await result_enhancer.enhance_result(
+                normalized_result,
+                query_data.query,
+                query_data.student_level,
+                include_educational="educational_content" in enhanced_fields,
+                include_practice="practice_problems" in enhanced_fields
+            )
+
+            response.explanation = enhanced_result.get("explanation")
+            response.educational_content = enhanced_result.get("educational_content")
+            response.practice_problems = enhanced_result.get("practice_problems")
+            response.incomplete_sections = _incomplete_fields(
+                enhanced_result.get("incomplete_sections") or [],
+                query_data
+            )
+
+        return _select_fields(response, query_data)
+
+    except Exception as e:
+        logger.error("Failed to solve problem", error=str(e))
+        return MathResponse(
+            success=False,
+            query=query_data.query,
+            result={},
+            error=str(e)
+        )
+
+
+@router.post("/solve/stream")
+async def solve_math_problem_stream(
+    query_data: MathQuery,
+    x_deadline_ms: Optional[int] = Header(default=None, gt=0)
+):
+    """Solve a mathematical problem, streaming results as server-sent events.
+
+    Events are emitted in order as each stage completes: classification,
+    answer, steps, explanation_delta (token by token), explanation,
+    concepts, educational_content, practice_problems and finally done.
+    An error event replaces the remaining events if solving fails.
+    """
+    start_deadline(_deadline_seconds(query_data.deadline_ms, x_deadline_ms))
+    return StreamingResponse(
+        _stream_solution(query_data),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+async def _stream_solution(query_data: MathQuery) -> AsyncIterator[str]:
+    """Run the solve pipeline and yield SSE-formatted events.
+
+    Args:
+        query_data: Math query
+
+    Yields:
+        Server-sent event strings
+    """
+    try:
+        logger.info("Processing streaming math query", query=query_data.query)
+
+        plan = _plan_query(query_data)
+        yield _sse_event("classification", {
+            "query_type": plan["query_type"].value,
+            "api": plan["api_type"].value
+        })
+
+        if plan["clarifications"]:
+            response = _clarification_response(query_data, plan["clarifications"])
+            yield _sse_event("error", {"error": response.error})
+            return
+
+        normalized_result, fallback_response = await _solve_with_wolfram(query_data, plan)
+
+        if fallback_response is not None and not fallback_response.success:
+            yield _sse_event("error", {
+                "error": fallback_response.error,
+                "incomplete_sections": fallback_response.incomplete_sections
+            })
+            return
+
+        if fallback_response is not None:
+            # The Groq fallback answers in a single completion
+            fallback_result = fallback_response.result
+            yield _sse_event("answer", {
+                "final_answer": fallback_result.get("final_answer"),
+                "result": fallback_result
+            })
+            yield _sse_event("steps", {"steps": fallback_response.steps or []})
+            yield _sse_event("explanation", {"explanation": fallback_response.explanation})
+            yield _sse_event("educational_content", fallback_response.educational_content or {})
+            yield _sse_event("done", {"success": True})
+            return
+
+        yield _sse_event("answer", {
+            "final_answer": normalized_result.get("final_answer"),
+            "result": normalized_result
+        })
+        yield _sse_event("steps", {"steps": normalized_result.get("steps") or []})
+
+        if query_data.include_educational:
+            async for event, data in result_enhancer.stream_enhancement(
+                normalized_result,
+                query_data.query,
+                query_data.student_level
+            ):
+                yield _sse_event(event, data)
+                if event == "error":
+                    return
+
+        yield _sse_event("done", {"success": True})
+
+    except Exception as e:
+        logger.error("Failed to stream solution", error=str(e))
+        yield _sse_event("error", {"error": str(e)})
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        SSE-formatted event string
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _deadline_seconds(body_ms: Optional[int], header_ms: Optional[int]) -> float:
+    """Resolve the request time budget.
+
+    Args:
+        body_ms: deadline_ms from the request body
+        header_ms: X-Deadline-Ms header value
+
+    Returns:
+        Budget in seconds
+    """
+    requested = [ms / 1000 for ms in (body_ms, header_ms) if ms]
+    if not requested:
+        return settings.solve_default_deadline
+    return min(min(requested), settings.solve_max_deadline)
+
+
+def _query_key(query_data: MathQuery) -> str:
+    """Build a key identifying queries that produce the same response.
+
+    Args:
+        query_data: Math query
+
+    Returns:
+        Normalized key
+    """
+    return json.dumps([
+        " ".join(query_data.query.split()),
+        query_data.show_steps,
+        query_data.student_level,
+        query_data.include_educational,
+        query_data.format,
+        sorted(set(query_data.include)),
+        sorted(set(query_data.fields)) if query_data.fields is not None else None
+    ])
+
+
+def _parse_fields(fields: str) -> List[str]:
+    """Parse the fields query parameter.
+
+    Args:
+        fields: Comma-separated field names
+
+    Returns:
+        Selected field names
+
+    Raises:
+        HTTPException: If a field name is unknown
+    """
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown response fields: {', '.join(unknown)}. Choose from: {', '.join(RESPONSE_FIELDS)}"
+        )
+    return selected
+
+
+def _wants(query_data: MathQuery, field: str) -> bool:
+    """Check whether a response field was selected.
+
+    Args:
+        query_data: Math query
+        field: Response field name
+
+    Returns:
+        True if the field was selected, or no selection was made
+    """
+    return query_data.fields is None or field in query_data.fields
+
+
+def _incomplete_fields(branches: List[str], query_data: MathQuery) -> Optional[List[str]]:
+    """Map enhancement branches that fell back to the response fields they fill.
+
+    Args:
+        branches: Incomplete branch names from ResultEnhancer
+        query_data: Math query with the field selection
+
+    Returns:
+        Selected response fields left incomplete, or None if there are none
+    """
+    fields = dict.fromkeys(
+        _BRANCH_FIELDS[branch] for branch in branches
+        if branch in _BRANCH_FIELDS and _wants(query_data, _BRANCH_FIELDS[branch])
+    )
+    return list(fields) or None
+
+
+def _select_fields(response: MathResponse, query_data: MathQuery) -> MathResponse:
+    """Drop the response fields the client did not select.
+
+    Args:
+        response: Full response
+        query_data: Math query with the field selection
+
+    Returns:
+        Response with unselected fields cleared
+    """
+    if query_data.fields is None:
+        return response
+
+    result = response.result
+    if not _wants(query_data, "result"):
+        result = {"final_answer": result.get("final_answer")} if _wants(query_data, "final_answer") else {}
+
+    cleared = {
+        name: None
+        for name in ("steps", "explanation", "educational_content", "practice_problems", "visualizations")
+        if not _wants(query_data, name)
+    }
+    return response.model_copy(update={"result": result, **cleared})
+
+
+def _plan_query(query_data: MathQuery) -> dict:
+    """Classify a query and work out how to call Wolfram for it.
+
+    Args:
+        query_data: Math query
+
+    Returns:
+        Plan with query_type, api_type, api_params, processed_query,
+        clarifications and local_problem
+    """
+    with span("classify"):
         # Classify query
         query_type, api_type = query_classifier.classify_query(query_data.query)
-        logger.info("Query classified", type=query_type.value, api=api_type.value)
-        
+
         # Check if clarification needed
         clarifications = query_classifier.requires_clarification(query_data.query)
-        if clarifications:
-            return MathResponse(
-                success=False,
-                query=query_data.query,
-                result={},
-                error=f"Please clarify: {'; '.join(clarifications)}"
-            )
-        
+
         # Get API parameters
         api_params = query_classifier.get_api_params(query_type, api_type)
-        
+
         # Preprocess query
         processed_query = query_classifier.preprocess_for_api(
-            query_data.query, 
-            query_type, 
+            query_data.query,
+            query_type,
             api_type
         )
-        
-        # Route to appropriate Wolfram API
-        wolfram_result = await _call_wolfram_api(
-            api_type.value,
-            processed_query,
-            api_params,
-            query_data.format
-        )
+
+        # Problems SymPy can answer without a Wolfram call
+        local_problem = query_classifier.local_problem(query_data.query)
+
+    logger.info("Query classified", type=query_type.value, api=api_type.value)
+
+    return {
+        "query_type": query_type,
+        "api_type": api_type,
+        "api_params": api_params,
+        "processed_query": processed_query,
+        "clarifications": clarifications,
+        "local_problem": local_problem
+    }
+
+
+def _clarification_response(query_data: MathQuery, clarifications: List[str]) -> MathResponse:
+    """Build the response asking the student to clarify their query.
+
+    Args:
+        query_data: Math query
+        clarifications: Clarification questions
+
+    Returns:
+        Unsuccessful response carrying the questions
+    """
+    return MathResponse(
+        success=False,
+        query=query_data.query,
+        result={},
+        error=f"Please clarify: {'; '.join(clarifications)}"
+    )
+
+
+def _deadline_response(query_data: MathQuery, error: DeadlineExceeded) -> MathResponse:
+    """Build the response for a solve whose deadline passed before any answer.
+
+    Args:
+        query_data: Math query
+        error: Deadline error
+
+    Returns:
+        Unsuccessful response listing every selected section as incomplete
+    """
+    return MathResponse(
+        success=False,
+        query=query_data.query,
+        result={},
+        error=str(error),
+        incomplete_sections=[name for name in RESPONSE_FIELDS if _wants(query_data, name)]
+    )
+
+
+async def _solve_with_wolfram(
+    query_data: MathQuery,
+    plan: dict,
+    wolfram_gate: Optional[asyncio.Semaphore] = None
+) -> Tuple[Optional[dict], Optional[MathResponse]]:
+    """Solve a planned query locally or with Wolfram, falling back to Groq.
+
+    Args:
+        query_data: Math query
+        plan: Plan from _plan_query
+        wolfram_gate: Optional semaphore bounding concurrent Wolfram calls
+
+    Returns:
+        Tuple of (normalized result with steps, Groq fallback or deadline
+        response). Exactly one of the two is set.
+    """
+    query_type = plan["query_type"]
+    api_type = plan["api_type"]
+    api_params = plan["api_params"]
+    processed_query = plan["processed_query"]
+    steps_task = None
+    # Steps are returned at the top level and inside result
+    need_steps = _wants(query_data, "steps") or _wants(query_data, "result")
+
+    try:
+        # SymPy answers common problems in milliseconds; anything it cannot
+        # parse or solve in time goes to Wolfram as before
+        if plan["local_problem"] is not None:
+            with span("local_solve"):
+                local_result = await local_solver.solve(
+                    plan["local_problem"],
+                    query_data.query,
+                    query_data.format
+                )
+            if local_result is not None:
+                return local_result, None
+
+        # The step engine would only repeat a local solve that already
+        # failed or timed out on this problem
+        use_step_engine = plan["local_problem"] is not None and not local_solver.accepts(query_data.format)
+
+        # Ask for step-by-step pod states in the first request when steps are
+        # likely, so no second round trip is needed to fetch them
+        if need_steps and query_data.show_steps and query_classifier.predicts_steps(query_type, api_type):
+            api_params["pod_states"] = STEP_BY_STEP_POD_STATES
+            if settings.wolfram_speculative_steps:
+                steps_task = asyncio.create_task(
+                    _fetch_show_steps(query_data.query, query_data.format, use_step_engine)
+                )
+
+        # Route to appropriate Wolfram API; when Wolfram is failing, over its
+        # rate limit (or its circuit breaker is open) go straight to the Groq
+        # fallback below
+        wolfram_error = None
+        try:
+            async with wolfram_gate or nullcontext():
+                wolfram_result = await _call_wolfram_api(
+                    api_type.value,
+                    processed_query,
+                    api_params,
+                    query_data.format,
+                    use_step_engine=use_step_engine
+                )
+        except (CircuitOpenError, RateLimitExceeded, httpx.HTTPError) as e:
+            logger.warning("Wolfram unavailable, using Groq fallback", error=str(e))
+            wolfram_result = {"success": False, "error": str(e)}
+            wolfram_error = e
+        except DeadlineExceeded as e:
+            logger.info("Deadline expired before Wolfram answered", stage=e.stage)
+            return None, _deadline_response(query_data, e)
 
         # Check if Wolfram failed and use Groq fallback for complex queries
         if not wolfram_result.get("success") and not wolfram_result.get("pods"):
             logger.info("Wolfram API returned empty result, trying Groq fallback with openai/gpt-oss-120b")
-            groq_client = GroqClient()
-            groq_result = await groq_client.solve_math_problem(
-                query_data.query,
-                student_level=query_data.student_level,
-                show_steps=query_data.show_steps
-            )
+            groq_client = llm_clients.groq
+            with span("groq_fallback"):
+                try:
+                    timeout = budget(settings.llm_timeout, "groq_fallback")
+                    try:
+                        groq_result = await asyncio.wait_for(
+                            groq_client.solve_math_problem(
+                                query_data.query,
+                                student_level=query_data.student_level,
+                                show_steps=query_data.show_steps
+                            ),
+                            timeout
+                        )
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded("groq_fallback")
+                except DeadlineExceeded as e:
+                    logger.info("Deadline expired before the Groq fallback answered")
+                    return None, _deadline_response(query_data, e)
 
             # Return Groq result directly if Wolfram failed
             if groq_result.get("success"):
-                return MathResponse(
+                return None, MathResponse(
                     success=True,
                     query=query_data.query,
                     result=groq_result,
@@ -105,49 +728,43 @@ async def solve_math_problem(query_data: MathQuery):
                     visualizations=groq_result.get("visualizations")
                 )
 
+        # Neither Wolfram nor the fallback produced an answer
+        if wolfram_error is not None:
+            raise wolfram_error
+
         # Normalize the result format
         normalized_result = _normalize_wolfram_result(wolfram_result, api_type.value)
 
         # Check if step-by-step solutions are available and fetch them
-        steps = await _fetch_steps_if_available(wolfram_result, normalized_result, processed_query, query_data.query, query_data.format)
+        if need_steps:
+            with span("steps_fetch"):
+                async with wolfram_gate or nullcontext():
+                    steps = await _fetch_steps_if_available(
+                        wolfram_result,
+                        normalized_result,
+                        processed_query,
+                        query_data.query,
+                        query_data.format,
+                        steps_task=steps_task,
+                        use_step_engine=use_step_engine
+                    )
 
-        # Add steps to normalized result
-        if steps:
-            normalized_result["steps"] = steps
+            # Add steps to normalized result
+            if steps:
+                normalized_result["steps"] = steps
 
-        # Enhance result if requested
-        if query_data.include_educational:
-            enhanced_result = await result_enhancer.enhance_result(
-                normalized_result,
-                query_data.query,
-                query_data.student_level,
-                include_educational=True
-            )
+        # Raw pods (with their image metadata) dominate the payload, so they
+        # are only returned on request
+        if "pods" in query_data.include:
+            normalized_result["pods"] = wolfram_result.get("pods", [])
+        elif "pods" in normalized_result:
+            normalized_result = {key: value for key, value in normalized_result.items() if key != "pods"}
 
-            return MathResponse(
-                success=True,
-                query=query_data.query,
-                result=normalized_result,
-                explanation=enhanced_result.get("explanation"),
-                steps=enhanced_result.get("steps"),
-                educational_content=enhanced_result.get("educational_content"),
-                visualizations=enhanced_result.get("visualizations")
-            )
-        else:
-            return MathResponse(
-                success=True,
-                query=query_data.query,
-                result=normalized_result
-            )
-            
-    except Exception as e:
-        logger.error("Failed to solve problem", error=str(e))
-        return MathResponse(
-            success=False,
-            query=query_data.query,
-            result={},
-            error=str(e)
-        )
+        return normalized_result, None
+
+    finally:
+        if steps_task is not None:
+            _discard_task(steps_task)
 
 
 @router.post("/solve-image", response_model=MathResponse)
@@ -156,7 +773,8 @@ async def solve_from_image(
     show_steps: bool = Form(default=True),
     student_level: str = Form(default="undergraduate"),
     include_educational: bool = Form(default=True),
-    format: str = Form(default="plaintext")
+    format: str = Form(default="plaintext"),
+    x_deadline_ms: Optional[int] = Header(default=None, gt=0)
 ):
     """Solve mathematical problem from uploaded image."""
     try:
@@ -167,12 +785,25 @@ async def solve_from_image(
                 detail="File must be an image"
             )
             
-        # Read image data
-        image_data = await file.read()
+        # Read the upload once, refusing anything over the size limit
+        image_data = await file.read(settings.max_file_size + 1)
+        if len(image_data) > settings.max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image exceeds maximum size of {settings.max_file_size} bytes"
+            )
         
         # Parse image
         logger.info("Parsing image for mathematical content")
-        parse_result = await image_parser.parse_image(image_data)
+        try:
+            parse_result = await image_parser.parse_image(image_data)
+        except OCRPoolSaturated as e:
+            logger.warning("OCR pool saturated", pending=ocr_pool.pending)
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": "1"}
+            )
         
         if not parse_result["success"]:
             return MathResponse(
@@ -195,8 +826,10 @@ async def solve_from_image(
             format=format
         )
         
-        return await solve_math_problem(query_data)
+        return await solve_math_problem(query_data, x_deadline_ms=x_deadline_ms, fields=None)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to process image", error=str(e))
         return MathResponse(
@@ -216,15 +849,19 @@ async def create_plot(
     plot_type: str = Form(default="Plot")
 ):
     """Create a mathematical plot."""
-    try:
+    async def render_plot() -> dict:
         async with WolframLanguageEvalClient() as client:
-            result = await client.plot(
+            return await client.plot(
                 expression=expression,
                 variable=variable,
                 range_min=range_min,
                 range_max=range_max,
                 plot_type=plot_type
             )
+
+    try:
+        plot_key = json.dumps([expression.strip(), variable, range_min, range_max, plot_type])
+        result = await plot_flights.do(plot_key, render_plot)
             
         return {
             "success": result["success"],
@@ -305,7 +942,15 @@ def _normalize_wolfram_result(wolfram_result: dict, api_type: str) -> dict:
         return wolfram_result
 
 
-async def _fetch_steps_if_available(wolfram_result: dict, normalized_result: dict, processed_query: str, original_query: str, format: str = "plaintext") -> Optional[List[dict]]:
+async def _fetch_steps_if_available(
+    wolfram_result: dict,
+    normalized_result: dict,
+    processed_query: str,
+    original_query: str,
+    format: str = "plaintext",
+    steps_task: Optional[asyncio.Task] = None,
+    use_step_engine: bool = True
+) -> Optional[List[dict]]:
     """Check if step-by-step solutions are available and fetch them.
 
     Args:
@@ -314,6 +959,8 @@ async def _fetch_steps_if_available(wolfram_result: dict, normalized_result: dic
         processed_query: The processed/formatted query used for the main API call
         original_query: The original user query
         format: Output format for mathematical expressions
+        steps_task: Speculative Show Steps call started alongside the initial call
+        use_step_engine: Whether to try the SymPy step engine before Wolfram
 
     Returns:
         List of steps if available, None otherwise
@@ -322,6 +969,21 @@ async def _fetch_steps_if_available(wolfram_result: dict, normalized_result: dic
     if not wolfram_result.get("pods"):
         return None
 
+    # Steps already expanded by the step-by-step pod state need no second call
+    inline_steps = extract_inline_steps(wolfram_result["pods"])
+    if inline_steps:
+        logger.info("Using step-by-step solution from the initial response")
+        return inline_steps
+
+    # Routine problems are explained by the step engine, which saves the
+    # second Wolfram round trip
+    if use_step_engine:
+        with span("step_engine"):
+            engine_steps = await local_solver.explain(original_query)
+        if engine_steps:
+            logger.info("Using steps from the step engine")
+            return engine_steps
+
     # Look for pods with step-by-step states
     has_step_states = False
     for pod in wolfram_result["pods"]:
@@ -334,49 +996,71 @@ async def _fetch_steps_if_available(wolfram_result: dict, normalized_result: dic
             break
 
     # If step-by-step solutions are available, fetch them
+    # A separate request is only worth making if the deadline leaves room for it
+    if has_step_states and steps_task is None and not has_time_for(settings.deadline_steps_min):
+        logger.info("Skipping step-by-step request, deadline near")
+        return None
+
     if has_step_states:
         try:
             logger.info("Step-by-step solutions available, fetching them")
             # Use original query for step fetching, not the processed/formatted one
-            async with WolframShowStepsClient() as client:
-                steps_result = await client.solve(original_query, format_type=format, show_steps=True)
-                steps = steps_result.get("steps")
-                if steps:
-                    return steps
+            if steps_task is not None:
+                steps_result = await steps_task
+            else:
+                steps_result = await _fetch_show_steps(original_query, format, use_step_engine)
+            steps = steps_result.get("steps")
+            if steps:
+                return steps
         except Exception as e:
             logger.warning("Failed to fetch step-by-step solutions", error=str(e))
 
-    # For systems of equations, even if no step states are found, try to generate steps
-    if query_classifier._is_system_of_equations(original_query):
-        try:
-            async with WolframShowStepsClient() as client:
-                # Get the final answer from the normalized result
-                final_answer = None
-                if "final_answer" in normalized_result:
-                    final_answer = normalized_result["final_answer"]
-                elif wolfram_result.get("pods"):
-                    # Try to extract from pods
-                    for pod in wolfram_result["pods"]:
-                        if pod.get("id") == "Result":
-                            subpods = pod.get("subpods", [])
-                            if subpods:
-                                final_answer = subpods[0].get("plaintext")
-                                break
-
-                if final_answer:
-                    steps = client._generate_basic_steps(original_query, final_answer)
-                    return steps if steps else None
-        except Exception as e:
-            logger.warning("Failed to generate system steps", error=str(e))
-
     return None
 
 
+async def _fetch_show_steps(
+    original_query: str,
+    format: str = "plaintext",
+    use_step_engine: bool = True
+) -> dict:
+    """Fetch a step-by-step solution from the Show Steps API.
+
+    Args:
+        original_query: The original user query
+        format: Output format for mathematical expressions
+        use_step_engine: Whether the step engine may fill in missing steps
+
+    Returns:
+        Show Steps API result
+    """
+    async with WolframShowStepsClient() as client:
+        return await client.solve(
+            original_query,
+            format_type=format,
+            show_steps=True,
+            use_step_engine=use_step_engine
+        )
+
+
+def _discard_task(task: asyncio.Task) -> None:
+    """Cancel a speculative task, or consume its outcome if it already finished.
+
+    Args:
+        task: Task to discard
+    """
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        # Retrieve the exception so it is not reported as never retrieved
+        task.exception()
+
+
 async def _call_wolfram_api(
     api_type: str,
     query: str,
     params: dict,
-    format: str = "plaintext"
+    format: str = "plaintext",
+    use_step_engine: bool = True
 ) -> dict:
     """Call appropriate Wolfram API.
 
@@ -385,6 +1069,8 @@ async def _call_wolfram_api(
         query: Processed query
         params: API parameters
         format: Output format for mathematical expressions
+        use_step_engine: Whether the Show Steps client may fill in missing
+            steps with the step engine
 
     Returns:
         API result
@@ -405,7 +1091,12 @@ async def _call_wolfram_api(
         async with WolframShowStepsClient() as client:
             # Remove format_type from params if it exists to avoid duplicate argument error
             api_params = {k: v for k, v in params.items() if k != 'format_type'}
-            return await client.solve(query, format_type=format, **api_params)
+            return await client.solve(
+                query,
+                format_type=format,
+                use_step_engine=use_step_engine,
+                **api_params
+            )
 
     elif api_type == "language_eval":
         async with WolframLanguageEvalClient() as client:
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Tests for the pre-generated quiz question and flashcard pools."""
+
+import asyncio
+import json
+import uuid
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from api.registry import llm_clients
+from config.settings import settings
+from generators.content_pool import ContentPool
+from generators.quiz_generator import QuizGenerator
+import generators.quiz_generator as quiz_module
+
+TOPICS = {"derivatives": ["power rule", "chain rule"]}
+
+
+class FakeGPT5:
+    """Answers every prompt with distinct items valid for any question type or card."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, messages, **kwargs):
+        self.calls += 1
+        count = int(messages[1]["content"].split()[1])
+        return json.dumps([
+            {"question": f"Question {uuid.uuid4().hex}",
+             "statement": f"Statement {self.calls} {i}", "problem": f"Problem {self.calls} {i}",
+             "options": {"A": "1", "B": "2", "C": "3", "D": "4"}, "correct_answer": "A",
+             "explanation": "because", "sample_answer": "answer", "solution": "answer", "answer": "answer"}
+            for i in range(count)
+        ])
+
+
+_CONFIGURED = (
+    "content_pool_enabled", "content_pool_local_refill", "content_pool_topics",
+    "content_pool_min_size", "content_pool_target_size"
+)
+
+
+def _configure():
+    original = {name: getattr(settings, name) for name in _CONFIGURED}
+    settings.content_pool_enabled = True
+    settings.content_pool_local_refill = True
+    settings.content_pool_topics = TOPICS
+    settings.content_pool_min_size = 2
+    settings.content_pool_target_size = 4
+    return original
+
+
+def _restore(original):
+    for name, value in original.items():
+        setattr(settings, name, value)
+
+
+def test_refill_tops_up_low_pools():
+    """The refill worker fills every configured pool to the target size."""
+    original = _configure()
+    llm_clients._gpt5 = FakeGPT5()
+    try:
+        pool = ContentPool()
+        asyncio.run(pool.refill_low())
+        sizes = asyncio.run(pool.stats())
+
+        assert len(sizes) == 2 * 5
+        assert set(sizes.values()) == {4}
+    finally:
+        llm_clients._gpt5 = None
+        _restore(original)
+
+
+def test_no_local_refill_by_default():
+    """Without Redis, pools are not refilled unless local refill is enabled."""
+    original = _configure()
+    settings.content_pool_local_refill = False
+    client = FakeGPT5()
+    llm_clients._gpt5 = client
+    try:
+        pool = ContentPool()
+        asyncio.run(pool.refill_low())
+
+        assert client.calls == 0
+        assert set(asyncio.run(pool.stats()).values()) == {0}
+    finally:
+        llm_clients._gpt5 = None
+        _restore(original)
+
+
+def test_quiz_is_assembled_from_pool():
+    """Pooled topics are served without live generation; others miss."""
+    original = _configure()
+    client = FakeGPT5()
+    llm_clients._gpt5 = client
+    pool = ContentPool()
+    saved_pool = quiz_module.content_pool
+    quiz_module.content_pool = pool
+    try:
+        asyncio.run(pool.refill_low())
+        calls = client.calls
+
+        quiz = asyncio.run(QuizGenerator().generate_quiz(
+            "Calculus: Derivatives", ["power rule", "chain rule"],
+            question_count=6, question_types=["short_answer"]
+        ))
+        assert len(quiz["questions"]) == 6
+        assert client.calls == calls
+
+        assert asyncio.run(pool.take_questions("integrals", ["power rule"], "intermediate", "short_answer", 3)) == []
+        assert asyncio.run(pool.take_questions("derivatives", ["quotient rule"], "intermediate", "short_answer", 3)) == []
+    finally:
+        quiz_module.content_pool = saved_pool
+        llm_clients._gpt5 = None
+        _restore(original)
+
+
+def test_partial_pool_falls_back_to_live_generation():
+    """A drained pool supplies what it has; the rest is generated live."""
+    original = _configure()
+    client = FakeGPT5()
+    llm_clients._gpt5 = client
+    pool = ContentPool()
+    saved_pool = quiz_module.content_pool
+    quiz_module.content_pool = pool
+    try:
+        asyncio.run(pool.refill_low())
+        calls = client.calls
+
+        quiz = asyncio.run(QuizGenerator().generate_quiz(
+            "derivatives", ["power rule"], question_count=6, question_types=["short_answer"]
+        ))
+        assert len(quiz["questions"]) == 6
+        assert client.calls == calls + 1
+    finally:
+        quiz_module.content_pool = saved_pool
+        llm_clients._gpt5 = None
+        _restore(original)
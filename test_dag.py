@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for the dependency graph executor."""
+
+import asyncio
+import time
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils.dag import run_dag
+
+
+def _sleeper(value, seconds=0.1):
+    async def run(*inputs):
+        await asyncio.sleep(seconds)
+        return (value, inputs)
+    return run
+
+
+def test_graph_takes_the_longest_chain():
+    """Independent nodes overlap; dependents get their inputs in order."""
+    graph = {
+        "a": (_sleeper("a"), ()),
+        "b": (_sleeper("b"), ()),
+        "c": (_sleeper("c"), ("b", "a")),
+    }
+    started = time.perf_counter()
+    results = asyncio.run(run_dag(graph))
+    elapsed = time.perf_counter() - started
+
+    assert results["c"] == ("c", (("b", ()), ("a", ())))
+    assert 0.2 <= elapsed < 0.3
+
+
+def test_invalid_graphs_are_rejected():
+    """Unknown dependencies and cycles raise before anything runs."""
+    for graph in (
+        {"a": (_sleeper("a"), ("missing",))},
+        {"a": (_sleeper("a"), ("b",)), "b": (_sleeper("b"), ("a",))},
+    ):
+        try:
+            asyncio.run(run_dag(graph))
+        except ValueError:
+            continue
+        raise AssertionError("expected ValueError")
+
+
+def test_failure_cancels_remaining_nodes():
+    """A failing node raises and stops nodes still running."""
+    finished = []
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(1)
+        finished.append("slow")
+
+    try:
+        asyncio.run(run_dag({"fail": (fail, ()), "slow": (slow, ())}))
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected RuntimeError")
+    assert finished == []
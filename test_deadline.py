@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Tests for per-request deadline propagation."""
+
+import asyncio
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils.deadline import DeadlineExceeded, budget, deadline_scope, has_time_for, remaining, start_deadline
+
+
+def test_no_deadline_leaves_timeouts_alone():
+    """Without a deadline, stage timeouts and checks are unaffected."""
+    async def run():
+        assert remaining() is None
+        assert budget(10, "stage") == 10
+        assert has_time_for(1000)
+
+    asyncio.run(run())
+
+
+def test_budget_caps_stage_timeout():
+    """Stage timeouts shrink to the time left, and fail once it is gone."""
+    async def run():
+        start_deadline(2)
+        assert budget(10, "stage") <= 2
+        assert budget(1, "stage") == 1
+        assert has_time_for(1) and not has_time_for(5)
+
+        start_deadline(0)
+        try:
+            budget(10, "wolfram")
+        except DeadlineExceeded as e:
+            assert e.stage == "wolfram"
+        else:
+            raise AssertionError("expected DeadlineExceeded")
+
+    asyncio.run(run())
+
+
+def test_scope_only_shortens_and_reaches_tasks():
+    """Nested scopes never extend the deadline, and tasks inherit it."""
+    async def run():
+        start_deadline(5)
+        with deadline_scope(60):
+            assert remaining() <= 5
+        with deadline_scope(1):
+            assert remaining() <= 1
+            assert await asyncio.create_task(asyncio.sleep(0, remaining())) <= 1
+        assert 1 < remaining() <= 5
+
+    asyncio.run(run())
+
+
+def test_shared_call_respects_each_callers_timeout():
+    """A caller joining a shared call stops waiting at its own timeout."""
+    from utils.single_flight import SingleFlight
+
+    async def run():
+        flights = SingleFlight("test")
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        leader = asyncio.create_task(flights.do("key", slow))
+        await asyncio.sleep(0)
+        try:
+            await flights.do("key", slow, timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected TimeoutError")
+
+        # The shared call carries on for the leader
+        assert await leader == "done"
+
+    asyncio.run(run())
+
+
+def test_caller_with_more_time_does_not_join_shorter_call():
+    """A caller with a longer deadline runs its own call rather than inherit a cut-short one."""
+    from utils.single_flight import SingleFlight
+
+    async def run():
+        flights = SingleFlight("test")
+        runs = []
+
+        async def solve():
+            runs.append(1)
+            try:
+                await asyncio.wait_for(asyncio.sleep(0.1), budget(1, "solve"))
+            except asyncio.TimeoutError:
+                return "partial"
+            return "full"
+
+        async def caller(seconds):
+            deadline = start_deadline(seconds)
+            try:
+                return await flights.do("key", solve, timeout=deadline.remaining())
+            except asyncio.TimeoutError:
+                return "partial"
+
+        short = asyncio.create_task(caller(0.02))
+        await asyncio.sleep(0)
+        long = asyncio.create_task(caller(1))
+        await asyncio.sleep(0)
+        # A third caller with less time than the second shares its call
+        assert await asyncio.gather(short, long, caller(0.5)) == ["partial", "full", "full"]
+        assert len(runs) == 2
+
+    asyncio.run(run())
+
+
+def test_batch_solves_duplicates_with_different_deadlines_separately():
+    """Batch items differing only in deadline_ms each get their own budget."""
+    import routes.math as math_routes
+
+    budgets = []
+
+    async def fake_solve(item, wolfram_gate=None):
+        budgets.append(round(remaining()))
+        return math_routes.MathResponse(success=True, query=item.query, result={})
+
+    batch = math_routes.BatchMathQuery(items=[
+        {"query": "x^2 = 4", "deadline_ms": 2000},
+        {"query": "x^2 = 4", "deadline_ms": 9000},
+        {"query": "x^2 = 4", "deadline_ms": 9000},
+    ])
+
+    solve, math_routes._solve = math_routes._solve, fake_solve
+    try:
+        asyncio.run(math_routes.solve_math_problem_batch(batch, x_deadline_ms=None))
+    finally:
+        math_routes._solve = solve
+    assert sorted(budgets) == [2, 9]
+
+
+def test_stalled_explanation_stream_ends_with_error():
+    """A stream that stops sending tokens ends in an error event, not a hang."""
+    from api.registry import llm_clients
+    from config.settings import settings
+    from processors.result_enhancer import ResultEnhancer
+
+    class StallingGroq:
+        def _assess_difficulty(self, query):
+            return "easy"
+
+        async def stream_explanation(self, *args):
+            yield "The derivative "
+            await asyncio.sleep(5)
+            yield "never sent"
+
+    async def nothing(*args, **kwargs):
+        return {}
+
+    enhancer = ResultEnhancer()
+    enhancer._generate_educational_content = nothing
+    enhancer._generate_practice_problems = nothing
+
+    async def run():
+        return [event async for event, _ in enhancer.stream_enhancement({}, "derivative of q^9 + 7q")]
+
+    llm_clients._groq = StallingGroq()
+    idle, settings.llm_stream_idle_timeout = settings.llm_stream_idle_timeout, 0.05
+    try:
+        assert asyncio.run(asyncio.wait_for(run(), 1)) == ["explanation_delta", "error"]
+    finally:
+        settings.llm_stream_idle_timeout = idle
+        llm_clients._groq = None
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Tests for the enrichment cache's variable renaming."""
+
+import asyncio
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from config.settings import settings
+from processors.enrichment_cache import EnrichmentCache, rebind
+
+
+def _lookup(cached_query: str, explanation: str, requested_query: str):
+    cache = EnrichmentCache(max_entries=4)
+
+    async def run():
+        key, variables = cache.make_key(cached_query, "high_school", True)
+        await cache.store(key, variables, {"explanation": explanation})
+        key, variables = cache.make_key(requested_query, "high_school", True)
+        return await cache.get(key, variables)
+
+    enabled, settings.enrichment_cache_enabled = settings.enrichment_cache_enabled, True
+    try:
+        return asyncio.run(run())
+    finally:
+        settings.enrichment_cache_enabled = enabled
+
+
+def test_rebind_keeps_axis_words():
+    """Differentials are renamed; axis and intercept words are not."""
+    text = "d/dx of x^2 is 2x. The x-intercept lies on the x-axis."
+    assert rebind(text, {"x": "t"}) == "d/dt of t^2 is 2t. The x-intercept lies on the x-axis."
+
+
+def test_renamed_hit():
+    """The same problem with another variable name is served renamed."""
+    fields = _lookup("derivative of x^3", "For x^3, d/dx gives 3x^2.", "derivative of t^3")
+    assert fields == {"explanation": "For t^3, d/dt gives 3t^2."}
+
+
+def test_rename_onto_existing_letter_is_a_miss():
+    """Renaming x to y must not merge x with a y already in the cached text."""
+    explanation = "Let y = x^3, so dy/dx = 3x^2. The x-intercept is at the origin."
+    assert _lookup("derivative of x^3", explanation, "derivative of y^3") is None
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Tests for concurrent and batched step explanations."""
+
+import asyncio
+import json
+import re
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from api.registry import llm_clients
+from generators.explanation_generator import ExplanationGenerator
+
+
+class FakeGPT5:
+    """Explains steps, answering batched prompts with JSON."""
+
+    def __init__(self, broken_batches: bool = False):
+        self.broken_batches = broken_batches
+        self.prompts = []
+
+    async def complete(self, messages, **kwargs):
+        prompt = messages[1]["content"]
+        self.prompts.append(prompt)
+        # Later steps answer first, so ordering must not depend on completion
+        numbers = [int(n) for n in re.findall(r"Step (\d+)", prompt)]
+        await asyncio.sleep(0.01 * (10 - numbers[0]))
+
+        if "JSON" not in prompt:
+            return f"1. Explanation\nDoes step {numbers[0]}\n2. Why\nNeeded\n3. Error\nSign slip"
+        if self.broken_batches:
+            return "not json"
+        return json.dumps([
+            {"step": n, "explanation": f"Does step {n}", "why": "Needed", "common_error": "Sign slip"}
+            for n in numbers
+        ])
+
+
+def _explain(client: FakeGPT5, count: int) -> list:
+    llm_clients._gpt5 = client
+    steps = [{"step_number": i + 1, "description": f"do thing {i + 1}"} for i in range(count)]
+    try:
+        return asyncio.run(ExplanationGenerator().generate_step_explanation(steps, "solve it"))
+    finally:
+        llm_clients._gpt5 = None
+
+
+def test_short_solutions_explain_each_step():
+    """Below the batch threshold every step gets its own call."""
+    client = FakeGPT5()
+    explained = _explain(client, 2)
+
+    assert len(client.prompts) == 2
+    assert [step["explanation"] for step in explained] == ["Does step 1", "Does step 2"]
+    assert explained[0]["common_errors"] == ["Sign slip"]
+
+
+def test_long_solutions_are_batched_in_order():
+    """Longer solutions are explained a group per prompt, keeping step order."""
+    client = FakeGPT5()
+    explained = _explain(client, 7)
+
+    assert len(client.prompts) == 2
+    assert [step["step_number"] for step in explained] == list(range(1, 8))
+    assert [step["explanation"] for step in explained] == [f"Does step {n}" for n in range(1, 8)]
+
+
+def test_unusable_batches_fall_back_to_single_steps():
+    """Unparseable batch output is replaced by per-step explanations."""
+    client = FakeGPT5(broken_batches=True)
+    explained = _explain(client, 4)
+
+    assert len(client.prompts) == 1 + 4
+    assert [step["explanation"] for step in explained] == [f"Does step {n}" for n in range(1, 5)]
+
+
+class FakeConceptGPT5:
+    """Answers concept, analogy and related-concept prompts after a delay."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def complete(self, messages, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+
+        prompt = messages[1]["content"]
+        if prompt.startswith("Create a clear analogy"):
+            return "Think of it like a speedometer."
+        if prompt.startswith("From this explanation"):
+            return "limits, slopes"
+        return "A derivative is a rate of change.\n\nExample: d/dx x^2 = 2x\n"
+
+
+def test_concept_explanation_runs_analogy_alongside():
+    """The analogy overlaps the explanation; extractions use its text."""
+    client = FakeConceptGPT5()
+    llm_clients._gpt5 = client
+    try:
+        result = asyncio.run(ExplanationGenerator().generate_concept_explanation(
+            "derivative", analogy_audience="general"
+        ))
+    finally:
+        llm_clients._gpt5 = None
+
+    assert client.max_active == 2
+    assert result["analogy"] == "Think of it like a speedometer."
+    assert result["examples"] == ["Example: d/dx x^2 = 2x"]
+    assert result["related_concepts"] == ["limits", "slopes"]
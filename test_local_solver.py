@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for the local SymPy solver tier."""
+
+import asyncio
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from processors.query_classifier import QueryClassifier
+from processors.local_solver import LocalSolver, solve_problem
+
+classifier = QueryClassifier()
+
+
+def _solve(query: str, format: str = "plaintext") -> dict:
+    problem = classifier.local_problem(query)
+    assert problem is not None, query
+    return solve_problem(problem, format, time_limit=5)
+
+
+def test_recognizes_common_problems():
+    """Problem shapes from the answers/ set are routed to the local tier."""
+    assert classifier.local_problem("What is the derivative of x^3 + 2x^2 + 5?")["kind"] == "derivative"
+    assert classifier.local_problem("Integrate x^3 + 2x + 1 dx")["kind"] == "integral"
+    assert classifier.local_problem("Find the limit as x approaches 0 of (sin(x))/x")["kind"] == "limit"
+    assert classifier.local_problem("Solve x^2 - 5x + 6 = 0")["kind"] == "equation"
+    assert classifier.local_problem("Calculate 10!")["kind"] == "factorial"
+    assert classifier.local_problem("How many ways can you choose 3 items from 10?")["kind"] == "combination"
+    assert classifier.local_problem("Solve the system: 2x + y = 5, x - y = 1")["kind"] == "system"
+
+
+def test_leaves_other_problems_to_wolfram():
+    """Definite integrals and free text are not recognized."""
+    assert classifier.local_problem("integrate x^2 from 0 to 1") is None
+    assert classifier.local_problem("population of France") is None
+
+
+def test_answers():
+    """Answers match the Wolfram plaintext style."""
+    assert _solve("What is the derivative of x^3 + 2x^2 + 5?")["final_answer"] == "3 x^2 + 4 x"
+    assert _solve("Integrate x^3 + 2x + 1 dx")["final_answer"] == "x^4/4 + x^2 + x + constant"
+    assert _solve("Find the limit as x approaches 0 of (sin(x))/x")["final_answer"] == "1"
+    assert _solve("Solve x^2 - 5x + 6 = 0")["final_answer"] == "x = 2, x = 3"
+    assert _solve("Calculate 10!")["final_answer"] == "3628800"
+    assert _solve("How many ways can you arrange 5 books on a shelf?")["final_answer"] == "120"
+    assert _solve("How many ways can you choose 3 items from 10?")["final_answer"] == "120"
+    assert _solve("Solve the system: 2x + y = 5, x - y = 1")["final_answer"] == "x = 2, y = 1"
+
+
+def test_steps_and_latex():
+    """Results carry steps and honor the latex format."""
+    result = _solve("derivative of x^3 + x", format="latex")
+
+    assert result["final_answer"] == "3 x^{2} + 1"
+    assert [step["step_number"] for step in result["steps"]] == list(range(1, len(result["steps"]) + 1))
+
+
+def test_rejects_unsafe_or_unsupported_input():
+    """Input outside the whitelist is refused before parsing."""
+    problem = {"kind": "derivative", "expression": "__import__('os').getcwd()", "variable": None}
+    assert solve_problem(problem, "plaintext", time_limit=5)["success"] is False
+
+    problem = {"kind": "equation", "lhs": "x^3 - 1", "rhs": "0"}
+    assert solve_problem(problem, "plaintext", time_limit=5)["success"] is False
+
+
+def test_falls_through_on_failure():
+    """Failures return None so the route calls Wolfram."""
+    solver = LocalSolver(workers=1, timeout=5, max_pending=4)
+    problem = {"kind": "equation", "lhs": "x + y", "rhs": "1"}
+
+    assert asyncio.run(solver.solve(problem, "x + y = 1")) is None
+
+    result = asyncio.run(solver.solve(classifier.local_problem("Calculate 5!"), "Calculate 5!"))
+    assert result["final_answer"] == "120"
+    assert result["source"] == "sympy"
+
+
+def test_explains_routine_problems():
+    """The step engine explains routine problems and skips the rest."""
+    solver = LocalSolver(workers=1, timeout=5, max_pending=4)
+
+    steps = asyncio.run(solver.explain("Solve 2x + 3 = 7"))
+    assert steps and steps[-1]["math"] == "x = 2"
+
+    assert asyncio.run(solver.explain("Calculate 5!")) == []
+    assert asyncio.run(solver.explain("population of France")) == []
+
+
+def test_show_steps_respects_step_engine_flag():
+    """The Show Steps client only falls back to the step engine when allowed."""
+    import routes.math as math_routes
+    from api.wolfram.show_steps_client import WolframShowStepsClient
+    from processors.local_solver import local_solver
+
+    response = {"queryresult": {"success": True, "pods": [
+        {"id": "Result", "subpods": [{"plaintext": "x = 2"}]}
+    ]}}
+    explained = []
+
+    async def fake_request(self, url, params):
+        return response
+
+    async def fake_explain(query):
+        explained.append(query)
+        return [{"step": 1, "description": "Solve", "math": "x = 2"}]
+
+    make_request, WolframShowStepsClient._make_request = WolframShowStepsClient._make_request, fake_request
+    explain, local_solver.explain = local_solver.explain, fake_explain
+    try:
+        result = asyncio.run(math_routes._fetch_show_steps("Solve 2x + 3 = 7", use_step_engine=False))
+        assert result["final_answer"] == "x = 2" and result["steps"] == []
+        assert explained == []
+
+        result = asyncio.run(math_routes._fetch_show_steps("Solve 2x + 3 = 7"))
+        assert result["steps"] and explained == ["Solve 2x + 3 = 7"]
+    finally:
+        WolframShowStepsClient._make_request = make_request
+        local_solver.explain = explain
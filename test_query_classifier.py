@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Tests for query classification and the keyword matcher."""
+
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from processors.keyword_matcher import KeywordMatcher
+from processors.query_classifier import QueryClassifier, QueryType, WolframAPI
+
+
+def test_matcher_reports_every_family():
+    """Overlapping keywords from different families are all reported."""
+    matcher = KeywordMatcher({
+        "step": ["derive", "steps"],
+        "calculus": ["derivative", "integral"],
+        "complex": ["contour integral"]
+    })
+
+    assert matcher.match("derivative of x^2") == {"calculus"}
+    assert matcher.match("derive the derivative") == {"step", "calculus"}
+    assert matcher.match("evaluate the contour integral") == {"calculus", "complex"}
+    assert matcher.match("show the steps") == {"step"}
+    assert matcher.match("2 + 2") == set()
+
+
+def test_matcher_uses_substring_semantics():
+    """Keywords match inside longer words, like the substring checks they replace."""
+    matcher = KeywordMatcher({"calculus": ["lim"], "plot": ["plot"]})
+
+    assert matcher.match("limit as x goes to 0") == {"calculus"}
+    assert matcher.match("subplot") == {"plot"}
+    assert matcher.match("li m") == set()
+
+
+def test_classify_query_routing():
+    """Routing priorities are unchanged."""
+    classifier = QueryClassifier()
+    cases = {
+        "plot sin(x) from 0 to 10": (QueryType.PLOTTING, WolframAPI.LANGUAGE_EVAL),
+        "show me how to integrate x^2": (QueryType.STEP_BY_STEP_MATH, WolframAPI.SHOW_STEPS),
+        "derivative of x^3": (QueryType.SYMBOLIC_MATH, WolframAPI.FULL_RESULTS),
+        "compute the residue of 1/z at 0": (QueryType.COMPLEX_ANALYSIS, WolframAPI.FULL_RESULTS),
+        "impedance of a 10 ohm resistor": (QueryType.PHYSICS_ENGINEERING, WolframAPI.LLM),
+        "integral of sin(x)": (QueryType.SYMBOLIC_MATH, WolframAPI.FULL_RESULTS),
+        "2x + 3 = 7": (QueryType.EQUATION_SOLVING, WolframAPI.SHOW_STEPS),
+        "2x + y = 5, x - y = 1": (QueryType.EQUATION_SOLVING, WolframAPI.FULL_RESULTS),
+        "12 * 7": (QueryType.SIMPLE_CALCULATION, WolframAPI.LLM),
+        "population of France": (QueryType.NATURAL_LANGUAGE, WolframAPI.LLM),
+    }
+
+    for query, expected in cases.items():
+        assert classifier.classify_query(query) == expected, query
+
+
+def test_format_system_query():
+    """Systems are rewritten into Wolfram Solve syntax."""
+    classifier = QueryClassifier()
+
+    formatted = classifier._format_system_query("Solve the system: 2x + y = 5 and x - y = 1")
+
+    assert formatted == "Solve[{ 2x + y == 5, x - y == 1 }, { x, y }]"
+
+
+def test_requires_clarification():
+    """Ambiguous variables and missing plot ranges ask for clarification."""
+    classifier = QueryClassifier()
+
+    assert classifier.requires_clarification("solve a x + b = 0") is not None
+    assert classifier.requires_clarification("solve x + 2 = 0") is None
+    assert classifier.requires_clarification("plot x^2") == [
+        "What range would you like for the plot? (e.g., from -10 to 10)"
+    ]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for concurrent quiz generation."""
+
+import asyncio
+import json
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from api.registry import llm_clients
+from config.settings import settings
+from generators.quiz_generator import QuizGenerator
+
+
+class FakeGPT5:
+    """Answers quiz prompts with numbered short answer questions."""
+
+    def __init__(self, repeat: int = 0):
+        # The first `repeat` calls all return the same questions
+        self.repeat = repeat
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def complete(self, messages, **kwargs):
+        self.calls += 1
+        offset = 0 if self.calls <= self.repeat else self.calls * 100
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+
+        count = int(messages[1]["content"].split()[1])
+        return json.dumps([
+            {"question": f"What is property {offset + i} of limits?", "sample_answer": "It holds."}
+            for i in range(count)
+        ])
+
+
+def _generate(client: FakeGPT5, count: int) -> dict:
+    llm_clients._gpt5 = client
+    try:
+        return asyncio.run(QuizGenerator().generate_quiz(
+            "limits", ["limits"], question_count=count, question_types=["short_answer"]
+        ))
+    finally:
+        llm_clients._gpt5 = None
+
+
+def test_chunk_sizes_are_balanced():
+    """Counts split into near-equal chunks no larger than quiz_chunk_size."""
+    generator = QuizGenerator()
+    original = settings.quiz_chunk_size
+    settings.quiz_chunk_size = 5
+    try:
+        assert generator._chunk_sizes(0) == []
+        assert generator._chunk_sizes(5) == [5]
+        assert generator._chunk_sizes(8) == [4, 4]
+        assert generator._chunk_sizes(11) == [4, 4, 3]
+    finally:
+        settings.quiz_chunk_size = original
+
+
+def test_chunks_run_concurrently_within_limit():
+    """A large quiz is generated in parallel chunks, bounded by the semaphore."""
+    client = FakeGPT5()
+    quiz = _generate(client, 30)
+
+    assert client.calls == 6
+    assert 1 < client.max_active <= settings.quiz_generation_concurrency
+    assert len(quiz["questions"]) == 30
+    assert [q["number"] for q in quiz["questions"]] == list(range(1, 31))
+
+
+def test_duplicate_questions_are_dropped_and_replaced():
+    """Chunks that repeat each other are deduplicated, then topped up."""
+    client = FakeGPT5(repeat=2)
+    quiz = _generate(client, 10)
+
+    texts = [q["question"] for q in quiz["questions"]]
+    assert client.calls == 3
+    assert len(texts) == 10
+    assert len(set(texts)) == 10
+
+
+def test_top_up_rounds_are_bounded():
+    """A generator that keeps repeating itself does not loop forever."""
+    quiz = _generate(FakeGPT5(repeat=100), 10)
+
+    assert len(quiz["questions"]) == 5
+
+
+def test_questions_differing_in_math_are_kept():
+    """Questions that differ only in a coefficient are not duplicates."""
+    questions = [
+        {"question": "Solve 2x+3=7"},
+        {"question": "Solve 2x+5=7"},
+        {"question": "Solve 2x + 3 = 7"},
+        {"question": "Solve 2x+3=7."}
+    ]
+
+    kept = QuizGenerator()._dedupe_questions(questions)
+    assert [q["question"] for q in kept] == ["Solve 2x+3=7", "Solve 2x+5=7"]
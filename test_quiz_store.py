@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for the quiz repository and server-side grading."""
+
+import asyncio
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from generators.quiz_generator import QuizGenerator
+from generators.quiz_store import InMemoryQuizStore
+
+
+def _quiz(quiz_id: str = "quiz_test") -> dict:
+    generator = QuizGenerator()
+    questions = [
+        {"type": "multiple_choice", "question": "2 + 2?", "options": {"A": "3", "B": "4", "C": "5", "D": "6"},
+         "correct_answer": "B", "explanation": "", "concept": "addition", "points": 2},
+        {"type": "true_false", "question": "0 is even", "correct_answer": True,
+         "explanation": "", "concept": "parity", "points": 1},
+        {"type": "short_answer", "question": "Define a prime", "sample_answer": "Only divisible by 1 and itself",
+         "key_points": ["divisible", "itself"], "concept": "primes", "points": 4},
+    ]
+    for number, question in enumerate(questions, 1):
+        question["number"] = number
+    return {
+        "id": quiz_id,
+        "questions": questions,
+        "total_points": 7,
+        "answer_key": generator._generate_answer_key(questions)
+    }
+
+
+def test_store_round_trip_and_expiry():
+    """Saved quizzes come back with their answer key until the TTL passes."""
+    async def run():
+        store = InMemoryQuizStore(ttl=60)
+        await store.save(_quiz())
+        loaded = await store.get("quiz_test")
+        assert loaded == _quiz()
+        assert await store.get("quiz_missing") is None
+
+        expired = InMemoryQuizStore(ttl=0)
+        await expired.save(_quiz())
+        assert await expired.get("quiz_test") is None
+
+    asyncio.run(run())
+
+
+def test_grading_uses_stored_answer_key():
+    """Submissions are graded against the stored answers."""
+    generator = QuizGenerator()
+    results = generator.grade_quiz(_quiz(), {"1": "B", "2": False, "3": "It is divisible only by 1 and itself"})
+
+    assert results["questions"]["1"]["correct"] is True
+    assert results["questions"]["2"]["correct"] is False
+    assert results["questions"]["3"]["points_earned"] == 4
+    assert results["earned_points"] == 6
+    assert results["percentage"] == 85.7
+    assert "parity" in results["feedback"][-1]
+
+
+def test_grading_key_is_reused_per_quiz():
+    """Repeat submissions for one quiz share a single indexed answer key."""
+    generator = QuizGenerator()
+    quiz = _quiz()
+    generator.grade_quiz(quiz, {})
+    grading_key = generator._grading_keys["quiz_test"]
+
+    generator.grade_quiz(_quiz(), {"1": "A"})
+    assert generator._grading_keys["quiz_test"] is grading_key
+    assert list(grading_key) == ["1", "2", "3"]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests for the upstream token-bucket rate limiter and concurrency caps."""
+
+import asyncio
+import time
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils.concurrency import llm_concurrency_scope, llm_slot
+from utils.rate_limiter import RateLimiter, RateLimitExceeded, TokenBucket
+
+
+def test_bucket_allows_burst_then_paces():
+    """A full bucket serves its burst immediately, then waits for refills."""
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.reserve(max_wait=1) == 0
+    assert bucket.reserve(max_wait=1) == 0
+    assert 0 < bucket.reserve(max_wait=1) <= 0.1
+
+
+def test_bucket_refuses_beyond_max_wait():
+    """Reservations that would wait too long are refused without consuming."""
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.reserve(max_wait=0)
+
+    assert bucket.reserve(max_wait=0.1) < 0
+    assert 0 < bucket.reserve(max_wait=2) <= 1
+
+
+def test_acquire_queues_requests_over_budget():
+    """Requests over budget are delayed rather than failed."""
+    limiter = RateLimiter({"wolfram": (20, 1)})
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire("wolfram", max_wait=1)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_acquire_raises_past_deadline():
+    """A request that cannot be served within max_wait fails with retry_after."""
+    limiter = RateLimiter({"groq": (1, 1)})
+
+    async def run():
+        await limiter.acquire("groq", max_wait=0)
+        await limiter.acquire("groq", max_wait=0.1)
+
+    try:
+        asyncio.run(run())
+    except RateLimitExceeded as e:
+        assert e.bucket == "groq"
+        assert 0 < e.retry_after <= 1
+    else:
+        raise AssertionError("second request should be refused")
+
+
+def test_disabled_buckets_and_stats():
+    """Buckets with a rate of 0 are unlimited and not reported."""
+    limiter = RateLimiter({"wolfram": (5, 10), "wolfram.llm": (0, 10)})
+
+    asyncio.run(limiter.acquire("wolfram", "wolfram.llm"))
+    stats = asyncio.run(limiter.stats())
+
+    assert list(stats) == ["wolfram"]
+    assert 8.9 <= stats["wolfram"]["remaining"] <= 10
+
+
+def test_refused_request_leaves_other_buckets_untouched():
+    """A refusal by one bucket takes no tokens from the others."""
+    limiter = RateLimiter({"wolfram": (1, 5), "wolfram.llm": (1, 1)})
+
+    async def run():
+        await limiter.acquire("wolfram", "wolfram.llm", max_wait=0)
+        for _ in range(3):
+            try:
+                await limiter.acquire("wolfram", "wolfram.llm", max_wait=0)
+            except RateLimitExceeded as e:
+                assert e.bucket == "wolfram.llm"
+            else:
+                raise AssertionError("wolfram.llm should refuse")
+        return await limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["wolfram"]["remaining"] >= 3.9
+
+
+def test_llm_cap_bounds_completions_across_tasks():
+    """The cap counts single completions from every task in the scope."""
+    async def run():
+        active = []
+        peak = []
+
+        async def completion():
+            async with llm_slot():
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+
+        async def pipeline():
+            await asyncio.gather(*(completion() for _ in range(3)))
+
+        with llm_concurrency_scope(2):
+            tasks = [asyncio.create_task(pipeline()) for _ in range(3)]
+        await asyncio.gather(*tasks)
+        # Outside a scope, calls are not capped
+        await asyncio.gather(pipeline(), pipeline())
+        return peak
+
+    peak = asyncio.run(run())
+    assert max(peak[:9]) == 2
+    assert max(peak[9:]) == 6
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Tests for Wolfram retry, hedging and circuit breaker policy."""
+
+import asyncio
+import sys
+import os
+
+import httpx
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from api.wolfram.resilience import CircuitBreaker, CircuitOpenError, EndpointPolicy, hedged, is_retryable
+from config.settings import settings
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.wolframalpha.com/v2/query")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+def test_retryable_errors():
+    """Transport errors and overload statuses are retried; 501 (not understood) is not."""
+    assert is_retryable(httpx.ConnectTimeout("timeout"))
+    assert is_retryable(_status_error(503))
+    assert is_retryable(_status_error(429))
+    assert not is_retryable(_status_error(501))
+    assert not is_retryable(_status_error(400))
+
+
+def test_breaker_opens_and_probes():
+    """The breaker opens after the threshold and lets one probe through after the timeout."""
+    breaker = CircuitBreaker("wolfram.test", failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("only one probe may run while half-open")
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_policy_retries_then_opens_breaker():
+    """Failed retries count once toward the breaker, which then fails fast."""
+    policy = EndpointPolicy("test_retries")
+    policy.breaker.failure_threshold = 1
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        raise _status_error(503)
+
+    async def run():
+        for _ in range(2):
+            try:
+                await policy.run(attempt, idempotent=True)
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                last = e
+        return last
+
+    backoff, settings.wolfram_retry_backoff = settings.wolfram_retry_backoff, 0
+    try:
+        assert isinstance(asyncio.run(run()), CircuitOpenError)
+    finally:
+        settings.wolfram_retry_backoff = backoff
+    assert len(attempts) == settings.wolfram_retries + 1
+
+
+def test_hedged_returns_first_success():
+    """A slow first copy is beaten by the hedge."""
+    delays = [1.0, 0.0]
+
+    async def call():
+        await asyncio.sleep(delays.pop(0))
+        return "done"
+
+    async def run():
+        return await asyncio.wait_for(hedged(call, 0.05, "test"), 0.5)
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_hedged_cancels_copies_when_caller_is_cancelled():
+    """Cancelling the caller before or after the hedge stops every copy."""
+    for timeout in (0.02, 0.1):
+        started = []
+
+        async def call():
+            started.append(asyncio.current_task())
+            await asyncio.sleep(1)
+
+        async def run():
+            try:
+                await asyncio.wait_for(hedged(call, 0.05, "test"), timeout)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(0.01)
+            return [task.cancelled() for task in started]
+
+        cancelled = asyncio.run(run())
+        assert cancelled and all(cancelled)
+
+
+def test_short_deadlines_do_not_open_breaker():
+    """Attempts cut short by the caller's deadline are not upstream failures."""
+    from api.wolfram.base_client import WolframBaseClient
+    from api.wolfram.resilience import get_policy
+    from utils.deadline import DeadlineExceeded, deadline_scope
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={})
+
+    class SlowClient(WolframBaseClient):
+        api_name = "deadline_test"
+
+    policy = get_policy("deadline_test")
+    policy.breaker.failure_threshold = 1
+
+    async def run():
+        client = SlowClient()
+        await client.client.aclose()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(slow))
+        async with client:
+            for _ in range(5):
+                with deadline_scope(0.05):
+                    try:
+                        await client._send("https://api.wolframalpha.com/v2/query", {}, "GET")
+                    except DeadlineExceeded:
+                        pass
+                    else:
+                        raise AssertionError("expected DeadlineExceeded")
+
+    asyncio.run(run())
+    assert policy.breaker.state == "closed"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the Redis-backed Wolfram response cache."""
+
+import asyncio
+import json
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from api.wolfram import response_cache as cache_module
+from api.wolfram.response_cache import WolframResponseCache
+from config.settings import settings
+
+
+class FakeRedis:
+    """Holds raw values the way Redis returns them."""
+
+    def __init__(self, values: dict):
+        self.values = values
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _get(values: dict, key: str):
+    cache = WolframResponseCache()
+    get_redis, cache_module.get_redis = cache_module.get_redis, lambda: FakeRedis(values)
+    enabled, settings.wolfram_cache_enabled = settings.wolfram_cache_enabled, True
+    try:
+        response = asyncio.run(cache.get("llm", key, "GET", "https://www.wolframalpha.com/api/v1/llm-api"))
+    finally:
+        cache_module.get_redis = get_redis
+        settings.wolfram_cache_enabled = enabled
+    return cache, response
+
+
+def test_hit_replays_response():
+    """A stored entry is replayed as an httpx response."""
+    entry = {"status": 200, "content_type": "text/plain", "body": "x = 2", "negative": False}
+    cache, response = _get({"key": json.dumps(entry)}, "key")
+    assert response.status_code == 200 and response.text == "x = 2"
+    assert cache.hits["llm"] == 1
+
+
+def test_corrupt_entry_is_a_miss_and_deleted():
+    """Undecodable or incomplete entries are dropped instead of raising."""
+    for raw in ('{"status": 200, "bo', json.dumps({"status": 200})):
+        values = {"key": raw}
+        cache, response = _get(values, "key")
+        assert response is None
+        assert cache.misses["llm"] == 1
+        assert "key" not in values
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for the rule-based step engine."""
+
+import sys
+import os
+
+import sympy
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from processors.step_engine import derivative_steps, equation_steps, system_steps
+
+x, y, z = sympy.symbols("x y z")
+
+
+def _descriptions(steps):
+    return [step["description"] for step in steps]
+
+
+def test_linear_equation():
+    """ax + b = c is solved by isolating x."""
+    variable, solutions, steps = equation_steps(2 * x + 3, sympy.Integer(7))
+
+    assert variable == x
+    assert solutions == [2]
+    assert [step["math"] for step in steps] == ["2 x + 3 = 7", "2 x = 4", "x = 2"]
+
+
+def test_quadratic_formula():
+    """Quadratics go through the discriminant and the quadratic formula."""
+    _, solutions, steps = equation_steps(x**2 - 5 * x + 6, sympy.Integer(0))
+
+    assert solutions == [2, 3]
+    assert "Compute the discriminant" in _descriptions(steps)
+    assert steps[-1]["math"] == "x = 3"
+
+
+def test_rejects_unsupported_equations():
+    """Higher degrees and several variables are left to Wolfram."""
+    for lhs in (x**3 - 1, x + y):
+        try:
+            equation_steps(lhs, sympy.Integer(0))
+        except ValueError:
+            continue
+        raise AssertionError(f"{lhs} should be rejected")
+
+
+def test_system_by_elimination():
+    """2x2 and 3x3 systems are solved by elimination and back substitution."""
+    values, steps = system_steps([(2 * x + y, 5), (x - y, 1)])
+    assert values == {x: 2, y: 1}
+    assert steps[1]["description"].startswith("Eliminate x from equation 2")
+
+    values, _ = system_steps([(x + y + z, 6), (2 * x - y + z, 3), (x + 2 * y - z, 1)])
+    assert values == {x: sympy.Rational(5, 7), y: sympy.Rational(13, 7), z: sympy.Rational(24, 7)}
+
+
+def test_singular_system():
+    """Dependent equations have no unique solution."""
+    try:
+        system_steps([(x + y, 1), (2 * x + 2 * y, 2)])
+    except ValueError:
+        return
+    raise AssertionError("singular system should be rejected")
+
+
+def test_derivative_rules():
+    """Sum, power, product and chain rules are each named in the steps."""
+    _, steps = derivative_steps(x**3 + 2 * x**2 + 5, x)
+    descriptions = " ".join(_descriptions(steps))
+    assert "sum rule" in descriptions and "power rule" in descriptions
+
+    result, steps = derivative_steps(x * sympy.sin(x**2), x)
+    descriptions = " ".join(_descriptions(steps))
+    assert "product rule" in descriptions and "chain rule" in descriptions
+    assert result == sympy.diff(x * sympy.sin(x**2), x)
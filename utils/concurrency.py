@@ -0,0 +1,35 @@
+"""Per-request caps on concurrent upstream calls."""
+from typing import Optional
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+_llm_gate: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("llm_gate", default=None)
+
+
+@contextmanager
+def llm_concurrency_scope(limit: int):
+    """Cap concurrent LLM calls made inside the enclosed block.
+
+    The cap is shared by every task created inside the block, so it bounds
+    individual completions across a whole request rather than pipelines.
+
+    Args:
+        limit: Maximum completions in flight at once
+    """
+    token = _llm_gate.set(asyncio.Semaphore(limit))
+    try:
+        yield
+    finally:
+        _llm_gate.reset(token)
+
+
+@asynccontextmanager
+async def llm_slot():
+    """Hold one slot of the current LLM cap, if any, for a single call."""
+    gate = _llm_gate.get()
+    if gate is None:
+        yield
+        return
+    async with gate:
+        yield
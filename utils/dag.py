@@ -0,0 +1,82 @@
+"""Run dependent async generations concurrently, each once its inputs are ready."""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+
+from .tracing import span
+
+# Node name -> (coroutine function, names of the nodes whose results it takes)
+Graph = Dict[str, Tuple[Callable[..., Awaitable[Any]], Sequence[str]]]
+
+
+def _check_graph(graph: Graph) -> List[str]:
+    """Order a graph so every node comes after its dependencies.
+
+    Args:
+        graph: Nodes and their dependencies
+
+    Returns:
+        Node names in dependency order
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: Tuple[str, ...]) -> None:
+        if name not in graph:
+            raise ValueError(f"Unknown dependency {name!r} of {path[-1]!r}")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+        state[name] = "visiting"
+        for dependency in graph[name][1]:
+            visit(dependency, path + (name,))
+        state[name] = "done"
+        order.append(name)
+
+    for name in graph:
+        visit(name, ())
+    return order
+
+
+async def run_dag(graph: Graph, span_prefix: Optional[str] = None) -> Dict[str, Any]:
+    """Run every node of a graph, as early as its dependencies allow.
+
+    Each node is called with its dependencies' results as positional
+    arguments, in the order listed. Independent nodes run concurrently, so
+    the graph takes as long as its longest chain. If a node fails, the
+    nodes still running are cancelled and the error is raised.
+
+    Args:
+        graph: Node name -> (coroutine function, dependency names)
+        span_prefix: Optional prefix for a tracing span per node
+
+    Returns:
+        Node name -> result
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_node(name: str) -> Any:
+        func, dependencies = graph[name]
+        inputs = [await tasks[dependency] for dependency in dependencies]
+        if span_prefix is None:
+            return await func(*inputs)
+        with span(f"{span_prefix}.{name}"):
+            return await func(*inputs)
+
+    # Dependencies are created first so every node can await them
+    for name in _check_graph(graph):
+        tasks[name] = asyncio.create_task(run_node(name))
+
+    try:
+        results = await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+    return dict(zip(tasks, results))
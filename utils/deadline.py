@@ -0,0 +1,108 @@
+"""Per-request deadlines propagated to every pipeline stage."""
+from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage cannot start or finish within the request deadline."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """Absolute point in time by which a request must be answered."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (negative once expired)."""
+        return self.expires_at - time.monotonic()
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def start_deadline(seconds: float) -> Deadline:
+    """Set the deadline for the current request context.
+
+    Args:
+        seconds: Budget in seconds
+
+    Returns:
+        New deadline
+    """
+    deadline = Deadline(seconds)
+    _current_deadline.set(deadline)
+    return deadline
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run the enclosed block under a deadline.
+
+    A nested scope can only shorten the enclosing deadline, never extend
+    it. Tasks created inside the block inherit the deadline.
+
+    Args:
+        seconds: Budget in seconds, or None to keep the enclosing deadline
+    """
+    parent = _current_deadline.get()
+    if seconds is None or (parent is not None and parent.remaining() <= seconds):
+        yield parent
+        return
+
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline.
+
+    Returns:
+        Remaining seconds, or None when no deadline is set
+    """
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def budget(timeout: float, stage: str) -> float:
+    """Cap a stage timeout by the remaining request budget.
+
+    Args:
+        timeout: The stage's own timeout in seconds
+        stage: Stage name for the error message
+
+    Returns:
+        Timeout to use
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(stage)
+    return min(timeout, left)
+
+
+def has_time_for(seconds: float) -> bool:
+    """Check whether at least a number of seconds remain.
+
+    Args:
+        seconds: Required budget
+
+    Returns:
+        True if no deadline is set or enough time remains
+    """
+    left = remaining()
+    return left is None or left >= seconds
@@ -0,0 +1,257 @@
+"""Token-bucket rate limiting for upstream APIs (Wolfram Alpha, Groq)."""
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import time
+import structlog
+
+from config.settings import settings
+from .deadline import remaining
+from .metrics import registry, Counter
+from .redis_pool import get_redis
+from .tracing import span
+
+logger = structlog.get_logger()
+
+rate_limit_requests = registry.register(Counter(
+    "stem_rate_limit_requests_total",
+    "Upstream requests passing through the rate limiter, by bucket and outcome",
+    ["bucket", "outcome"]
+))
+
+# Reserve one token from each bucket stored as a Redis hash, or from none.
+# Tokens may go negative: the caller then waits for its reservation to
+# mature. If any bucket would make the request wait longer than max_wait,
+# nothing is reserved. ARGV holds max_wait, then rate and capacity per key.
+# Returns {0, wait per bucket in ms}, or {index of the refusing bucket,
+# -(its wait in ms + 1)}.
+_RESERVE_SCRIPT = """
+local max_wait = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local tokens = {}
+local waits = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local available = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated) * rate) - 1
+
+    local wait = 0
+    if available < 0 then
+        wait = -available / rate
+    end
+    if wait > max_wait then
+        return {i, -math.floor(wait * 1000) - 1}
+    end
+    tokens[i] = available
+    waits[i] = math.floor(wait * 1000)
+end
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', key, 'tokens', tokens[i], 'updated', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return {0, unpack(waits)}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when an upstream budget cannot serve a request in time."""
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(f"Rate limit for {bucket} exceeded, retry after {retry_after:.1f}s")
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """In-process token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token reserved now could be used."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self, max_wait: float) -> float:
+        """Reserve one token.
+
+        Args:
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds to wait before using the reservation, or a negative
+            number (minus the required wait) if it would exceed max_wait
+        """
+        wait = self.wait_time()
+        if wait > max_wait:
+            return -wait
+        self.tokens -= 1
+        return wait
+
+    def remaining(self) -> float:
+        """Tokens currently available."""
+        self._refill()
+        return max(0.0, self.tokens)
+
+
+class RateLimiter:
+    """Per-upstream and per-API-type token buckets.
+
+    Buckets live in process by default. With rate_limit_shared enabled they
+    live in Redis, so every uvicorn worker draws from one global budget;
+    if Redis is unreachable the in-process buckets take over. Requests over
+    budget wait for a token rather than fail, up to rate_limit_max_wait.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        """Create the limiter.
+
+        Args:
+            limits: Bucket name -> (requests per second, burst capacity);
+                buckets with a rate of 0 are unlimited
+        """
+        self.limits = {name: limit for name, limit in limits.items() if limit[0] > 0}
+        self._local = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in self.limits.items()}
+        self._script = None
+
+    async def acquire(self, *buckets: str, max_wait: Optional[float] = None) -> None:
+        """Take one token from each bucket, waiting if needed.
+
+        Tokens are taken from every bucket or, if one refuses, from none.
+
+        Args:
+            buckets: Bucket names, e.g. "wolfram" and "wolfram.full_results"
+            max_wait: Longest wait in seconds (defaults to rate_limit_max_wait,
+                capped by the request deadline)
+
+        Raises:
+            RateLimitExceeded: If a token would not be available within max_wait
+        """
+        if max_wait is None:
+            max_wait = settings.rate_limit_max_wait
+        # Never queue past the request deadline
+        left = remaining()
+        if left is not None:
+            max_wait = min(max_wait, max(0.0, left))
+
+        limited = [bucket for bucket in buckets if bucket in self.limits]
+        if not limited:
+            return
+
+        waits = await self._reserve(limited, max_wait)
+        for bucket, wait in waits.items():
+            if wait < 0:
+                rate_limit_requests.inc(bucket=bucket, outcome="rejected")
+                logger.warning("Upstream rate limit exceeded", bucket=bucket, retry_after=-wait)
+                raise RateLimitExceeded(bucket, -wait)
+            rate_limit_requests.inc(bucket=bucket, outcome="queued" if wait > 0 else "immediate")
+
+        # Reservations in every bucket are held, so waiting for the longest covers them all
+        wait = max(waits.values(), default=0.0)
+        if wait > 0:
+            with span("rate_limit_wait"):
+                await asyncio.sleep(wait)
+
+    async def _reserve(self, buckets: List[str], max_wait: float) -> Dict[str, float]:
+        """Reserve a token in every bucket, or in none of them.
+
+        Uses the shared buckets, or the local ones without Redis. A bucket
+        that refuses leaves the others untouched, so one refused request
+        does not drain unrelated budgets.
+
+        Args:
+            buckets: Bucket names
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Bucket -> seconds to wait, or, if a bucket refuses, only that
+            bucket -> minus its required wait
+        """
+        client = get_redis() if settings.rate_limit_shared else None
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(_RESERVE_SCRIPT)
+                args: List[float] = [max_wait]
+                for bucket in buckets:
+                    args.extend(self.limits[bucket])
+                refused, *results = await self._script(
+                    keys=[f"ratelimit:{bucket}" for bucket in buckets],
+                    args=args
+                )
+                if refused:
+                    return {buckets[int(refused) - 1]: (int(results[0]) + 1) / 1000}
+                return {bucket: int(result) / 1000 for bucket, result in zip(buckets, results)}
+            except Exception as e:
+                logger.warning("Shared rate limit unavailable, using local buckets", buckets=buckets, error=str(e))
+
+        local = [self._local[bucket] for bucket in buckets]
+        for bucket, local_bucket in zip(buckets, local):
+            wait = local_bucket.wait_time()
+            if wait > max_wait:
+                return {bucket: -wait}
+        return {bucket: local_bucket.reserve(max_wait) for bucket, local_bucket in zip(buckets, local)}
+
+    async def stats(self) -> Dict[str, Any]:
+        """Get the remaining quota per bucket.
+
+        Returns:
+            Bucket name -> rate, burst and tokens currently available
+        """
+        client = get_redis() if settings.rate_limit_shared else None
+        shared: List[Any] = []
+        if client is not None and self.limits:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for bucket in self.limits:
+                        pipe.hmget(f"ratelimit:{bucket}", "tokens", "updated")
+                    pipe.time()
+                    shared = await pipe.execute()
+            except Exception as e:
+                logger.warning("Could not read shared rate limit state", error=str(e))
+
+        now = shared[-1][0] + shared[-1][1] / 1_000_000 if shared else None
+        stats = {}
+        for index, (bucket, (rate, capacity)) in enumerate(self.limits.items()):
+            if shared:
+                tokens, updated = shared[index]
+                if tokens is None:
+                    remaining = capacity
+                else:
+                    remaining = min(capacity, float(tokens) + max(0.0, now - float(updated)) * rate)
+            else:
+                remaining = self._local[bucket].remaining()
+            stats[bucket] = {
+                "rate_per_second": rate,
+                "burst": capacity,
+                "remaining": round(max(0.0, remaining), 2),
+                "shared": bool(shared)
+            }
+        return stats
+
+
+# Process-wide limiter used by the Wolfram and Groq clients
+rate_limiter = RateLimiter({
+    "wolfram": (settings.wolfram_rate_limit, settings.wolfram_rate_burst),
+    "wolfram.llm": (settings.wolfram_llm_rate_limit, settings.wolfram_rate_burst),
+    "wolfram.full_results": (settings.wolfram_full_results_rate_limit, settings.wolfram_rate_burst),
+    "wolfram.show_steps": (settings.wolfram_show_steps_rate_limit, settings.wolfram_rate_burst),
+    "groq": (settings.groq_rate_limit, settings.groq_rate_burst),
+})
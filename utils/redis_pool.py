@@ -0,0 +1,62 @@
+"""Shared Redis connection for caches and cross-worker state."""
+from typing import Optional
+import structlog
+import redis.asyncio as redis
+
+from config.settings import settings
+
+logger = structlog.get_logger()
+
+_redis: Optional[redis.Redis] = None
+
+
+async def init_redis() -> Optional[redis.Redis]:
+    """Connect to Redis.
+
+    Redis is optional: if the server cannot be reached the service keeps
+    running and every Redis-backed feature degrades to a no-op.
+
+    Returns:
+        Connected client, or None if Redis is unavailable
+    """
+    global _redis
+
+    if _redis is not None:
+        return _redis
+
+    client = redis.from_url(
+        settings.redis_url,
+        socket_connect_timeout=settings.redis_socket_timeout,
+        socket_timeout=settings.redis_socket_timeout
+    )
+
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning("Redis unavailable, caching disabled", url=settings.redis_url, error=str(e))
+        await client.aclose()
+        return None
+
+    _redis = client
+    logger.info("Connected to Redis", url=settings.redis_url)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis connection."""
+    global _redis
+
+    if _redis is None:
+        return
+
+    await _redis.aclose()
+    _redis = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Get the shared Redis client.
+
+    Returns:
+        Redis client, or None if Redis is not connected
+    """
+    return _redis
@@ -0,0 +1,67 @@
+"""Fast JSON responses for large solve payloads."""
+from typing import Any
+import structlog
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from config.settings import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = structlog.get_logger()
+
+if settings.fast_json_responses and orjson is None:
+    logger.warning("fast_json_responses is enabled but orjson is not installed, using jsonable_encoder")
+
+
+def _encode_default(value: Any) -> Any:
+    """Convert values orjson cannot serialize natively.
+
+    Args:
+        value: Unsupported value
+
+    Returns:
+        JSON-compatible replacement
+    """
+    if isinstance(value, BaseModel):
+        # Fields were validated when the model was built; hand orjson the
+        # attributes as they are instead of dumping the model again
+        return {name: getattr(value, name) for name in type(value).model_fields}
+    return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    The content is a response model, or plain data, that has already been
+    validated; it is written out directly with no jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the content.
+
+        Args:
+            content: Response model or JSON-compatible data
+
+        Returns:
+            UTF-8 encoded JSON
+        """
+        return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: Any) -> JSONResponse:
+    """Build a JSON response, using orjson when fast_json_responses is on.
+
+    Args:
+        content: Response model or JSON-compatible data
+
+    Returns:
+        JSON response
+    """
+    if settings.fast_json_responses and orjson is not None:
+        return FastJSONResponse(content)
+    return JSONResponse(jsonable_encoder(content))
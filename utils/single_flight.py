@@ -0,0 +1,95 @@
+"""Coalesce concurrent identical calls into one in-flight execution."""
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+import asyncio
+
+from .metrics import registry, Counter
+from .tracing import span
+
+T = TypeVar("T")
+
+single_flight_calls = registry.register(Counter(
+    "stem_single_flight_calls_total",
+    "Calls through single-flight groups, by whether they ran or joined an in-flight call",
+    ["group", "outcome"]
+))
+
+
+class SingleFlight:
+    """Run at most one call per key at a time.
+
+    Callers arriving while a call for the same key is in flight await the
+    same task instead of starting their own. The task is shielded, so a
+    caller disconnecting does not cancel it for the others. Results are not
+    kept after the call finishes; this only deduplicates concurrent work.
+
+    A caller only joins a call started with at least as much time as it
+    has itself, since the call's work is bounded by its leader's timeout;
+    a caller with more time starts its own call, which later callers join.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # Key -> (task, loop time by which its leader stops waiting, or None)
+        self._inflight: Dict[str, Tuple[asyncio.Task, Optional[float]]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Run fn, or join the in-flight call for key.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument coroutine function performing the call
+            timeout: Longest this caller waits, in seconds; the call keeps
+                running for the other callers when it expires
+
+        Returns:
+            Result of the shared call (exceptions are re-raised to every caller)
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expires first
+        """
+        deadline = asyncio.get_running_loop().time() + timeout if timeout is not None else None
+        inflight = self._inflight.get(key)
+        if inflight is not None and _covers(inflight[1], deadline):
+            single_flight_calls.inc(group=self.name, outcome="shared")
+            with span(f"{self.name}.coalesced"):
+                return await asyncio.wait_for(asyncio.shield(inflight[0]), timeout)
+
+        single_flight_calls.inc(group=self.name, outcome="leader")
+        task = asyncio.create_task(fn())
+        self._inflight[key] = (task, deadline)
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call so the next caller starts afresh.
+
+        Args:
+            key: Identity of the call
+            task: Finished task
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is task:
+            del self._inflight[key]
+        # Mark the exception retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def inflight(self) -> int:
+        """Number of calls currently in flight."""
+        return len(self._inflight)
+
+
+def _covers(leader: Optional[float], caller: Optional[float]) -> bool:
+    """Check whether a call's deadline leaves a caller all of its own time.
+
+    Args:
+        leader: Deadline of the in-flight call, or None if unbounded
+        caller: Deadline of the joining caller, or None if unbounded
+
+    Returns:
+        True if the caller can share the call without losing time
+    """
+    if leader is None:
+        return True
+    return caller is not None and caller <= leader
@@ -0,0 +1,171 @@
+"""Background sampler for process and host metrics."""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+import os
+import time
+import psutil
+import structlog
+
+from config.settings import settings
+
+logger = structlog.get_logger()
+
+
+class SystemMonitor:
+    """Sample system metrics off the request path.
+
+    psutil calls run in a worker thread on a fixed interval and the latest
+    snapshot is kept in memory, so health checks never block the event loop.
+    Collectors that need I/O (Redis-backed stats) run on the same interval,
+    so a slow backend delays the snapshot rather than the health check.
+    Event-loop lag is measured as how late the sampler wakes up.
+    """
+
+    def __init__(self, interval: float = 5.0, window: int = 12):
+        self.interval = interval
+        self._process = psutil.Process(os.getpid())
+        self._cpu_history = deque(maxlen=window)
+        self._lag_history = deque(maxlen=window)
+        self._snapshot: Dict[str, Any] = {}
+        self._collectors: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._collected: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_collector(self, name: str, collect: Callable[[], Awaitable[Any]]) -> None:
+        """Sample an extra section of the snapshot in the background.
+
+        Args:
+            name: Snapshot key for the section
+            collect: Zero-argument coroutine function returning the section
+        """
+        self._collectors[name] = collect
+
+    async def start(self) -> None:
+        """Start the sampling task."""
+        if self._task is not None:
+            return
+
+        # Prime cpu_percent so the first interval=None reading is meaningful
+        await asyncio.to_thread(self._prime)
+        self._task = asyncio.create_task(self._run())
+        logger.info("System monitor started", interval=self.interval)
+
+    async def stop(self) -> None:
+        """Stop the sampling task."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the latest metrics.
+
+        Returns:
+            Most recent sample, or an empty dict before the first one
+        """
+        if not self._snapshot:
+            return {}
+        return {**self._snapshot, **self._collected}
+
+    def _prime(self) -> None:
+        """Take the baseline CPU readings."""
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+
+    async def _run(self) -> None:
+        """Sample metrics until cancelled."""
+        loop = asyncio.get_running_loop()
+        lag = 0.0
+
+        while True:
+            try:
+                sample = await asyncio.to_thread(self._sample)
+                self._record(sample, lag)
+            except Exception as e:
+                logger.warning("System metrics sample failed", error=str(e))
+            await self._collect()
+
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+    async def _collect(self) -> None:
+        """Run every collector, keeping the previous value of any that fails."""
+        async def run(name: str, collect: Callable[[], Awaitable[Any]]) -> None:
+            try:
+                self._collected[name] = await asyncio.wait_for(collect(), self.interval)
+            except Exception as e:
+                logger.warning("Health collector failed", collector=name, error=str(e) or type(e).__name__)
+
+        await asyncio.gather(*(run(name, collect) for name, collect in self._collectors.items()))
+
+    def _sample(self) -> Dict[str, Any]:
+        """Collect metrics (runs in a worker thread).
+
+        Returns:
+            Raw metrics
+        """
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        connections = getattr(self._process, "net_connections", self._process.connections)
+
+        try:
+            open_connections = len(connections(kind="inet"))
+        except psutil.Error:
+            open_connections = None
+
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "percent": memory.percent
+            },
+            "disk": {
+                "total": disk.total,
+                "free": disk.free,
+                "percent": disk.percent
+            },
+            "process": {
+                "pid": self._process.pid,
+                "cpu_percent": self._process.cpu_percent(interval=None),
+                "memory_mb": self._process.memory_info().rss / 1024 / 1024,
+                "open_connections": open_connections
+            }
+        }
+
+    def _record(self, sample: Dict[str, Any], lag: float) -> None:
+        """Store a sample together with rolling aggregates.
+
+        Args:
+            sample: Raw metrics from _sample
+            lag: Event-loop lag observed before this sample, in seconds
+        """
+        self._cpu_history.append(sample["cpu_percent"])
+        self._lag_history.append(lag * 1000)
+
+        self._snapshot = {
+            "sampled_at": datetime.now().isoformat(),
+            "system": {
+                "cpu_percent": sample["cpu_percent"],
+                "cpu_percent_avg": round(sum(self._cpu_history) / len(self._cpu_history), 1),
+                "memory": sample["memory"],
+                "disk": sample["disk"]
+            },
+            "process": sample["process"],
+            "event_loop": {
+                "lag_ms": round(lag * 1000, 2),
+                "lag_ms_max": round(max(self._lag_history), 2)
+            }
+        }
+
+
+# Process-wide monitor, started and stopped by the application lifespan
+system_monitor = SystemMonitor(interval=settings.health_sample_interval)
@@ -0,0 +1,82 @@
+"""Lightweight per-request tracing of pipeline stages."""
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+from .metrics import span_duration
+
+
+class Trace:
+    """Spans recorded while handling one request.
+
+    Tasks created during the request inherit the context, so spans from
+    concurrent branches land in the same trace.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+
+    def add(self, name: str, duration: float) -> None:
+        """Record a finished span.
+
+        Args:
+            name: Span name
+            duration: Duration in seconds
+        """
+        self.spans.append((name, duration))
+
+    def totals(self) -> Dict[str, float]:
+        """Sum durations of spans sharing a name.
+
+        Returns:
+            Total seconds per span name, in first-seen order
+        """
+        totals: Dict[str, float] = {}
+        for name, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def start_trace() -> Trace:
+    """Start a trace for the current request context.
+
+    Returns:
+        New trace
+    """
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace for the current request, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    """Time a pipeline stage.
+
+    The duration is always recorded in the span histogram, and added to the
+    current request's trace when there is one. Works around awaits:
+
+        with span("classify"):
+            ...
+
+    Args:
+        name: Span name (e.g. "wolfram.full_results")
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        span_duration.observe(duration, span=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, duration)